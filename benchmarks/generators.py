@@ -0,0 +1,145 @@
+"""
+Synthetic documents for the benchmarks.
+
+Every generator is deterministic (seeded) and takes a size in "units", so the same
+command always benchmarks the same data. The shapes follow the documents JsonFlow is
+used with: the Readme example, heading trees like the ones `JsonFlow.utils.parses`
+builds from Markdown/HTML, and flattened exports of both.
+
+Shapes:
+- wide: one dictionary with many keys, each holding a scalar or a small dictionary.
+- deep: a chain of nested dictionaries, `size` levels deep, with a few siblings per level.
+- list_heavy: records made mostly of lists of scalars and lists of dictionaries.
+- mixed: copies of the Readme document and Markdown-like heading trees under a list.
+"""
+import random
+from copy import deepcopy
+
+
+SIZES = {"small": 100, "medium": 1000, "large": 10000}
+# `deep` is measured in levels; deeper than the default recursion limit from "medium" on.
+# Kept moderate: the flattened paths of a chain grow with its depth.
+DEEP_SIZES = {"small": 100, "medium": 1500, "large": 3000}
+
+WORDS = ["alpha", "beta", "gamma", "delta", "value", "text", "json", "flow", "node", "path"]
+
+README_DOCUMENT = {
+    "A": {
+        "B": [
+            {"C": {"Text": "Test text"}, "D": "Value2"},
+            {"C": {"Text": "Test text"}, "D": "Value2"},
+        ],
+        "E": {"Text": "Test text 2 E"},
+    },
+    "F": {"G": {"H": "Value4"}, "I": 3},
+}
+
+
+def _text(rng, words=4):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _scalar(rng):
+    kind = rng.random()
+    if kind < 0.4:
+        return _text(rng, rng.randint(1, 5))
+    if kind < 0.7:
+        return rng.randint(0, 10000)
+    if kind < 0.85:
+        return round(rng.random() * 100, 3)
+    if kind < 0.95:
+        return rng.random() < 0.5
+    return None
+
+
+def wide(size, seed=0):
+    rng = random.Random(seed)
+    data = {}
+    for i in range(size):
+        if i % 3 == 2:
+            data[f"key{i}"] = {"Text": _text(rng), "value": _scalar(rng), "id": i}
+        else:
+            data[f"key{i}"] = _scalar(rng)
+    return data
+
+
+def deep(size, seed=0):
+    rng = random.Random(seed)
+    data = current = {}
+    for level in range(size):
+        current["Text"] = _text(rng)
+        current["value"] = level
+        if level % 10 == 0:
+            current["items"] = [{"id": j, "Text": _text(rng, 2)} for j in range(3)]
+        current["A"] = {}
+        current = current["A"]
+    current["Text"] = "leaf"
+    return data
+
+
+def list_heavy(size, seed=0):
+    rng = random.Random(seed)
+    return {
+        "items": [
+            {
+                "id": i,
+                "tags": [rng.choice(WORDS) for _ in range(rng.randint(1, 6))],
+                "scores": [rng.randint(0, 100) for _ in range(5)],
+                "children": [
+                    {"id": j, "Text": _text(rng, 2), "values": [rng.random() for _ in range(3)]}
+                    for j in range(rng.randint(1, 4))
+                ],
+            }
+            for i in range(size)
+        ]
+    }
+
+
+def heading_tree(rng, depth=3, width=3):
+    """A document shaped like the heading trees built by `JsonFlow.utils.parses`."""
+    node = {"Text": _text(rng, 6), "p": [{"Text": _text(rng, 12)} for _ in range(rng.randint(1, 3))]}
+    if depth > 0:
+        node["sections"] = [heading_tree(rng, depth - 1, width) for _ in range(rng.randint(1, width))]
+    return node
+
+
+def mixed(size, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for i in range(size):
+        if i % 2 == 0:
+            document = deepcopy(README_DOCUMENT)
+            document["F"]["I"] = i
+            document["A"]["E"]["Text"] = _text(rng)
+        else:
+            document = {"h1": heading_tree(rng, depth=2), "id": i}
+        documents.append(document)
+    return {"Doc": documents}
+
+
+SHAPES = {
+    "wide": wide,
+    "deep": deep,
+    "list_heavy": list_heavy,
+    "mixed": mixed,
+}
+
+
+def generate(shape, size_name, seed=0):
+    """Returns the document of a shape ("wide", "deep", ...) at a named size ("small", ...)."""
+    sizes = DEEP_SIZES if shape == "deep" else SIZES
+    return SHAPES[shape](sizes[size_name], seed)
+
+
+def count_nodes(data):
+    """Returns the number of values (containers and scalars) in a document, without recursion."""
+    count = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return count
@@ -0,0 +1,133 @@
+"""
+Import-time benchmark: the cold-start cost of importing the package.
+
+Every module is imported in fresh interpreters with `python -X importtime`, alternating with
+a reference import (`import json` by default), and the best (lowest) totals over the repeats
+are compared: the budget of a module is the time its import takes over the reference, so it
+does not depend on how fast the machine is. The optional dependencies and the slow standard
+modules that are meant to be imported on first use (bs4, pandoc, numpy, the JSON backends,
+multiprocessing, asyncio) must not be imported at all.
+
+The script exits with status 1 when an optional dependency is imported eagerly, so it can run
+as a check in CI. Budgets exceeded are reported, and only fail the run with `--strict`.
+
+Usage:
+    python benchmarks/import_time.py                            # every module, default budgets
+    python benchmarks/import_time.py --repeat 20
+    python benchmarks/import_time.py --budget JsonFlow=50       # override a budget (ms over the reference)
+    python benchmarks/import_time.py --reference re             # measure over `import re`
+    python benchmarks/import_time.py --strict                   # fail when a budget is exceeded
+    python benchmarks/import_time.py --top 10                   # show the slowest imports
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> budget of its cold import, in milliseconds over the reference import (both measured
+# without the interpreter startup). Before the JSON backends and the parallel, async and
+# vectorized helpers were added, the package took about 15 ms more than `import json`; they are
+# imported on first use to stay close to that.
+BUDGETS = {
+    "JsonFlow": 35,
+    "JsonFlow.utils.parses": 40,
+}
+
+# The import the budgets are measured over: a module every JSON tool imports anyway.
+REFERENCE = "json"
+
+# Modules that must only be imported by the functions using them: optional dependencies, and
+# standard modules that are slow to import.
+LAZY_DEPENDENCIES = ("bs4", "pandoc", "numpy", "orjson", "ujson", "multiprocessing", "asyncio")
+
+
+def import_times(module):
+    """
+    Imports a module in a fresh interpreter and returns the `-X importtime` entries, as
+    (module name, depth, self microseconds, cumulative microseconds) tuples.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_time), int(cumulative)))
+    return entries
+
+
+def total_time(entries):
+    """
+    Returns the total import time of a run in milliseconds: the cumulative time of the top-level
+    imports, which leaves out the modules the interpreter imports at startup.
+    """
+    top = min(depth for _, depth, _, _ in entries)
+    return sum(cumulative for _, depth, _, cumulative in entries if depth == top) / 1000
+
+
+def measure(module, repeat, reference=REFERENCE):
+    """
+    Returns the best import time of a module over the best import time of `reference`, in
+    milliseconds, with the best total of the module and the entries of that run.
+
+    The two imports alternate, so that both see the same load of the machine.
+    """
+    best = None
+    best_reference = None
+    for _ in range(repeat):
+        reference_total = total_time(import_times(reference))
+        if best_reference is None or reference_total < best_reference:
+            best_reference = reference_total
+        entries = import_times(module)
+        total = total_time(entries)
+        if best is None or total < best[0]:
+            best = (total, entries)
+    total, entries = best
+    return total - best_reference, total, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="fresh interpreters per module (default 10)")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="override the budget of a module, in milliseconds over the reference")
+    parser.add_argument("--reference", default=REFERENCE,
+                        help=f"the import the budgets are measured over (default {REFERENCE})")
+    parser.add_argument("--strict", action="store_true", help="fail when a budget is exceeded")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest imports of each module")
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS)
+    for override in args.budget:
+        module, _, value = override.partition("=")
+        budgets[module] = float(value)
+
+    failures = []
+    warnings = []
+    for module, budget in budgets.items():
+        extra, total, entries = measure(module, args.repeat, args.reference)
+        eager = sorted({name for name, _, _, _ in entries if name.split(".")[0] in LAZY_DEPENDENCIES})
+        status = "FAIL" if eager or (args.strict and extra > budget) else "over" if extra > budget else "ok"
+        print(f"{module:30s} {total:8.1f} ms   {extra:+7.1f} ms over {args.reference:10s} budget {budget:5.0f} ms   {status}")
+        if extra > budget:
+            message = f"{module} takes {extra:.1f} ms more than `import {args.reference}`, over its budget of {budget:.0f} ms"
+            (failures if args.strict else warnings).append(message)
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} eagerly")
+        for name, depth, self_time, cumulative in sorted(entries, key=lambda entry: -entry[2])[:args.top]:
+            print(f"    {name:40s} self {self_time / 1000:7.2f} ms   cumulative {cumulative / 1000:7.2f} ms")
+
+    for message in warnings + failures:
+        print(f"\n{message}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,569 @@
+"""
+Benchmark suite for the public functions of `JsonFlow.main` and the methods of `JsoniFy`.
+
+Every benchmark runs on the synthetic documents of `generators.py` (wide, deep, list-heavy
+and mixed shapes, at several sizes) and reports:
+
+- time: the best time per call over the repeats.
+- throughput: document nodes processed per second (nodes/s).
+- peak: the peak memory traced by `tracemalloc` during one call.
+- blocks: the memory blocks allocated by one call and still alive when it returns
+  (i.e. held by its result or cached).
+
+Results can be saved as a baseline and later runs compared with it, so a release can be
+checked for regressions on the same machine.
+
+Usage:
+    python benchmarks/run.py                                  # every benchmark, small and medium sizes
+    python benchmarks/run.py --sizes large --shapes wide,mixed
+    python benchmarks/run.py --only "flatten|structure"       # benchmarks whose name matches a regex
+    python benchmarks/run.py --save baseline.json             # save the results
+    python benchmarks/run.py --compare baseline.json          # compare with saved results
+    python benchmarks/run.py --list                           # list the benchmarks and what they cover
+"""
+import io
+import os
+import re
+import sys
+import copy
+import json
+import atexit
+import asyncio
+import inspect
+import contextlib
+import argparse
+import platform
+import tempfile
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import JsonFlow
+from JsonFlow import main
+from JsonFlow.jsonify import JsoniFy
+
+import generators
+
+
+class Benchmark:
+    """
+    A benchmark of one function on one document.
+
+    Args:
+        name (str): The benchmark name, e.g. "query_path" or "JsoniFy.query_path[index]".
+        covers (list of str): The public functions and methods it measures, e.g. ["query_path"]
+            or ["JsoniFy.query_path"].
+        setup (callable): Called with the `Context` of a document; returns the function to time,
+            which is called without arguments.
+        shapes (tuple, optional): The document shapes it runs on. Defaults to every shape.
+    """
+
+    def __init__(self, name, covers, setup, shapes=None):
+        self.name = name
+        self.covers = covers
+        self.setup = setup
+        self.shapes = shapes or tuple(generators.SHAPES)
+
+
+class Context:
+    """The inputs derived once from a document and shared by the benchmarks."""
+
+    def __init__(self, data, folder):
+        self.data = data
+        self.folder = folder
+        self.nodes = generators.count_nodes(data)
+        self.rows = main.flatten_dict(data)
+        self.criteria = make_criteria(data)
+        self.paths = make_paths(data)
+        self.dict_path = next((path for path in self.paths if path.count("/") >= 1), self.paths[0])
+        self.dicts = collect_dicts(data)
+        self._encoded = None
+
+    @property
+    def encoded(self):
+        if self._encoded is None:
+            self._encoded = json.dumps(self.data).encode("utf-8")
+        return self._encoded
+
+
+def make_criteria(data, depth=0):
+    # Selects up to three keys per dictionary, descending into the first container.
+    if isinstance(data, list):
+        items = [item for item in data if isinstance(item, dict)]
+        return [make_criteria(items[0], depth + 1)] if items else True
+    if not isinstance(data, dict) or depth > 20:
+        return True
+    criteria = {}
+    for key, value in list(data.items())[:3]:
+        if isinstance(value, (dict, list)) and not any(isinstance(c, (dict, list)) for c in criteria.values()):
+            criteria[key] = make_criteria(value, depth + 1)
+        elif isinstance(value, str):
+            criteria[key] = str.upper
+        else:
+            criteria[key] = True
+    return criteria
+
+
+def make_paths(data, limit=20):
+    # `query_path` paths of some values of the document, through dictionaries only.
+    paths = []
+    for path, _ in main.iter_flatten(data, path_tuples=True):
+        keys = [key for key in path if not isinstance(key, int)]
+        if len(path) - len(keys) <= 1 and len(keys) <= 30:
+            key_path = "/".join(keys)
+            if key_path not in paths:
+                paths.append(key_path)
+                if len(paths) == limit:
+                    break
+    return paths
+
+
+def collect_dicts(data, limit=1000):
+    # Dictionaries of the document, breadth first.
+    found = []
+    queue = [data]
+    while queue and len(found) < limit:
+        node = queue.pop(0)
+        if isinstance(node, dict):
+            found.append(node)
+            queue.extend(value for value in node.values() if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            queue.extend(item for item in node if isinstance(item, (dict, list)))
+    return found[1:] or found
+
+
+def _upper_text(key, value):
+    if isinstance(value, str) and key == "Text":
+        return value.upper()
+    return None
+
+
+def _normalize_text(key, value):
+    # A costlier value function than `_upper_text`: the sorted distinct words of the texts.
+    if isinstance(value, str) and key == "Text":
+        return " ".join(sorted(set(re.findall(r"\w+", value.lower()))))
+    return None
+
+
+def _pure_criteria(criteria):
+    # The criteria with their functions declared pure, for the memoized benchmarks.
+    if isinstance(criteria, dict):
+        return {key: _pure_criteria(value) for key, value in criteria.items()}
+    if isinstance(criteria, list):
+        return [_pure_criteria(value) for value in criteria]
+    return JsonFlow.pure(criteria) if callable(criteria) else criteria
+
+
+def _regex_path(path):
+    parts = path.split("/")
+    parts[0] = "*"
+    return "/".join(parts)
+
+
+def _saved_file(ctx):
+    main.save_dict_as_json_to_folder(ctx.data, ctx.folder, "read.json")
+    return os.path.join(ctx.folder, "read.json")
+
+
+def _saved_jsonl(ctx, suffix=""):
+    path = os.path.join(ctx.folder, "read.jsonl" + suffix)
+    main.write_jsonl(path, ctx.dicts)
+    return path
+
+
+def _saved_files(ctx):
+    folder = os.path.join(ctx.folder, "files")
+    os.makedirs(folder, exist_ok=True)
+    return asyncio.run(JsonFlow.asave_json_files({f"{i}.json": d for i, d in enumerate(ctx.dicts)}, folder))
+
+
+def _record_keys(ctx):
+    return list(ctx.dicts[0])[:3]
+
+
+def _record_criteria(ctx):
+    return [{key: True for key in _record_keys(ctx)}]
+
+
+def _indexed(ctx):
+    jsonify = JsoniFy(ctx.data, index=True)
+    jsonify.path_index()
+    return jsonify
+
+
+def _index_path(ctx):
+    return next(iter(reversed(main.flatten_dict(ctx.data))), {"path": ""})["path"]
+
+
+def _build_index(jsonify):
+    jsonify.invalidate_index()
+    return jsonify.path_index()
+
+
+def _value_indexed(ctx):
+    jsonify = JsoniFy(ctx.data)
+    jsonify.value_index()
+    return jsonify
+
+
+def _build_value_index(jsonify):
+    jsonify.invalidate_index()
+    return jsonify.value_index()
+
+
+def _modified(ctx):
+    # A version of the document with the values of one path changed, sharing everything else.
+    return main.hard_modify(ctx.data, ctx.dict_path, repr, share=True)
+
+
+def _patched(ctx):
+    # A copy of the document and the patch turning it into `_modified`; the patch only replaces
+    # values, so it can be applied again and again.
+    return JsoniFy(copy.deepcopy(ctx.data)), JsonFlow.diff_documents(ctx.data, _modified(ctx))
+
+
+def _count_visits(data):
+    count = [0]
+
+    def visit(path, value, parent):
+        count[0] += 1
+
+    main.traverse(data, visit)
+    return count[0]
+
+
+def _compiled_query(ctx):
+    plan = main.compile_query(ctx.criteria)
+    return lambda: plan(ctx.data)
+
+
+_pool = None
+
+
+def _record_pool():
+    # One pool for every `map_records[pool]` run, as an application would keep it.
+    global _pool
+    if _pool is None:
+        _pool = JsonFlow.RecordPool(2)
+        atexit.register(_pool.close)
+    return _pool
+
+
+def _silent(function):
+    # Some methods print their output (e.g. `JsoniFy.pseudo_format`).
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function()
+    return run
+
+
+# 30 key patterns, as in an audit for sensitive keys.
+_AUDIT_PATTERNS = [rf"key_{n}$" for n in range(25)] + ["password", "token", "secret", "Text", r"^id$"]
+
+
+BENCHMARKS = [
+    # JsonFlow.main
+    Benchmark("query", ["query"], lambda ctx: lambda: main.query(ctx.data, ctx.criteria)),
+    Benchmark("query[memo]", ["query", "pure", "Memo"],
+              lambda ctx: (lambda c: lambda: main.query(ctx.data, c, memo=JsonFlow.Memo()))(_pure_criteria(ctx.criteria))),
+    Benchmark("compile_query", ["compile_query", "CompiledQuery"], lambda ctx: lambda: main.compile_query(ctx.criteria)),
+    Benchmark("query[compiled]", ["CompiledQuery"], _compiled_query),
+    Benchmark("query_path", ["query_path"], lambda ctx: lambda: [main.query_path(ctx.data, p) for p in ctx.paths]),
+    Benchmark("query_path[regex]", ["query_path", "compile_path", "CompiledPath"],
+              lambda ctx: lambda: [main.query_path(ctx.data, _regex_path(p)) for p in ctx.paths]),
+    Benchmark("query_paths", ["query_paths"], lambda ctx: lambda: main.query_paths(ctx.data, ctx.paths)),
+    Benchmark("json_pseudo_format", ["json_pseudo_format"], lambda ctx: lambda: main.json_pseudo_format(ctx.data)),
+    Benchmark("soft_modify", ["soft_modify"], lambda ctx: lambda: main.soft_modify(ctx.data, _upper_text)),
+    Benchmark("soft_modify[share]", ["soft_modify"], lambda ctx: lambda: main.soft_modify(ctx.data, _upper_text, share=True)),
+    Benchmark("soft_modify[normalize]", ["soft_modify"], lambda ctx: lambda: main.soft_modify(ctx.data, _normalize_text, share=True)),
+    Benchmark("soft_modify[normalize,memo]", ["soft_modify", "pure", "Memo"],
+              lambda ctx: (lambda f: lambda: main.soft_modify(ctx.data, f, share=True, memo=JsonFlow.Memo()))(JsonFlow.pure(_normalize_text))),
+    Benchmark("soft_modify[normalize,memo,warm]", ["soft_modify", "pure", "Memo"],
+              lambda ctx: (lambda f, memo: lambda: main.soft_modify(ctx.data, f, share=True, memo=memo))(
+                  JsonFlow.pure(_normalize_text), JsonFlow.Memo())),
+    Benchmark("hard_modify", ["hard_modify"], lambda ctx: lambda: main.hard_modify(ctx.data, ctx.dict_path, repr)),
+    Benchmark("hard_modify[share]", ["hard_modify"], lambda ctx: lambda: main.hard_modify(ctx.data, ctx.dict_path, repr, share=True)),
+    Benchmark("deep_merge", ["deep_merge"], lambda ctx: lambda: main.deep_merge(ctx.data)),
+    Benchmark("deep_merge[union]", ["deep_merge"], lambda ctx: lambda: main.deep_merge(ctx.data, "union")),
+    Benchmark("merge_content", ["merge_content"], lambda ctx: lambda: main.merge_content(ctx.dicts)),
+    Benchmark("merge_content[sum]", ["merge_content"], lambda ctx: lambda: main.merge_content(ctx.dicts, "sum")),
+    Benchmark("Merger", ["Merger"], lambda ctx: lambda: main.Merger().extend(ctx.dicts).result()),
+    Benchmark("Merger[union]", ["Merger"], lambda ctx: lambda: main.Merger("union").extend(ctx.dicts).result()),
+    Benchmark("filter", ["filter"], lambda ctx: lambda: [main.filter(d, ["Text", "id", "value"]) for d in ctx.dicts]),
+    Benchmark("structure_data", ["structure_data"], lambda ctx: lambda: main.structure_data(ctx.rows)),
+    Benchmark("structure_data[nested]", ["structure_data"],
+              lambda ctx: lambda: main.structure_data(ctx.rows, nested=True, adjust_list=True)),
+    Benchmark("flatten_dict", ["flatten_dict"], lambda ctx: lambda: main.flatten_dict(ctx.data)),
+    Benchmark("iter_flatten", ["iter_flatten"], lambda ctx: lambda: sum(1 for _ in main.iter_flatten(ctx.data))),
+    Benchmark("save_dict_as_json_to_folder", ["save_dict_as_json_to_folder"],
+              lambda ctx: lambda: main.save_dict_as_json_to_folder(ctx.data, ctx.folder, "save.json")),
+    Benchmark("read_json_file", ["read_json_file"], lambda ctx: (lambda path: lambda: main.read_json_file(path))(_saved_file(ctx))),
+    Benchmark("read_json_file[lazy]", ["read_json_file"],
+              lambda ctx: (lambda path: lambda: main.query_paths(main.read_json_file(path, lazy=True), ctx.paths[:5]))(_saved_file(ctx))),
+    Benchmark("write_jsonl", ["write_jsonl"],
+              lambda ctx: lambda: main.write_jsonl(os.path.join(ctx.folder, "write.jsonl"), ctx.dicts)),
+    Benchmark("iter_jsonl", ["iter_jsonl"], lambda ctx: (lambda path: lambda: sum(1 for _ in main.iter_jsonl(path)))(_saved_jsonl(ctx))),
+    Benchmark("iter_jsonl[gzip]", ["iter_jsonl", "write_jsonl"],
+              lambda ctx: (lambda path: lambda: sum(1 for _ in main.iter_jsonl(path)))(_saved_jsonl(ctx, ".gz"))),
+    Benchmark("find_keys_by_regex", ["find_keys_by_regex"], lambda ctx: lambda: main.find_keys_by_regex(ctx.data, "Text|id")),
+    Benchmark("find_keys_by_regex[x30]", ["find_keys_by_regex"],
+              lambda ctx: lambda: [main.find_keys_by_regex(ctx.data, p) for p in _AUDIT_PATTERNS]),
+    Benchmark("find_keys_by_patterns[x30]", ["find_keys_by_patterns"],
+              lambda ctx: lambda: main.find_keys_by_patterns(ctx.data, _AUDIT_PATTERNS)),
+    Benchmark("find_keys_by_patterns[x30,list]", ["find_keys_by_patterns"],
+              lambda ctx: lambda: main.find_keys_by_patterns(ctx.data, _AUDIT_PATTERNS, "list")),
+    Benchmark("find_values_by_depth", ["find_values_by_depth"], lambda ctx: lambda: main.find_values_by_depth(ctx.data, r"val|\d+$")),
+    Benchmark("traverse", ["traverse"], lambda ctx: lambda: _count_visits(ctx.data)),
+    # JsonFlow.stream
+    Benchmark("stream_query_path", ["stream_query_path"],
+              lambda ctx: lambda: [list(JsonFlow.stream_query_path(ctx.encoded, p)) for p in ctx.paths[:5]]),
+    # JsonFlow.columnar: the records of `ctx.dicts` as dictionaries and as a `RecordTable`.
+    Benchmark("records[dicts]", [], lambda ctx: lambda: [dict(record) for record in ctx.dicts]),
+    Benchmark("RecordTable", ["RecordTable"], lambda ctx: lambda: JsonFlow.RecordTable(ctx.dicts)),
+    Benchmark("query[records]", ["query"], lambda ctx: lambda: main.query(ctx.dicts, _record_criteria(ctx))),
+    Benchmark("query[columnar]", ["query"],
+              lambda ctx: (lambda t: lambda: main.query(t, _record_criteria(ctx)))(JsonFlow.RecordTable(ctx.dicts))),
+    Benchmark("query_path[records]", ["query_path"],
+              lambda ctx: lambda: [main.query_path(ctx.dicts, key) for key in _record_keys(ctx)]),
+    Benchmark("query_path[columnar]", ["query_path"],
+              lambda ctx: (lambda t: lambda: [main.query_path(t, key) for key in _record_keys(ctx)])(JsonFlow.RecordTable(ctx.dicts))),
+    Benchmark("flatten_dict[records]", ["flatten_dict"], lambda ctx: lambda: main.flatten_dict(ctx.dicts)),
+    Benchmark("flatten_dict[columnar]", ["flatten_dict"],
+              lambda ctx: (lambda t: lambda: main.flatten_dict(t))(JsonFlow.RecordTable(ctx.dicts))),
+    # JsonFlow.diff
+    Benchmark("diff_documents", ["diff_documents"], lambda ctx: (lambda new: lambda: JsonFlow.diff_documents(ctx.data, new))(_modified(ctx))),
+    Benchmark("apply_patch", ["apply_patch"],
+              lambda ctx: (lambda j, ops: lambda: JsonFlow.apply_patch(j.data, ops))(*_patched(ctx))),
+    # JsonFlow.aio
+    Benchmark("asave_json_files", ["asave_json_files"],
+              lambda ctx: lambda: asyncio.run(JsonFlow.asave_json_files(
+                  {f"{i}.json": d for i, d in enumerate(ctx.dicts)}, ctx.folder, indent=None))),
+    Benchmark("aread_json_files", ["aread_json_files"],
+              lambda ctx: (lambda paths: lambda: asyncio.run(JsonFlow.aread_json_files(paths)))(_saved_files(ctx))),
+    # JsonFlow.parallel
+    Benchmark("map_records", ["map_records"], lambda ctx: lambda: JsonFlow.map_records(ctx.dicts, main.flatten_dict, processes=2)),
+    Benchmark("map_records[pool]", ["map_records"],
+              lambda ctx: (lambda pool: lambda: JsonFlow.map_records(ctx.dicts, main.flatten_dict, pool=pool))(_record_pool())),
+    # JsoniFy
+    Benchmark("JsoniFy.__call__", ["JsoniFy.__call__"], lambda ctx: (lambda j: lambda: j(ctx.criteria))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.__call__[cache]", ["JsoniFy.__call__"],
+              lambda ctx: (lambda j: lambda: j(ctx.criteria, cache=True))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.query_path", ["JsoniFy.query_path"], lambda ctx: (lambda j: lambda: j.query_path(ctx.paths))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.query_path[index]", ["JsoniFy.query_path"],
+              lambda ctx: (lambda j: lambda: j.query_path(ctx.paths))(_indexed(ctx))),
+    Benchmark("JsoniFy.path_index", ["JsoniFy.path_index", "JsoniFy.invalidate_index"],
+              lambda ctx: (lambda j: lambda: _build_index(j))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.get", ["JsoniFy.get"], lambda ctx: (lambda j, p: lambda: j.get(p))(_indexed(ctx), _index_path(ctx))),
+    Benchmark("JsoniFy.find_keys", ["JsoniFy.find_keys"], lambda ctx: (lambda j: lambda: j.find_keys("Text|id"))(_indexed(ctx))),
+    Benchmark("JsoniFy.value_index", ["JsoniFy.value_index"],
+              lambda ctx: (lambda j: lambda: _build_value_index(j))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.find_values", ["JsoniFy.find_values"],
+              lambda ctx: (lambda j: lambda: j.find_values(r"val|\d+$"))(_value_indexed(ctx))),
+    Benchmark("JsoniFy.find_values[prefix]", ["JsoniFy.find_values"],
+              lambda ctx: (lambda j: lambda: j.find_values("val", kind="prefix"))(_value_indexed(ctx))),
+    Benchmark("JsoniFy.find_values[contains]", ["JsoniFy.find_values"],
+              lambda ctx: (lambda j: lambda: j.find_values("alu", kind="contains"))(_value_indexed(ctx))),
+    Benchmark("JsoniFy.diff", ["JsoniFy.diff"], lambda ctx: (lambda j, other: lambda: j.diff(other))(JsoniFy(ctx.data), _modified(ctx))),
+    Benchmark("JsoniFy.diff[copy]", ["JsoniFy.diff"],
+              lambda ctx: (lambda j, other: lambda: j.diff(other))(JsoniFy(ctx.data), copy.deepcopy(_modified(ctx)))),
+    Benchmark("JsoniFy.patch", ["JsoniFy.patch"], lambda ctx: (lambda j, ops: lambda: j.patch(ops))(*_patched(ctx))),
+    Benchmark("JsoniFy.pseudo_format", ["JsoniFy.pseudo_format"],
+              lambda ctx: _silent((lambda j: lambda: j.pseudo_format())(JsoniFy(ctx.data)))),
+    Benchmark("JsoniFy.soft_insert", ["JsoniFy.soft_insert"],
+              lambda ctx: (lambda j: lambda: j.soft_insert(_upper_text, share=True))(JsoniFy(ctx.data))),
+    Benchmark("JsoniFy.map_records", ["JsoniFy.map_records"],
+              lambda ctx: (lambda j: lambda: j.map_records(main.deep_merge, processes=2))(JsoniFy(ctx.dicts))),
+    Benchmark("JsoniFy.query_records", ["JsoniFy.query_records"],
+              lambda ctx: (lambda j: lambda: j.query_records(ctx.criteria, processes=2))(JsoniFy(ctx.dicts))),
+    Benchmark("JsoniFy.hard_insert", ["JsoniFy.hard_insert"],
+              lambda ctx: (lambda j: lambda: j.hard_insert([ctx.dict_path], [repr], share=True, combine=True))(JsoniFy(ctx.data))),
+]
+
+
+def _profiled(function):
+    # Runs a benchmark with profiling enabled, to compare with the same benchmark without it.
+    def run():
+        with JsonFlow.profile():
+            return function()
+    return run
+
+
+# JsonFlow.profiling: the cost of measuring, against the plain benchmarks above.
+BENCHMARKS += [
+    Benchmark("query[profiled]", ["profile"], lambda ctx: _profiled(lambda: main.query(ctx.data, ctx.criteria))),
+    Benchmark("query_path[profiled]", ["profile"],
+              lambda ctx: _profiled(lambda: [main.query_path(ctx.data, p) for p in ctx.paths])),
+    Benchmark("soft_modify[profiled]", ["profile"], lambda ctx: _profiled(lambda: main.soft_modify(ctx.data, _upper_text))),
+    Benchmark("flatten_dict[profiled]", ["profile"], lambda ctx: _profiled(lambda: main.flatten_dict(ctx.data))),
+]
+
+
+# JsonFlow.vector: only with NumPy installed. The values are gathered as objects, so that
+# writing them back in place leaves the documents unchanged between runs.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+if numpy is not None:
+    BENCHMARKS += [
+        Benchmark("gather_path", ["gather_path"],
+                  lambda ctx: lambda: [JsonFlow.gather_path(ctx.data, p, object) for p in ctx.paths[:5]]),
+        Benchmark("transform_path", ["transform_path"],
+                  lambda ctx: lambda: [JsonFlow.transform_path(ctx.data, p, numpy.copy, inplace=True, dtype=object)
+                                       for p in ctx.paths[:5]]),
+        Benchmark("transform_path[columnar]", ["transform_path"],
+                  lambda ctx: (lambda t: lambda: [JsonFlow.transform_path(t, key, numpy.copy, inplace=True, dtype=object)
+                                                  for key in _record_keys(ctx)])(JsonFlow.RecordTable(ctx.dicts))),
+        Benchmark("JsoniFy.gather_path", ["JsoniFy.gather_path"],
+                  lambda ctx: (lambda j: lambda: j.gather_path(ctx.paths[0], object))(JsoniFy(ctx.data))),
+        Benchmark("JsoniFy.transform_path", ["JsoniFy.transform_path"],
+                  lambda ctx: (lambda j: lambda: j.transform_path(ctx.paths[0], numpy.copy, as_array=True, dtype=object))(JsoniFy(ctx.data))),
+    ]
+
+
+# JSON backends: every installed one is timed on encoding, decoding and reading a file.
+for _backend in JsonFlow.available_json_backends():
+    BENCHMARKS += [
+        Benchmark(f"encode_json[{_backend}]", ["encode_json"],
+                  lambda ctx, backend=_backend: lambda: JsonFlow.encode_json(ctx.data, backend=backend)),
+        Benchmark(f"encode_json[{_backend},indent]", ["encode_json"],
+                  lambda ctx, backend=_backend: lambda: JsonFlow.encode_json(ctx.data, 2, backend)),
+        Benchmark(f"decode_json[{_backend}]", ["decode_json"],
+                  lambda ctx, backend=_backend: lambda: JsonFlow.decode_json(ctx.encoded, backend)),
+        Benchmark(f"read_json_file[{_backend}]", ["read_json_file"],
+                  lambda ctx, backend=_backend: (lambda path: lambda: main.read_json_file(path, backend))(_saved_file(ctx))),
+    ]
+
+
+def public_api():
+    """Returns the public functions and classes of `JsonFlow.main` and the public methods of `JsoniFy`."""
+    names = [
+        name for name, value in vars(main).items()
+        if not name.startswith("_") and (inspect.isfunction(value) or inspect.isclass(value))
+        and value.__module__ == main.__name__
+    ]
+    names += [
+        f"JsoniFy.{name}" for name, value in vars(JsoniFy).items()
+        if inspect.isfunction(value) and (not name.startswith("_") or name == "__call__")
+    ]
+    return names
+
+
+def measure(function, repeat, nodes, min_time=0.05):
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 4
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        before = len(tracemalloc.take_snapshot().traces)
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = len(tracemalloc.take_snapshot().traces) - before
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time": best,
+        "throughput": nodes / best if best else None,
+        "peak": max(peak - start, 0),
+        "blocks": max(blocks, 0),
+    }
+
+
+def format_row(name, shape, size, result, reference=None):
+    if "error" in result:
+        return f"{name:30s} {shape:10s} {size:7s} {result['error']}"
+    row = (f"{name:30s} {shape:10s} {size:7s} {result['time'] * 1000:10.3f} ms "
+           f"{result['throughput']:14,.0f} nodes/s {result['peak'] / 1024:10.1f} KiB {result['blocks']:9d} blocks")
+    if reference is not None and "error" not in reference:
+        row += f"   x{reference['time'] / result['time']:.2f} speedup vs baseline"
+    return row
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", default=",".join(generators.SHAPES), help="Comma-separated document shapes.")
+    parser.add_argument("--sizes", default="small,medium", help="Comma-separated sizes: small, medium, large.")
+    parser.add_argument("--only", help="Only run the benchmarks whose name matches this regular expression.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats; the best one is reported.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the document generators.")
+    parser.add_argument("--save", help="Save the results as a baseline in this JSON file.")
+    parser.add_argument("--compare", help="Compare with the baseline saved in this JSON file.")
+    parser.add_argument("--threshold", type=float, default=1.15,
+                        help="Slowdown against the baseline reported as a regression. Defaults to 1.15.")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    args = parser.parse_args()
+
+    benchmarks = [b for b in BENCHMARKS if args.only is None or re.search(args.only, b.name)]
+    covered = {name for benchmark in BENCHMARKS for name in benchmark.covers}
+    missing = [name for name in public_api() if name not in covered]
+
+    if args.list:
+        for benchmark in benchmarks:
+            print(f"{benchmark.name:30s} covers {', '.join(benchmark.covers)}")
+        if missing:
+            print(f"Not covered: {', '.join(missing)}")
+        return 0
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as folder:
+        for shape in args.shapes.split(","):
+            for size in args.sizes.split(","):
+                data = generators.generate(shape, size, args.seed)
+                ctx = Context(data, folder)
+                print(f"# {shape} / {size}: {ctx.nodes:,} nodes")
+                for benchmark in benchmarks:
+                    if shape not in benchmark.shapes:
+                        continue
+                    key = f"{benchmark.name}|{shape}|{size}"
+                    try:
+                        result = measure(benchmark.setup(ctx), args.repeat, ctx.nodes)
+                    except (RecursionError, MemoryError) as error:
+                        result = {"error": type(error).__name__}
+                    results[key] = result
+                    reference = baseline.get(key)
+                    print(format_row(benchmark.name, shape, size, result, reference))
+                    if (reference is not None and "error" not in reference and "error" not in result
+                            and result["time"] > reference["time"] * args.threshold):
+                        regressions.append((key, reference["time"] / result["time"]))
+
+    if missing:
+        print(f"\nNot covered by any benchmark: {', '.join(missing)}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({
+                "meta": {
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": args.seed,
+                },
+                "results": results,
+            }, file, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s), slower than the baseline by more than x{args.threshold:.2f}:")
+        for key, ratio in regressions:
+            print(f"  {key.replace('|', ' / ')}: x{ratio:.2f}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,122 @@
+"""
+Benchmarks for the tree walkers built on the traversal core.
+
+Times `flatten_dict`, `iter_flatten`, `find_keys_by_regex`, `find_values_by_depth`, `deep_merge`,
+`json_pseudo_format` and `soft_modify` on a wide document of records, and checks that
+they all run on a document far deeper than the Python recursion limit.
+
+The walkers with a recursive fast path (`soft_modify`) are also timed with the fast path
+turned off (`main.RECURSION_DEPTH = 0`), i.e. entirely on the explicit stack of `_drive`,
+to compare the two traversals on the same document.
+
+Usage:
+    python benchmarks/traversal.py
+    python benchmarks/traversal.py --baseline /path/to/other/JsonFlow/src
+
+With `--baseline`, the same benchmarks are run against the JsonFlow package found in
+that directory (e.g. a checkout of an older version) and the speedup is reported.
+"""
+import os
+import sys
+import argparse
+import importlib.util
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_jsonflow(src_dir, name):
+    # Loads the `JsonFlow` package of `src_dir` under another name, so two versions can be compared.
+    package_dir = os.path.join(src_dir, "JsonFlow")
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(package_dir, "__init__.py"), submodule_search_locations=[package_dir])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[name] = package
+    spec.loader.exec_module(package)
+    return sys.modules[f"{name}.main"]
+
+
+def record(i):
+    return {
+        "id": i,
+        "name": f"name {i}",
+        "Text": "some text",
+        "score": i * 0.5,
+        "active": True,
+        "meta": {"created": "2024-01-01", "tags": ["a", "b", "c"], "owner": {"id": i, "name": "owner", "value": "V1"}},
+        "items": [{"sku": j, "qty": 2, "value": "Value"} for j in range(3)],
+    }
+
+
+def deep_document(depth):
+    data = current = {}
+    for _ in range(depth):
+        current["A"] = {"Text": "level", "B": [1, 2]}
+        current = current["A"]
+    return data
+
+
+BENCHMARKS = [
+    ("flatten_dict", lambda jf, data: jf.flatten_dict(data)),
+    ("iter_flatten", lambda jf, data: sum(1 for _ in jf.iter_flatten(data))),
+    ("find_keys_by_regex", lambda jf, data: jf.find_keys_by_regex(data, "id|value", "list")),
+    ("find_values_by_depth", lambda jf, data: jf.find_values_by_depth(data, "V")),
+    ("deep_merge", lambda jf, data: jf.deep_merge(data)),
+    ("json_pseudo_format", lambda jf, data: jf.json_pseudo_format(data)),
+    ("soft_modify", lambda jf, data: jf.soft_modify(data, lambda key, value: None, inplace=True)),
+]
+
+# The benchmarks of walkers with a recursive fast path.
+FAST_PATHS = {"soft_modify"}
+
+
+def best_time(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def explicit_stack_time(module, function, repeat):
+    # The time of `function` with the recursive fast path turned off.
+    depth = module.RECURSION_DEPTH
+    module.RECURSION_DEPTH = 0
+    try:
+        return best_time(function, repeat)
+    finally:
+        module.RECURSION_DEPTH = depth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=5000, help="Number of records in the wide document.")
+    parser.add_argument("--depth", type=int, default=5000, help="Depth of the deep document.")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per benchmark; the best one is reported.")
+    parser.add_argument("--baseline", help="The `src` directory of another JsonFlow version to compare with.")
+    args = parser.parse_args()
+
+    current = load_jsonflow(os.path.join(ROOT, "src"), "jsonflow_current")
+    baseline = load_jsonflow(args.baseline, "jsonflow_baseline") if args.baseline else None
+
+    wide = {"records": [record(i) for i in range(args.records)]}
+    print(f"Wide document: {args.records} records")
+    for name, run in BENCHMARKS:
+        elapsed = best_time(lambda: run(current, wide), args.repeat)
+        line = f"  {name:22s} {elapsed * 1000:9.2f} ms"
+        if name in FAST_PATHS:
+            stacked = explicit_stack_time(current, lambda: run(current, wide), args.repeat)
+            line += f"   explicit stack {stacked * 1000:9.2f} ms"
+        if baseline is not None and hasattr(baseline, name):
+            reference = best_time(lambda: run(baseline, wide), args.repeat)
+            line += f"   baseline {reference * 1000:9.2f} ms   speedup {reference / elapsed:5.2f}x"
+        print(line)
+
+    deep = deep_document(args.depth)
+    print(f"Deep document: {args.depth} levels")
+    for name, run in BENCHMARKS:
+        try:
+            elapsed = best_time(lambda: run(current, deep), 1)
+            print(f"  {name:22s} {elapsed * 1000:9.2f} ms")
+        except RecursionError:
+            print(f"  {name:22s} RecursionError")
+
+
+if __name__ == "__main__":
+    main()
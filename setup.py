@@ -17,7 +17,9 @@ setup(
     author_email='becomeallan@gmail.com',
     install_requires=requirements,
     extras_require={
-        'parse': ['pandoc', 'beautifulsoup4']
+        'parse': ['pandoc', 'beautifulsoup4'],
+        'fast': ['orjson'],
+        'numpy': ['numpy']
     },
     long_description=long_description,
     long_description_content_type='text/markdown',
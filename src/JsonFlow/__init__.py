@@ -1,4 +1,47 @@
+from .backends import *
+from .columnar import *
 from .main import *
 from .jsonify import *
+from .stream import *
+from .index import *
+from .lazy import *
+from .profiling import *
+from .memo import *
+from .diff import *
+from . import backends, columnar, main, jsonify, stream, index, lazy, profiling, memo, diff
 
 
+# Names exported by the modules that are only imported on first use: `parallel` imports
+# multiprocessing, which costs about half of the package import.
+_LAZY_NAMES = {
+    "RecordError": "parallel",
+    "BatchError": "parallel",
+    "RecordPool": "parallel",
+    "map_records": "parallel",
+    "aread_json_files": "aio",
+    "asave_json_files": "aio",
+    "gather_path": "vector",
+    "transform_path": "vector",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
+
+# The public names of the submodules, and those of the modules imported on first use.
+__all__ = [
+    name
+    for module in (backends, columnar, main, jsonify, stream, index, lazy, profiling, memo, diff)
+    for name in module.__all__
+] + list(_LAZY_NAMES)
@@ -0,0 +1,115 @@
+import os
+import importlib
+
+from .main import read_json_file, save_dict_as_json_to_folder
+
+
+__all__ = ["aread_json_files", "asave_json_files"]
+
+
+async def _run_all(calls, limit, executor, errors):
+    # Runs the blocking calls in the executor, at most `limit` at a time, and returns their
+    # results in order. Each of the `limit` lanes takes the next call as soon as its own is
+    # done, which costs less than a task per call waiting on a semaphore.
+    if errors not in ("raise", "return"):
+        raise ValueError("errors must be either 'raise' or 'return'.")
+    if not isinstance(limit, int) or limit < 1:
+        raise ValueError("limit must be a positive integer.")
+
+    # asyncio is slow to import, and already imported by the time a coroutine runs.
+    asyncio = importlib.import_module("asyncio")
+    loop = asyncio.get_running_loop()
+    calls = list(calls)
+    results = [None] * len(calls)
+    pending = iter(enumerate(calls))
+
+    async def lane():
+        for index, (function, *args) in pending:
+            try:
+                results[index] = await loop.run_in_executor(executor, function, *args)
+            except Exception as exc:
+                results[index] = exc
+
+    await asyncio.gather(*(lane() for _ in range(min(limit, len(calls)))))
+    if errors == "raise":
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    return results
+
+
+async def aread_json_files(paths, limit=32, backend=None, executor=None, errors="raise"):
+    """
+    Reads many JSON files concurrently, each with `read_json_file`.
+
+    Every file is read and decoded in `executor`, so the event loop is never blocked and
+    up to `limit` files are in flight at a time.
+
+    Args:
+    - paths (iterable of str | Path): The paths of the JSON files.
+    - limit (int, optional): The maximum number of files read at the same time. Defaults to 32.
+    - backend (str | JsonBackend, optional): The JSON backend that decodes the files (see
+      `set_json_backend`). Defaults to the active backend.
+    - executor (concurrent.futures.Executor, optional): Where the files are read and decoded.
+      Defaults to the event loop's default thread pool. A `ProcessPoolExecutor` decodes in
+      parallel on several CPUs; `backend` must then be given by name, if at all.
+    - errors (str, optional): What to do when a file cannot be read:
+        * "raise": raise the first error, once every file is done (default).
+        * "return": return the exception in place of the content of that file.
+
+    Returns:
+    - list: The content of each file, in the order of `paths`.
+
+    Raises:
+    - FileNotFoundError: If a file is not found.
+    - json.JSONDecodeError: If a file is not valid JSON.
+    - ValueError: If `limit` or `errors` is invalid.
+
+    Example:
+        documents = asyncio.run(aread_json_files(["a.json", "b.json"]))
+    """
+    return await _run_all(((read_json_file, path, backend) for path in paths), limit, executor, errors)
+
+
+async def asave_json_files(items, folder_path, indent=4, limit=32, backend=None, executor=None, errors="raise"):
+    """
+    Saves many dictionaries as JSON files in a folder concurrently, each with
+    `save_dict_as_json_to_folder`.
+
+    Every file is encoded and written in `executor`, so the event loop is never blocked and
+    up to `limit` files are in flight at a time.
+
+    Args:
+    - items (dict | iterable of tuple): The files to write: a mapping of file names to
+      dictionaries, or `(file_name, dictionary)` pairs.
+    - folder_path (str): The path to the folder where the files will be saved.
+    - indent (int, optional): The indentation width, or None for compact output. Defaults to 4.
+    - limit (int, optional): The maximum number of files written at the same time. Defaults to 32.
+    - backend (str | JsonBackend, optional): The JSON backend that encodes the files (see
+      `set_json_backend`). Defaults to the active backend.
+    - executor (concurrent.futures.Executor, optional): Where the files are encoded and
+      written. Defaults to the event loop's default thread pool.
+    - errors (str, optional): What to do when a file cannot be written:
+        * "raise": raise the first error, once every file is done (default).
+        * "return": return the exception in place of the path of that file.
+
+    Returns:
+    - list of str: The path of each file written, in the order of `items`.
+
+    Raises:
+    - FileNotFoundError: If the folder doesn't exist (before any file is written).
+    - ValueError: If `limit` or `errors` is invalid.
+    """
+    if not os.path.exists(folder_path):
+        raise FileNotFoundError(f"The folder '{folder_path}' does not exist.")
+    if isinstance(items, dict):
+        items = items.items()
+    items = list(items)
+
+    calls = ((save_dict_as_json_to_folder, dictionary, folder_path, file_name, indent, backend)
+             for file_name, dictionary in items)
+    results = await _run_all(calls, limit, executor, errors)
+    return [
+        result if isinstance(result, Exception) else os.path.join(folder_path, file_name)
+        for (file_name, _), result in zip(items, results)
+    ]
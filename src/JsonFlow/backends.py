@@ -0,0 +1,264 @@
+import json
+import math
+import importlib
+
+from .columnar import RecordTable
+
+
+__all__ = [
+    "JsonBackend", "available_json_backends", "get_json_backend", "set_json_backend", "encode_json",
+    "decode_json",
+]
+
+
+class JsonBackend:
+    """
+    A JSON encoder/decoder pair used by the file functions of JsonFlow.
+
+    Every backend reads and writes UTF-8 bytes, and reads and writes the same values as the
+    standard library, including NaN, Infinity and integers of any size: what a faster backend
+    cannot handle exactly is handed to the standard library. Encoded output only differs in
+    the spelling of some numbers (e.g. 1e+16 and 1e16).
+
+    Attributes:
+    - name (str): The backend name ("orjson", "ujson" or "json").
+    - loads (callable): Decodes `bytes` or `str` to a Python value. Invalid input raises
+      `json.JSONDecodeError` whatever the backend.
+    - dumps (callable): `dumps(obj, indent=None)` encodes a value to UTF-8 `bytes`; compact
+      (no whitespace) when `indent` is None, indented otherwise.
+    """
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f"JsonBackend({self.name!r})"
+
+
+def _as_builtin(obj):
+    if isinstance(obj, RecordTable):
+        return obj.to_records()
+    for builtin in (dict, list, str, int, float):
+        if isinstance(obj, builtin):
+            return builtin(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _has_non_finite(obj):
+    # Whether a value holds a NaN or infinite float, anywhere below it.
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        for value in node.values() if isinstance(node, dict) else node:
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple, RecordTable)):
+                stack.append(value)
+    return False
+
+
+# Every digit becomes "0", so that runs of digits can be found with a substring search (much
+# faster than a regular expression).
+_ZERO_DIGITS = bytes.maketrans(b"123456789", b"000000000")
+
+
+def _has_long_digits(data):
+    # Whether the text has 19 digits in a row: an integer that may not fit in 64 bits. Long
+    # digit runs in strings or fractions match too; they only cost a slower decoding.
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    elif not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    return b"0000000000000000000" in data.translate(_ZERO_DIGITS)
+
+
+def _orjson_backend():
+    orjson = importlib.import_module("orjson")
+    # Non-string keys are written as strings, like the standard library does. Subclasses of
+    # the built-in types go through `_as_builtin`, so that they are read through their
+    # methods (e.g. the unread objects of a lazily loaded document).
+    compact = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+    indented = compact | orjson.OPT_INDENT_2
+    fallback = _stdlib_backend()
+
+    def dumps(obj, indent=None):
+        # orjson only indents with 2 spaces.
+        if indent is not None and indent != 2:
+            return fallback.dumps(obj, indent)
+        try:
+            encoded = orjson.dumps(obj, default=_as_builtin, option=compact if indent is None else indented)
+        except TypeError as e:
+            # orjson stops at 255 levels of nesting, and at integers beyond 64 bits; the standard
+            # library goes as deep as the recursion limit allows, with integers of any size.
+            if str(e) not in ("Recursion limit reached", "Integer exceeds 64-bit range"):
+                raise
+            return fallback.dumps(obj, indent)
+        # orjson writes NaN and Infinity as null.
+        if b"null" in encoded and _has_non_finite([obj]):
+            return fallback.dumps(obj, indent)
+        return encoded
+
+    def loads(data):
+        # orjson reads integers beyond 64 bits as floats.
+        if _has_long_digits(data):
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN, Infinity and numbers too large for a float, which the
+            # standard library reads; invalid input raises json.JSONDecodeError there too.
+            return json.loads(data)
+
+    return JsonBackend("orjson", loads, dumps)
+
+
+def _ujson_backend():
+    ujson = importlib.import_module("ujson")
+
+    fallback = _stdlib_backend()
+
+    def loads(data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            # ujson rejects some documents the standard library reads (e.g. integers beyond
+            # 64 bits); invalid input raises json.JSONDecodeError there.
+            return json.loads(data)
+
+    def dumps(obj, indent=None):
+        try:
+            encoded = ujson.dumps(
+                obj, ensure_ascii=False, escape_forward_slashes=False, indent=indent or 0, default=_as_builtin)
+        except OverflowError:
+            # Integers beyond 64 bits, and NaN or Infinity in the versions that refuse them.
+            return fallback.dumps(obj, indent)
+        return encoded.encode("utf-8")
+
+    return JsonBackend("ujson", loads, dumps)
+
+
+def _stdlib_backend():
+    encoders = {}
+
+    def dumps(obj, indent=None):
+        encoder = encoders.get(indent)
+        if encoder is None:
+            separators = (",", ":") if indent is None else None
+            encoder = encoders[indent] = json.JSONEncoder(
+                ensure_ascii=False, indent=indent, separators=separators, default=_as_builtin)
+        return encoder.encode(obj).encode("utf-8")
+
+    return JsonBackend("json", json.loads, dumps)
+
+
+# Backend builders, from the fastest to the slowest.
+_BACKENDS = {
+    "orjson": _orjson_backend,
+    "ujson": _ujson_backend,
+    "json": _stdlib_backend,
+}
+_loaded = {}
+
+
+def _load(name):
+    backend = _loaded.get(name)
+    if backend is None:
+        if name not in _BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(map(repr, _BACKENDS))} or a JsonBackend.")
+        backend = _loaded[name] = _BACKENDS[name]()
+    return backend
+
+
+def available_json_backends():
+    """Returns the names of the installed JSON backends, from the fastest to the slowest."""
+    names = []
+    for name in _BACKENDS:
+        try:
+            _load(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+# The backend used when none is given; chosen on first use, as importing orjson (or finding
+# that it is missing) costs more than the rest of the package import.
+_active = None
+
+
+def _default_backend():
+    global _active
+    if _active is None:
+        for name in _BACKENDS:
+            try:
+                _active = _load(name)
+            except ImportError:
+                continue
+            break
+    return _active
+
+
+def get_json_backend(backend=None):
+    """
+    Returns a `JsonBackend`.
+
+    Args:
+        backend (str | JsonBackend, optional): A backend name ("orjson", "ujson" or "json") or
+            a `JsonBackend`, returned as it is. Defaults to the active backend: the fastest
+            installed one, unless changed with `set_json_backend`.
+
+    Raises:
+        ImportError: If the named backend is not installed.
+        ValueError: If the name is unknown.
+    """
+    if backend is None:
+        return _active if _active is not None else _default_backend()
+    if isinstance(backend, JsonBackend):
+        return backend
+    return _load(backend)
+
+
+def set_json_backend(backend):
+    """
+    Sets the JSON backend used by `read_json_file`, `save_dict_as_json_to_folder`, `iter_jsonl`,
+    `write_jsonl`, `encode_json` and `decode_json` when they are not given one.
+
+    Args:
+        backend (str | JsonBackend): A backend name ("orjson", "ujson" or "json") or a `JsonBackend`.
+
+    Returns:
+        JsonBackend: The previously active backend, so it can be restored.
+    """
+    global _active
+    previous = get_json_backend()
+    _active = get_json_backend(backend)
+    return previous
+
+
+def encode_json(obj, indent=None, backend=None):
+    """
+    Encodes a value to UTF-8 JSON bytes, compact unless `indent` is given.
+
+    Args:
+        obj: The value to encode.
+        indent (int, optional): The indentation width, or None for compact output. Defaults to None.
+        backend (str | JsonBackend, optional): The backend to use. Defaults to the active one.
+    """
+    return get_json_backend(backend).dumps(obj, indent)
+
+
+def decode_json(data, backend=None):
+    """
+    Decodes JSON `bytes` or `str` to a Python value.
+
+    Args:
+        data (bytes | str): The JSON document.
+        backend (str | JsonBackend, optional): The backend to use. Defaults to the active one.
+
+    Raises:
+        json.JSONDecodeError: If `data` is not valid JSON.
+    """
+    return get_json_backend(backend).loads(data)
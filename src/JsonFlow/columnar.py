@@ -0,0 +1,227 @@
+from array import array
+
+
+__all__ = ["RecordTable"]
+
+
+class _Absent:
+    # Copies and pickles of a table keep the same marker.
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_ABSENT"
+
+    def __repr__(self):
+        return "<absent>"
+
+
+# Marks the rows of a column that do not have its key.
+_ABSENT = _Absent()
+
+
+class RecordTable:
+    """
+    A list of records (dictionaries) stored by column.
+
+    Each field is kept as one list holding the value of every row, and each row only keeps the
+    position of its key table: the tuple of its keys, in order, shared by all the rows with the
+    same keys. A list of records that share their keys is stored in a few lists instead of one
+    hash table per record, which takes a fraction of the memory and lets `query`, `query_path`
+    and `flatten_dict` work a column at a time.
+
+    The table behaves like a read-only list of dictionaries: `len`, iteration and indexing
+    return the records as new dictionaries (with their keys in their original order), slicing
+    returns a new `RecordTable`, and a table is equal to the list of its records. Nested values
+    are stored as they are, not copied.
+
+    Args:
+    - records (iterable of dict, optional): The records to store.
+
+    Raises:
+    - TypeError: If a record is not a dictionary.
+
+    Example:
+        table = RecordTable([{"name": "John", "age": 30}, {"name": "Alice", "age": 25}])
+        query_path(table, "name")  # Returns: ["John", "Alice"]
+        table[1]  # Returns: {"name": "Alice", "age": 25}
+    """
+
+    __slots__ = ("_columns", "_key_tables", "_table_ids", "_rows")
+
+    def __init__(self, records=()):
+        self._columns = {}
+        self._key_tables = []
+        self._table_ids = {}
+        # The key table of each row, by position in `_key_tables`.
+        self._rows = array("I")
+        self.extend(records)
+
+    @classmethod
+    def _from_columns(cls, columns, key_tables, rows):
+        table = cls.__new__(cls)
+        table._columns = columns
+        table._key_tables = key_tables
+        table._table_ids = {keys: position for position, keys in enumerate(key_tables)}
+        table._rows = rows
+        return table
+
+    def append(self, record):
+        """Appends a record (a dictionary) as the last row."""
+        if not isinstance(record, dict):
+            raise TypeError(f"RecordTable records must be dictionaries, not {type(record).__name__}.")
+        keys = tuple(record)
+        table_id = self._table_ids.get(keys)
+        if table_id is None:
+            table_id = self._table_ids[keys] = len(self._key_tables)
+            self._key_tables.append(keys)
+        columns = self._columns
+        length = len(self._rows)
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [_ABSENT] * length
+            column.append(value)
+        if len(keys) != len(columns):
+            for column in columns.values():
+                if len(column) == length:
+                    column.append(_ABSENT)
+        self._rows.append(table_id)
+
+    def extend(self, records):
+        """Appends every record of an iterable."""
+        for record in records:
+            self.append(record)
+
+    def keys(self):
+        """Returns the keys found in the records, in order of appearance."""
+        return list(self._columns)
+
+    def _is_complete(self, key):
+        return all(key in keys for keys in self._key_tables)
+
+    def column(self, key):
+        """
+        Returns the values of a key, in row order, for the rows that have it.
+
+        The result is equal to `[record[key] for record in table if key in record]`.
+        """
+        column = self._columns.get(key)
+        if column is None:
+            return []
+        if self._is_complete(key):
+            return list(column)
+        return [value for value in column if value is not _ABSENT]
+
+    def select(self, matches):
+        """
+        Returns the values of the keys for which `matches(key)` is true, row after row, each row
+        in the order of its keys.
+
+        Each key table is matched once, instead of each record.
+        """
+        selected = [[key for key in keys if matches(key)] for keys in self._key_tables]
+        if len(selected) == 1 and len(selected[0]) == 1:
+            return self.column(selected[0][0])
+        columns = self._columns
+        output = []
+        for index, table_id in enumerate(self._rows):
+            for key in selected[table_id]:
+                output.append(columns[key][index])
+        return output
+
+    def _locate(self, matches, containers, positions):
+        # Appends the column and the position of each value `select(matches)` returns, so that
+        # they can be replaced in place.
+        selected = [[key for key in keys if matches(key)] for keys in self._key_tables]
+        columns = self._columns
+        if len(selected) == 1 and len(selected[0]) == 1:
+            column = columns[selected[0][0]]
+            containers.extend([column] * len(column))
+            positions.extend(range(len(column)))
+            return
+        for index, table_id in enumerate(self._rows):
+            for key in selected[table_id]:
+                containers.append(columns[key])
+                positions.append(index)
+
+    def project(self, fields):
+        """
+        Returns a new table with the given fields of each row, like
+        `[{key: function(record[key]) for key, function in fields if key in record} for record in table]`.
+
+        Args:
+        - fields (list of tuple): `(key, function)` pairs, in the order of the output keys.
+          `function` is applied to the values of the key a column at a time; None keeps them.
+        """
+        columns = {}
+        for key, function in fields:
+            column = self._columns.get(key)
+            if column is None:
+                continue
+            if function is None:
+                columns[key] = list(column)
+            elif self._is_complete(key):
+                columns[key] = [function(value) for value in column]
+            else:
+                columns[key] = [_ABSENT if value is _ABSENT else function(value) for value in column]
+
+        # The key tables of the output, in the same positions when they stay distinct.
+        key_tables = []
+        table_ids = {}
+        remap = []
+        for keys in self._key_tables:
+            kept = tuple(key for key, _ in fields if key in columns and key in keys)
+            if kept not in table_ids:
+                table_ids[kept] = len(key_tables)
+                key_tables.append(kept)
+            remap.append(table_ids[kept])
+        if remap == list(range(len(remap))):
+            rows = array("I", self._rows)
+        else:
+            rows = array("I", [remap[table_id] for table_id in self._rows])
+        return RecordTable._from_columns(columns, key_tables, rows)
+
+    def iter_rows(self):
+        """Yields a `(keys, values)` pair of tuples per row, without building dictionaries."""
+        columns = self._columns
+        if len(self._key_tables) == 1 and self._key_tables[0]:
+            keys = self._key_tables[0]
+            for values in zip(*[columns[key] for key in keys]):
+                yield keys, values
+            return
+        key_tables = self._key_tables
+        for index, table_id in enumerate(self._rows):
+            keys = key_tables[table_id]
+            yield keys, tuple([columns[key][index] for key in keys])
+
+    def to_records(self):
+        """Returns the records as a list of new dictionaries."""
+        return [dict(zip(keys, values)) for keys, values in self.iter_rows()]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for keys, values in self.iter_rows():
+            yield dict(zip(keys, values))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(len(self._rows))[index]
+            columns = {key: [column[position] for position in positions] for key, column in self._columns.items()}
+            rows = array("I", [self._rows[position] for position in positions])
+            return RecordTable._from_columns(columns, list(self._key_tables), rows)
+        table_id = self._rows[index]
+        if index < 0:
+            index += len(self._rows)
+        return {key: self._columns[key][index] for key in self._key_tables[table_id]}
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RecordTable({self.to_records()!r})"
@@ -0,0 +1,246 @@
+import re
+from copy import deepcopy
+
+from .main import _drive
+from .columnar import RecordTable
+from .memo import _fingerprint
+
+
+__all__ = ["diff_documents", "apply_patch"]
+
+
+_CONTAINERS = (dict, list, RecordTable)
+
+
+def _same(a, b, cache):
+    # Whether two values are equal (of the same types, with their keys in the same order),
+    # skipping identical objects. Containers that `==` finds equal are told apart by their
+    # fingerprints, as `==` ignores the types of the scalars inside (1 == 1.0 == True) and the
+    # order of the keys.
+    if a is b:
+        return True
+    if isinstance(a, dict) and isinstance(b, dict) or isinstance(a, list) and isinstance(b, list):
+        return a == b and _fingerprint(a, cache, ordered=True) == _fingerprint(b, cache, ordered=True)
+    return type(a) is type(b) and a == b
+
+
+def _key_path(path, key):
+    if not isinstance(key, str) or not key or "/" in key or "[" in key:
+        raise ValueError(
+            f"The key {key!r} cannot be written in a path (keys must be non-empty strings without '/' or '[')."
+        )
+    return f"{path}/{key}" if path else key
+
+
+def _moved_keys(a, b):
+    # The keys of `b` to add at the end of `a` (again, for those it has), in order, so that the
+    # patched dictionary gets the key order of `b`: the keys after the longest prefix of `b`
+    # that `a` has in the same order.
+    keys = list(b)
+    if len(keys) >= len(a) and keys[:len(a)] == list(a):
+        # Unchanged keys, or keys added at the end.
+        return keys[len(a):]
+    positions = {key: position for position, key in enumerate(a)}
+    last = -1
+    for index, key in enumerate(keys):
+        position = positions.get(key)
+        if position is None or position < last:
+            return keys[index:]
+        last = position
+    return []
+
+
+def diff_documents(old, new):
+    """
+    Computes the operations that turn a document into another one.
+
+    Subtrees that are the same object in both documents are skipped without being looked at
+    (e.g. after a `share=True` modification), and the other subtrees are compared by a
+    structural hash, computed once per subtree, before their contents. Lists are compared after
+    dropping their common first and last items, so inserting or removing items gives one
+    operation per item. The patched dictionaries get the key order of `new`: a key that comes
+    earlier than in `old` is removed and added again, like the keys after it.
+
+    Args:
+        old (dict | list): The original document.
+        new (dict | list): The modified document.
+
+    Returns:
+        list of dict: The operations, to be applied in order by `apply_patch`:
+        - {"op": "add", "path": ..., "value": ...}: adds a key, or inserts an item at a list position;
+        - {"op": "remove", "path": ...}: removes a key or a list item;
+        - {"op": "replace", "path": ..., "value": ...}: replaces a value.
+
+        Paths use the syntax of `flatten_dict` and `PathIndex`: keys are joined with "/" and list
+        positions are written as "[n]", starting from 1 (e.g. "A/B[2]/C"). The root is "".
+        The values are the objects of `new`, not copies.
+
+    Raises:
+        ValueError: If a key on the way to a change is not a string, is empty, or contains "/" or "[".
+
+    Example:
+        diff_documents({"A": {"B": [1, 2]}, "C": 1}, {"A": {"B": [1, 3]}, "D": 2})
+        # Returns: [{"op": "replace", "path": "A/B[2]", "value": 3},
+        #           {"op": "remove", "path": "C"}, {"op": "add", "path": "D", "value": 2}]
+    """
+    cache = {}
+    ops = []
+
+    # The records of a table are compared as a list of dictionaries.
+    if isinstance(old, RecordTable):
+        old = list(old)
+    if isinstance(new, RecordTable):
+        new = list(new)
+
+    def compare(a, b, path):
+        # Adds the operations for a pair of values at `path` and returns a walker for the pair
+        # of containers to compare, or None.
+        if a is b:
+            return None
+        if isinstance(a, RecordTable):
+            a = list(a)
+        if isinstance(b, RecordTable):
+            b = list(b)
+        if isinstance(a, dict) and isinstance(b, dict) or isinstance(a, list) and isinstance(b, list):
+            # Containers already hashed (as items of compared lists) are skipped when equal.
+            hash_a = cache.get(id(a))
+            if hash_a is not None and hash_a == cache.get(id(b)) and a == b:
+                return None
+            return compare_dicts(a, b, path) if isinstance(a, dict) else compare_lists(a, b, path)
+        if type(a) is not type(b) or a != b:
+            ops.append({"op": "replace", "path": path, "value": b})
+        return None
+
+    def compare_dicts(a, b, path):
+        moved = _moved_keys(a, b)
+        moving = set(moved)
+        for key, value in a.items():
+            if key not in b:
+                ops.append({"op": "remove", "path": _key_path(path, key)})
+                continue
+            if key in moving:
+                continue
+            other = b[key]
+            if value is other:
+                continue
+            if isinstance(value, _CONTAINERS) or isinstance(other, _CONTAINERS):
+                walker = compare(value, other, _key_path(path, key))
+                if walker is not None:
+                    yield walker
+            elif type(value) is not type(other) or value != other:
+                ops.append({"op": "replace", "path": _key_path(path, key), "value": other})
+        # The keys added at the end, in the order of `b`.
+        for key in moved:
+            if key in a:
+                ops.append({"op": "remove", "path": _key_path(path, key)})
+            ops.append({"op": "add", "path": _key_path(path, key), "value": b[key]})
+
+    def compare_lists(a, b, path):
+        start = 0
+        end_a = len(a)
+        end_b = len(b)
+        while start < end_a and start < end_b and _same(a[start], b[start], cache):
+            start += 1
+        while end_a > start and end_b > start and _same(a[end_a - 1], b[end_b - 1], cache):
+            end_a -= 1
+            end_b -= 1
+
+        # Items at the same positions are compared; the extra ones are removed (from the last,
+        # so the positions of the others do not move) or inserted.
+        common = min(end_a, end_b)
+        for index in range(start, common):
+            walker = compare(a[index], b[index], f"{path}[{index + 1}]")
+            if walker is not None:
+                yield walker
+        for index in range(end_a - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}[{index + 1}]"})
+        for index in range(common, end_b):
+            ops.append({"op": "add", "path": f"{path}[{index + 1}]", "value": b[index]})
+
+    walker = compare(old, new, "")
+    if walker is not None:
+        _drive(walker)
+    return ops
+
+
+# One segment of a path: a key followed by any number of list positions, e.g. "B[2]".
+_SEGMENT = re.compile(r"([^/\[]*)((?:\[\d+\])*)")
+
+
+def _parse_path(path):
+    # "A/B[2]/C" -> ["A", "B", 1, "C"]: keys as strings, list positions as 0-based integers.
+    steps = []
+    if path == "":
+        return steps
+    for segment in path.split("/"):
+        match = _SEGMENT.fullmatch(segment)
+        if match is None:
+            raise ValueError(f"Invalid path: {path!r}.")
+        key, positions = match.groups()
+        if key or not positions:
+            steps.append(key)
+        for position in re.findall(r"\d+", positions):
+            if int(position) < 1:
+                raise ValueError(f"Invalid path: {path!r} (list positions start from 1).")
+            steps.append(int(position) - 1)
+    return steps
+
+
+def apply_patch(data, ops):
+    """
+    Applies the operations of `diff_documents` to a document, in place.
+
+    Each operation only walks the path it addresses, so applying a patch costs in proportion to
+    the size of the change, not of the document. The values of the operations are copied into
+    the document, so it does not share objects with the patch.
+
+    Args:
+        data (dict | list): The document to modify.
+        ops (list of dict): The operations, as returned by `diff_documents`.
+
+    Returns:
+        dict | list: The patched document: `data` itself, or the new root value when an
+        operation replaces the root (path "").
+
+    Raises:
+        ValueError: If an operation is unknown or its path does not exist in the document.
+
+    Example:
+        document = {"A": {"B": [1, 2]}}
+        apply_patch(document, [{"op": "replace", "path": "A/B[2]", "value": 3}])
+        # Returns: {"A": {"B": [1, 3]}}
+    """
+    for op in ops:
+        kind = op.get("op")
+        path = op.get("path", "")
+        if kind not in ("add", "remove", "replace"):
+            raise ValueError(f"Unknown patch operation: {kind!r}.")
+        steps = _parse_path(path)
+        if not steps:
+            if kind == "remove":
+                raise ValueError("The root of the document cannot be removed.")
+            data = deepcopy(op["value"])
+            continue
+
+        try:
+            parent = data
+            for step in steps[:-1]:
+                parent = parent[step]
+            last = steps[-1]
+            if isinstance(parent, list) != isinstance(last, int):
+                raise TypeError(f"{type(parent).__name__} cannot be addressed with {last!r}")
+            if kind == "remove":
+                del parent[last]
+            elif kind == "add" and isinstance(parent, list):
+                if not 0 <= last <= len(parent):
+                    raise IndexError("list position out of range")
+                parent.insert(last, deepcopy(op["value"]))
+            else:
+                if kind == "replace" and isinstance(parent, list):
+                    parent[last]  # Raises IndexError for a missing position.
+                elif kind == "replace" and last not in parent:
+                    raise KeyError(last)
+                parent[last] = deepcopy(op["value"])
+        except (KeyError, IndexError, TypeError) as error:
+            raise ValueError(f"Cannot {kind} at {path!r}: {error}.") from None
+    return data
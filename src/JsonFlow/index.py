@@ -0,0 +1,318 @@
+import re
+import heapq
+import bisect
+
+from .columnar import RecordTable
+
+
+__all__ = ["PathIndex", "ValueIndex"]
+
+
+class PathIndex:
+    """
+    An index from the paths of a document to the nodes they address.
+
+    The document is walked once when the index is built. Afterwards, lookups by normalized
+    path, by key name and by literal `query_path` path are dictionary lookups instead of
+    traversals from the root.
+
+    Normalized paths use the syntax of `flatten_dict`: dictionary keys are joined with "/"
+    and list positions are written as "[n]", starting from 1 (e.g. "A/B[2]/C"). The root
+    document has the path "".
+
+    Keys containing "/" or "[" (or different keys with the same string, such as 1 and "1") can
+    give several nodes the same normalized path. `paths` keeps the first of them, `get` refuses
+    those paths, and `query_path` lookups are not affected: they are keyed on the keys themselves.
+
+    Attributes:
+    - data: The indexed document.
+    - paths (dict): Normalized path -> node, in document order.
+    - keys (dict): Key name -> positions (in document order) of the nodes stored under that key.
+    - ambiguous (set): The normalized paths shared by several nodes.
+
+    Note:
+        The index holds references to the nodes of `data`. It has to be rebuilt (or refreshed
+        with `refresh`) when the document is modified.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.paths = {}
+        self.keys = {}
+        self.ambiguous = set()
+        # The normalized path and the node at each position, the position of each (unambiguous)
+        # normalized path, and the positions of the values of each query path tuple.
+        self._order = []
+        self._nodes = []
+        self._positions = {}
+        self._query_paths = {}
+        self._build(data)
+
+    def _build(self, data):
+        paths = self.paths
+        keys = self.keys
+        order = self._order
+        nodes = self._nodes
+        positions = self._positions
+        query_paths = self._query_paths
+        ambiguous = self.ambiguous
+
+        paths[""] = data
+        positions[""] = 0
+        order.append("")
+        nodes.append(data)
+        # Stack entries: (iterator over the items of a container, its path, query path tuple or
+        # None, is it a dictionary). The nodes are numbered as they are reached, in document
+        # order. For dictionaries the query path is the one their keys extend; for lists it is
+        # the query path that fans out over their dictionary items. The records of a
+        # `RecordTable` are indexed as (new) dictionaries.
+        if isinstance(data, dict):
+            stack = [(iter(data.items()), "", (), True)]
+        elif isinstance(data, (list, RecordTable)):
+            stack = [(enumerate(data, 1), "", (), False)]
+        else:
+            return
+        while stack:
+            items, path, query, is_dict = stack[-1]
+            for key, value in items:
+                position = len(order)
+                if is_dict:
+                    child_path = f"{path}/{key}" if path else f"{key}"
+                    keys.setdefault(key, []).append(position)
+                    child_query = None
+                    if query is not None and isinstance(key, str):
+                        child_query = query + (key,)
+                        query_paths.setdefault(child_query, []).append(position)
+                else:
+                    child_path = f"{path}[{key}]"
+                    # Lists directly inside lists are not fanned out by `query_path`.
+                    child_query = query if isinstance(value, dict) else None
+                if child_path in paths:
+                    ambiguous.add(child_path)
+                else:
+                    paths[child_path] = value
+                    positions[child_path] = position
+                order.append(child_path)
+                nodes.append(value)
+                if isinstance(value, dict):
+                    stack.append((iter(value.items()), child_path, child_query, True))
+                    break
+                if isinstance(value, (list, RecordTable)):
+                    stack.append((enumerate(value, 1), child_path, child_query, False))
+                    break
+            else:
+                stack.pop()
+
+    def get(self, path, default=None):
+        """
+        Returns the node at a normalized path (e.g. "A/B[2]/C"), or `default` if there is none.
+
+        Raises:
+            ValueError: If several nodes have that path (see `ambiguous`).
+        """
+        if path in self.ambiguous:
+            raise ValueError(f"The path '{path}' addresses several nodes; some keys contain '/' or '['.")
+        return self.paths.get(path, default)
+
+    def find_keys(self, regex):
+        """
+        Returns the normalized paths of the nodes whose key matches `regex` (with `re.search`).
+
+        Only the distinct key names are matched against the pattern, and the paths are
+        returned in document order.
+        """
+        pattern = re.compile(regex)
+        matched = [positions for key, positions in self.keys.items() if pattern.search(str(key))]
+        return [self._order[position] for position in heapq.merge(*matched)]
+
+    def query_path(self, compiled_path):
+        """
+        Returns the values of a literal `CompiledPath`, like `query_path`, or None when the
+        path has non-literal segments and cannot be answered from the index.
+        """
+        if not compiled_path.is_literal:
+            return None
+        found = self._query_paths.get(tuple(text for _, text, _ in compiled_path.segments), ())
+        nodes = self._nodes
+        return [nodes[position] for position in found]
+
+    def refresh(self, key_path):
+        """
+        Updates the index after the value at a "A/B/C" key path (as used by `hard_modify`) changed.
+
+        Only a scalar replaced by a scalar can be updated in place. Returns False when the
+        index no longer describes the document and must be rebuilt.
+        """
+        node = self.data
+        for key in key_path.split("/"):
+            if not isinstance(node, dict) or key not in node:
+                return key_path not in self.paths
+            node = node[key]
+
+        if key_path not in self.paths or key_path in self.ambiguous:
+            return False
+        old = self.paths[key_path]
+        if isinstance(old, (dict, list)) or isinstance(node, (dict, list)):
+            return False
+        self.paths[key_path] = node
+        self._nodes[self._positions[key_path]] = node
+        return True
+
+
+# Characters with a meaning in regular expressions; a pattern's literal prefix stops at the first.
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
+def _literal_prefix(pattern):
+    """
+    Returns the text every string matched by `pattern` (with `re.match`) starts with, or "" when
+    it cannot be told from the pattern.
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags & (re.IGNORECASE | re.VERBOSE) or "|" in pattern.pattern:
+        return ""
+    source = pattern.pattern
+    position = 1 if source.startswith("^") else 0
+    prefix = []
+    while position < len(source):
+        char = source[position]
+        if char == "\\" and position + 1 < len(source) and not source[position + 1].isalnum():
+            prefix.append(source[position + 1])
+            position += 2
+        elif char in _REGEX_SPECIAL:
+            break
+        else:
+            prefix.append(char)
+            position += 1
+    # A quantifier that allows zero repetitions makes the last character optional.
+    if prefix and position < len(source) and source[position] in "*?{":
+        prefix.pop()
+    return "".join(prefix)
+
+
+class ValueIndex:
+    """
+    An index of the scalar values of a document, for repeated `find_values_by_depth` searches.
+
+    The document is walked once when the index is built. Every scalar value of a dictionary
+    is converted to a string once, and the values are grouped by that string, so a search
+    only tests the distinct strings. Prefix searches (and regular expressions starting with
+    literal text) use a sorted list of the distinct strings, and substring searches use a
+    trigram index, built on the first one.
+
+    All the searches return `(path, value)` tuples in document order, as `find_values_by_depth`
+    does: the path is a new list of the keys and list positions from the root.
+
+    Attributes:
+    - data: The indexed document.
+    - texts (dict): Value string -> positions (in document order) of the values with that string.
+
+    Note:
+        Like `PathIndex`, the index describes the document as it was when built. It has to be
+        rebuilt when the document is modified.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.texts = {}
+        # The path of each container holding values, as a tuple, and for each value the
+        # position of its container, its key and the value itself.
+        self._containers = []
+        self._entries = []
+        self._sorted = None
+        self._trigrams = None
+        self._build(data)
+
+    def _build(self, data):
+        texts = self.texts
+        containers = self._containers
+        entries = self._entries
+
+        # Stack entries: (iterator over the items of a container, its path, its position in
+        # `_containers` or None when it is a list). Values are visited in the order of
+        # `find_values_by_depth`: a container is searched before the items after it. The
+        # records of a `RecordTable` are indexed as a list of dictionaries.
+        if isinstance(data, dict):
+            containers.append(())
+            stack = [(iter(data.items()), (), 0)]
+        elif isinstance(data, (list, RecordTable)):
+            stack = [(iter(enumerate(data)), (), None)]
+        else:
+            return
+        while stack:
+            items, path, container = stack[-1]
+            for key, value in items:
+                if isinstance(value, dict):
+                    containers.append(path + (key,))
+                    stack.append((iter(value.items()), path + (key,), len(containers) - 1))
+                    break
+                if isinstance(value, (list, RecordTable)):
+                    stack.append((iter(enumerate(value)), path + (key,), None))
+                    break
+                if container is not None:
+                    position = len(entries)
+                    entries.append((container, key, value))
+                    text = str(value)
+                    found = texts.get(text)
+                    if found is None:
+                        texts[text] = [position]
+                    else:
+                        found.append(position)
+            else:
+                stack.pop()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _results(self, matched):
+        # `(path, value)` tuples, in document order, for lists of value positions.
+        containers = self._containers
+        entries = self._entries
+        output = []
+        for position in heapq.merge(*matched) if len(matched) > 1 else (matched[0] if matched else ()):
+            container, key, value = entries[position]
+            output.append(([*containers[container], key], value))
+        return output
+
+    def _with_prefix(self, prefix):
+        # The distinct strings starting with `prefix`, from the sorted list.
+        if self._sorted is None:
+            self._sorted = sorted(self.texts)
+        texts = self._sorted
+        start = bisect.bisect_left(texts, prefix)
+        end = start
+        while end < len(texts) and texts[end].startswith(prefix):
+            end += 1
+        return texts[start:end]
+
+    def find(self, regex):
+        """
+        Returns the values whose string matches `regex` (with `re.match`), the same as
+        `find_values_by_depth(data, regex)`.
+        """
+        pattern = re.compile(regex)
+        prefix = _literal_prefix(pattern)
+        candidates = self._with_prefix(prefix) if prefix else self.texts
+        return self._results([self.texts[text] for text in candidates if pattern.match(text)])
+
+    def find_prefix(self, prefix):
+        """Returns the values whose string starts with `prefix`."""
+        return self._results([self.texts[text] for text in self._with_prefix(prefix)])
+
+    def find_literal(self, text):
+        """Returns the values whose string is equal to `text`."""
+        found = self.texts.get(text)
+        return self._results([found] if found is not None else [])
+
+    def find_contains(self, text):
+        """Returns the values whose string contains `text`."""
+        if len(text) < 3:
+            candidates = self.texts
+        else:
+            if self._trigrams is None:
+                trigrams = self._trigrams = {}
+                for candidate in self.texts:
+                    for start in range(len(candidate) - 2):
+                        trigrams.setdefault(candidate[start:start + 3], set()).add(candidate)
+            sets = sorted((self._trigrams.get(text[start:start + 3], set()) for start in range(len(text) - 2)), key=len)
+            candidates = set.intersection(*sets) if sets[0] else ()
+        return self._results([self.texts[candidate] for candidate in candidates if text in candidate])
@@ -1,13 +1,47 @@
-from .main import query, query_path, json_pseudo_format, soft_modify, hard_modify
+from .main import query, query_path, query_paths, json_pseudo_format, soft_modify, hard_modify, compile_query, compile_path, CompiledQuery
+from .main import _modify_all_shared
+from .index import PathIndex, ValueIndex
+from .columnar import RecordTable
+from .profiling import instrument
+from .diff import diff_documents, apply_patch
 
 from copy import deepcopy
+from collections import OrderedDict
+
+
+__all__ = ["JsoniFy"]
+
+
+# The number of compiled query plans a `JsoniFy` keeps for `__call__(..., cache=True)`.
+PLAN_CACHE_SIZE = 128
 
 
 class JsoniFy:
-  def __init__(self, data):
+  def __init__(self, data, index = False, columnar = False):
+    """
+    Wraps a document (nested dictionaries and lists) for querying and modification.
+
+    Args:
+        data (dict | list | RecordTable): The document.
+        index (bool, optional): If True, `query_path` answers literal paths from a `PathIndex`
+            built lazily on first use, so repeated lookups do not rescan the document.
+            `get` and `find_keys` always use the index. Defaults to False.
+        columnar (bool, optional): If True and `data` is a list of records (dictionaries), the
+            records are stored in a `RecordTable`, one list per key, which takes much less memory
+            when they share their keys. Queries, paths and `flatten_dict` then work a column at
+            a time, and filtering the records with `[{...}]` criteria returns a `RecordTable`.
+            Defaults to False.
+    """
+    if columnar and isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        data = RecordTable(data)
     self.data = data
+    self.use_index = index
+    self._plans = OrderedDict()
+    self._index = None
+    self._value_index = None
 
-  def __call__(self, criteria, inplace = False):
+  @instrument()
+  def __call__(self, criteria, inplace = False, cache = False, memo = None):
     """
     Filters the instance's structured data using the specified criteria.
 
@@ -16,11 +50,18 @@ class JsoniFy:
     criteria are used to filter the data and return only the corresponding fields.
 
     Args:
-    - criteria (dict | list | bool | callable): The criteria to be used for filtering.
+    - criteria (dict | list | bool | callable | CompiledQuery): The criteria to be used for filtering.
       - If a dictionary, the method will return a new dictionary with corresponding fields.
       - If a list, it will return a list of filtered data.
       - If True, it will return the original data without filtering.
       - If a callable, it will apply the function to the respective value in the dictionary.
+      - If a `CompiledQuery` (see `compile_query`), the precompiled plan is applied.
+    - cache (bool, optional): If True, the criteria are compiled once and the plan is kept
+      on the instance, keyed by the criteria object. Later calls with the same object reuse
+      the plan, so do not mutate the criteria in place between calls. The `PLAN_CACHE_SIZE`
+      most recently used plans are kept. Defaults to False.
+    - memo (Memo, optional): A memo for the criteria functions declared with `pure` (see `query`).
+      Defaults to None.
 
     Returns:
     - dict | list | None: The filtered data as per the provided criteria or None if the criteria
@@ -37,12 +78,31 @@ class JsoniFy:
         criteria = [{"name": True}, {"name": lambda x: x.lower()}]
         result = instance(criteria)
     """
+    if cache:
+        criteria = self._cached_plan(criteria)
+
     if inplace:
         data = deepcopy(self.data)
-        return query(data, criteria)
+        return query(data, criteria, memo)
     else:
-       return query(self.data, criteria)
+       return query(self.data, criteria, memo)
+
+  def _cached_plan(self, criteria):
+    if isinstance(criteria, CompiledQuery):
+        return criteria
+    key = id(criteria)
+    cached = self._plans.get(key)
+    # The criteria object is stored alongside the plan so its id cannot be reused while cached.
+    if cached is None or cached[0] is not criteria:
+        cached = (criteria, compile_query(criteria))
+        self._plans[key] = cached
+        # The least recently used plans are dropped, so fresh criteria do not grow the cache.
+        while len(self._plans) > PLAN_CACHE_SIZE:
+            self._plans.popitem(last=False)
+    self._plans.move_to_end(key)
+    return cached[1]
        
+  @instrument()
   def query_path(self, key_path):
     """
     Accesses nested values within the instance's data using a path of keys which can contain regular expressions.
@@ -60,24 +120,119 @@ class JsoniFy:
             - If key_path is a string: A list of values corresponding to the key path or an empty list 
               if no match is found.
             - If key_path is a list of strings: A list of lists, where each inner list corresponds to the 
-              results for each key path.
+              results for each key path. Shared prefixes of the paths are traversed only once.
 
     Example:
         # Assuming `instance` is an instance of the class with appropriate data
         result = instance.query_path("A/B1/C")  # Single path query
         multiple_results = instance.query_path(["A/B1/C", "A/B2/C"])  # Multiple path queries
     """
+    if self.use_index:
+      if isinstance(key_path, list):
+        return [self._indexed_query_path(kp) for kp in key_path]
+      return self._indexed_query_path(key_path)
+
     if isinstance(key_path,list):
-      result = []
-      for kp in key_path:
-        result.append(
-           query_path(self.data, kp) 
-        )      
-      return result
+      # Paths sharing a prefix are walked together (see `query_paths`).
+      return query_paths(self.data, key_path)
 
     elif isinstance(key_path, str):
       return query_path(self.data, key_path)
+
+  def _indexed_query_path(self, key_path):
+    compiled = compile_path(key_path)
+    result = self.path_index().query_path(compiled)
+    if result is None:
+      return query_path(self.data, compiled)
+    return result
+
+  def path_index(self):
+    """
+    Returns the `PathIndex` of the instance's data, building it on first use.
+
+    The index is rebuilt automatically when `self.data` is replaced, and is updated or dropped
+    by `soft_insert` and `hard_insert` when they run with `inplace=True`. Call `invalidate_index`
+    after modifying the data in any other way.
+    """
+    if self._index is None or self._index.data is not self.data:
+      self._index = PathIndex(self.data)
+    return self._index
+
+  def invalidate_index(self):
+    """Drops the path and value indexes; they are rebuilt on the next lookup that needs them."""
+    self._index = None
+    self._value_index = None
+
+  def value_index(self):
+    """
+    Returns the `ValueIndex` of the instance's data, building it on first use.
+
+    Like the path index, it is rebuilt when `self.data` is replaced and dropped by the methods
+    that modify the data in place. Call `invalidate_index` after modifying the data in any other way.
+    """
+    if self._value_index is None or self._value_index.data is not self.data:
+      self._value_index = ValueIndex(self.data)
+    return self._value_index
+
+  @instrument()
+  def find_values(self, pattern, kind = "regex"):
+    """
+    Searches the values of the instance's data, using the value index.
+
+    The index is built on the first search and reused by the next ones, so searching the same
+    document with many patterns converts and walks its values only once.
+
+    Args:
+        pattern (str): What to search for, depending on `kind`.
+        kind (str, optional): How the string of each value is compared with `pattern`:
+            - "regex": matched with `re.match`, as in `find_values_by_depth` (the default);
+            - "prefix": starts with `pattern`;
+            - "literal": equal to `pattern`;
+            - "contains": contains `pattern`.
+
+    Returns:
+        list of tuple: `(path, value)` tuples in document order, the same as
+        `find_values_by_depth(self.data, pattern)` for a regular expression.
+
+    Example:
+        instance.find_values(r"Value.")  # Returns: [(['A', 'B', 0, 'D'], 'Value2'), ...]
+        instance.find_values("Value", kind="prefix")
+    """
+    searches = {"regex": "find", "prefix": "find_prefix", "literal": "find_literal", "contains": "find_contains"}
+    if kind not in searches:
+      raise ValueError("kind must be one of 'regex', 'prefix', 'literal' or 'contains'.")
+    return getattr(self.value_index(), searches[kind])(pattern)
+
+  def get(self, path, default = None):
+    """
+    Returns the node at a normalized path, using the path index.
+
+    Args:
+        path (str): A path in the `flatten_dict` syntax, e.g. "A/B[2]/C" (list positions start at 1).
+        default (optional): The value returned when the path does not exist. Defaults to None.
+
+    Raises:
+        ValueError: If several nodes have the path, because some keys contain "/" or "[".
+
+    Example:
+        instance.get("A/B[1]/C")  # Returns: {'Text': 'Test text'}
+    """
+    return self.path_index().get(path, default)
+
+  @instrument()
+  def find_keys(self, regex):
+    """
+    Returns the normalized paths (e.g. "A/B[2]/C") of the keys matching `regex`, using the path index.
+
+    Each distinct key name is matched once with `re.search`, and the paths are returned in
+    document order.
+
+    Example:
+        instance.find_keys(r"^Te")  # Returns: ['A/B[1]/C/Text', 'A/B[2]/C/Text', 'A/E/Text']
+    """
+    return self.path_index().find_keys(regex)
   
+  @instrument()
   def pseudo_format(self, bullet = "-", indent = 2, custom_format_func = None, indentation_func = None):
     """
     Formats the keys of the instance's data with custom representation based on the provided options.
@@ -118,7 +273,8 @@ class JsoniFy:
         indentation_func = indentation_func,
         custom_format_func = custom_format_func)))
   
-  def soft_insert(self, fun, inplace = False):
+  @instrument()
+  def soft_insert(self, fun, inplace = False, share = False, memo = None):
     """
     Applies the specified function to the instance's data in a non-destructive manner.
 
@@ -132,6 +288,11 @@ class JsoniFy:
             * It should return the modified data.
         inplace (bool, optional): Whether to modify the instance's data in place or return a modified copy.
             Defaults to False, which means a modified copy of the data will be returned without changing the instance's data.
+        share (bool, optional): If True (and `inplace` is False), the returned copy only duplicates the
+            nodes on the way to replaced values and shares the rest with the instance's data
+            (see `soft_modify`). Defaults to False.
+        memo (Memo, optional): A memo for `fun`, if it is declared with `pure` (see `soft_modify`).
+            Defaults to None.
 
     Returns:
         dict | None: 
@@ -142,13 +303,22 @@ class JsoniFy:
         The actual modification logic is managed by the `soft_modify` function; this method serves as an interface 
         for the class's data.
     """
-    if inplace:
-        soft_modify(self.data, fun, inplace)
+    if isinstance(self.data, RecordTable):
+        # The records are modified as dictionaries and stored by column again.
+        records = soft_modify(self.data.to_records(), fun, inplace, share, memo)
+        if not inplace:
+            return RecordTable(records)
+        self.data = RecordTable(records)
+        self.invalidate_index()
+    elif inplace:
+        soft_modify(self.data, fun, inplace, memo=memo)
+        self.invalidate_index()
     else:
-        return soft_modify(self.data, fun, inplace)
+        return soft_modify(self.data, fun, inplace, share, memo)
 
 
-  def hard_insert(self, paths, funs, inplace=False):
+  @instrument()
+  def hard_insert(self, paths, funs, inplace=False, share=False, combine=False):
     """
     Modifies values in the instance's data based on given paths and functions.
 
@@ -163,10 +333,17 @@ class JsoniFy:
             - If a list of callables is provided, each function in the list will be applied to the corresponding path.
         inplace (bool, optional): If True, modifies the original data in place.
             Otherwise, returns a list of modified copies. Default is False.
+        share (bool, optional): If True (and `inplace` is False), each copy only duplicates the
+            dictionaries on the way to the modified value and shares everything else with the
+            instance's data (see `hard_modify`). Default is False.
+        combine (bool, optional): If True (and `inplace` is False), all paths are applied to a
+            single result that shares every untouched subtree with the instance's data, and that
+            result is returned instead of a list. Default is False.
 
     Returns:
-        list of dict | None: 
-            - If `inplace` is False: Returns a list of modified copies of the instance's data based on the provided paths and functions.
+        list of dict | dict | None: 
+            - If `inplace` is False: Returns a list of modified copies of the instance's data based on the provided paths and functions,
+              or a single modified document if `combine` is True.
             - If `inplace` is True: Modifies the instance's data in place and returns None.
 
     Example:
@@ -185,14 +362,152 @@ class JsoniFy:
                 hard_modify(self.data, path, funs[id], inplace)
             else:
                 hard_modify(self.data, path, funs, inplace)
+            if self._index is not None and not self._index.refresh(path):
+                self.invalidate_index()
+        # The value index cannot be updated in place.
+        self._value_index = None
+    elif combine:
+        if not funs_id:
+            funs = [funs] * len(paths)
+        return _modify_all_shared(self.data, paths, funs)
     else: 
         results = []
         for id, path in enumerate(paths):
             if funs_id:
-                res = hard_modify(self.data, path, funs[id], inplace)
+                res = hard_modify(self.data, path, funs[id], inplace, share)
             else:
-                res = hard_modify(self.data, path, funs, inplace)
+                res = hard_modify(self.data, path, funs, inplace, share)
 
             results.append(res)
         return results
 
+  @instrument()
+  def map_records(self, function, processes = None, chunk_size = 1000, errors = "raise", pool = None):
+    """
+    Applies a function to every record of the instance's data (a list of records) in a process pool.
+
+    The records are split into chunks processed by worker processes, and the results come back
+    in the order of the records, the same as `[function(record) for record in self.data]`
+    (see `map_records`).
+
+    Args:
+        function (callable): Called with one record; returns its result, which must be picklable.
+            E.g. `flatten_dict` or `functools.partial(soft_modify, value_function=func)`.
+        processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of records sent to a worker at a time. Defaults to 1000.
+        errors (str, optional): "raise" to raise a `BatchError` listing the failed records once
+            all records are processed, or "return" to get a `RecordError` in place of each
+            failed result. Defaults to "raise".
+        pool (RecordPool, optional): Worker processes reused across calls (see `RecordPool`).
+            Defaults to None.
+
+    Returns:
+        list: The result of each record, in order.
+
+    Example:
+        from functools import partial
+        flat = JsoniFy(records).map_records(flatten_dict, chunk_size=5000)
+        modified = JsoniFy(records).map_records(partial(soft_modify, value_function=func))
+    """
+    if not isinstance(self.data, (list, RecordTable)):
+        raise ValueError("data must be a list of records")
+    # multiprocessing is slow to import: `parallel` is loaded on first use.
+    from .parallel import map_records
+    return map_records(self.data, function, processes, chunk_size, errors, pool)
+
+  @instrument()
+  def query_records(self, criteria, processes = None, chunk_size = 1000, errors = "raise", pool = None):
+    """
+    Filters every record of the instance's data (a list of records) with `criteria`, in a process pool.
+
+    The criteria are compiled once (see `compile_query`) and the plan is applied to the
+    records by `map_records`. The results are the same as `[query(record, criteria) for record in self.data]`.
+
+    Args:
+        criteria (dict | list | bool | callable | CompiledQuery): The criteria applied to each record.
+        processes, chunk_size, errors, pool: As in `map_records`.
+
+    Returns:
+        list: The filtered records, in order.
+
+    Example:
+        names = JsoniFy(records).query_records({"name": True, "address": {"city": str.upper}})
+    """
+    return self.map_records(compile_query(criteria), processes, chunk_size, errors, pool)
+
+  @instrument()
+  def gather_path(self, key_path, dtype = None):
+    """
+    Gathers the values of a key path across the instance's data into a NumPy array (see `gather_path`).
+
+    Example:
+        prices = JsoniFy(data).gather_path("items/price", dtype=float)
+    """
+    from .vector import gather_path
+    return gather_path(self.data, key_path, dtype)
+
+  @instrument()
+  def transform_path(self, key_path, function, inplace = False, as_array = False, dtype = None):
+    """
+    Applies a vectorized NumPy function to the values of a key path, all at once (see `transform_path`).
+
+    Args:
+        key_path (str): The path of keys, in the format accepted by `query_path`.
+        function (callable): Called once with the array of values; returns an array of the same length.
+        inplace (bool, optional): If True, the values are replaced in the instance's data and
+            None is returned. Defaults to False, which returns a modified copy.
+        as_array (bool, optional): If True, the result of `function` is returned as an array and
+            the data is left unchanged. Defaults to False.
+        dtype (optional): The NumPy dtype of the gathered array.
+
+    Example:
+        discounted = JsoniFy(data).transform_path("items/price", lambda prices: prices * 0.9)
+    """
+    from .vector import transform_path
+    result = transform_path(self.data, key_path, function, inplace, as_array, dtype)
+    if inplace and not as_array:
+        # Only scalars are replaced, but an index may hold the old ones.
+        self.invalidate_index()
+        return None
+    return result
+
+  @instrument()
+  def diff(self, other):
+    """
+    Returns the operations that turn the instance's data into another document (see `diff_documents`).
+
+    Args:
+        other (JsoniFy | dict | list): The other document.
+
+    Returns:
+        list of dict: "add", "remove" and "replace" operations addressed with paths such as
+        "A/B[2]/C", to be applied with `patch` (or `apply_patch`) on a copy of this document.
+
+    Example:
+        ops = JsoniFy(old_config).diff(new_config)
+        JsoniFy(old_config_copy).patch(ops)  # old_config_copy is now equal to new_config
+    """
+    if isinstance(other, JsoniFy):
+      other = other.data
+    return diff_documents(self.data, other)
+
+  @instrument()
+  def patch(self, ops):
+    """
+    Applies the operations of `diff` to the instance's data, in place (see `apply_patch`).
+
+    Each operation only walks the path it addresses, so the cost depends on the size of the
+    change, not of the document.
+
+    Args:
+        ops (list of dict): The operations, as returned by `diff`.
+
+    Raises:
+        ValueError: If an operation is unknown or its path does not exist.
+    """
+    if isinstance(self.data, RecordTable):
+      # The records are patched as dictionaries and stored by column again.
+      self.data = RecordTable(apply_patch(self.data.to_records(), ops))
+    else:
+      self.data = apply_patch(self.data, ops)
+    self.invalidate_index()
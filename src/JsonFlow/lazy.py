@@ -0,0 +1,364 @@
+import re
+import json
+import mmap
+import copy
+import codecs
+from json.scanner import make_scanner
+from pathlib import Path
+
+from .backends import get_json_backend
+
+
+__all__ = ["LoadedDict", "LoadedList", "LazyDict", "LazyList", "load_lazy_json"]
+
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Strings are matched whole so the brackets they contain are not counted.
+_STRUCTURAL = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+# Used to skip large containers: strings without escapes, and the bytes that are not brackets.
+_PLAIN_STRING = re.compile(rb'"[^"]*"')
+_NOT_BRACKETS = bytes(byte for byte in range(256) if byte not in b"[]{}")
+_TO_PARENTHESES = bytes.maketrans(b"[]{}", b"()()")
+# Containers are scanned token by token for their first `_SCAN_BYTES` bytes, then skipped
+# `_CHUNK_BYTES` at a time.
+_SCAN_BYTES = 4096
+_CHUNK_BYTES = 65536
+_CANCEL_PASSES = 32
+# Nested containers up to this size are decoded with their parent instead of staying lazy.
+_SMALL_BYTES = 4096
+# Decodes one value from a str, returning it with the index just past it.
+_scan_value = make_scanner(json.JSONDecoder())
+_LITERAL = re.compile(rb'[^ \t\n\r,\]}]+')
+_CONSTANTS = {b"true": True, b"false": False, b"null": None}
+
+_QUOTE, _COMMA, _COLON = ord('"'), ord(','), ord(':')
+_OPEN_OBJECT, _CLOSE_OBJECT, _OPEN_ARRAY, _CLOSE_ARRAY = ord('{'), ord('}'), ord('['), ord(']')
+
+# The key held by unread `LazyDict` nodes, so that C code that checks the size of a dict
+# before calling its methods (like the `json` encoder) does not take them for empty.
+_UNREAD = object()
+
+
+class LoadedDict(dict):
+    """A JSON object of a lazily loaded document whose members have been read; a plain dict."""
+
+
+class LoadedList(list):
+    """A JSON array of a lazily loaded document whose items have been read; a plain list."""
+
+
+class LazyDict(dict):
+    """
+    A JSON object of a lazily loaded document (see `load_lazy_json`) that has not been read yet.
+
+    On first access of any kind (item access, iteration, `len`, `in`, comparison, copy...) the
+    members of the object are read from the file and the node turns into a `LoadedDict`,
+    which behaves exactly like a dict. Nested objects and arrays stay lazy until they are
+    reached in turn, so only the parts of the document that are used get decoded.
+    """
+
+    def __init__(self, source, start):
+        dict.__setitem__(self, _UNREAD, None)
+        self._lazy = (source, start)
+
+    def _load(self):
+        source, start = self._lazy
+        members = source.read_object(start)
+        del self._lazy
+        dict.clear(self)
+        dict.update(self, members)
+        # From now on the node is a plain dict, without the cost of the lazy methods.
+        self.__class__ = LoadedDict
+
+    def __deepcopy__(self, memo):
+        self._load()
+        return copy.deepcopy(self, memo)
+
+    def __copy__(self):
+        self._load()
+        return copy.copy(self)
+
+
+class LazyList(list):
+    """
+    A JSON array of a lazily loaded document (see `load_lazy_json`) that has not been read yet.
+
+    On first access of any kind its items are read from the file and the node turns into a
+    `LoadedList`, which behaves exactly like a list. Like `LazyDict`, the objects and arrays
+    it holds stay lazy until they are reached.
+    """
+
+    def __init__(self, source, start):
+        self._lazy = (source, start)
+
+    def _load(self):
+        source, start = self._lazy
+        items = source.read_array(start)
+        del self._lazy
+        list.extend(self, items)
+        self.__class__ = LoadedList
+
+    __deepcopy__ = LazyDict.__deepcopy__
+    __copy__ = LazyDict.__copy__
+
+    def __radd__(self, other):
+        # `list + LazyList`: read the items, then let the list on the left concatenate them.
+        self._load()
+        return NotImplemented
+
+
+def _loading(name):
+    # A method that reads the node, then runs the dict or list method of the same name.
+    def method(self, *args, **kwargs):
+        self._load()
+        return getattr(self, name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+_SHARED_METHODS = (
+    "__getitem__", "__setitem__", "__delitem__", "__iter__", "__reversed__", "__len__", "__contains__",
+    "__eq__", "__ne__", "__repr__", "__reduce_ex__", "__sizeof__", "pop", "clear", "copy",
+)
+for _name in _SHARED_METHODS + (
+    "__or__", "__ror__", "__ior__", "get", "keys", "values", "items", "popitem", "setdefault", "update",
+):
+    setattr(LazyDict, _name, _loading(_name))
+for _name in _SHARED_METHODS + (
+    "__lt__", "__le__", "__gt__", "__ge__", "__add__", "__iadd__", "__mul__", "__rmul__",
+    "__imul__", "append", "extend", "insert", "remove", "index", "count", "sort", "reverse",
+):
+    setattr(LazyList, _name, _loading(_name))
+
+
+class _LazySource:
+    """
+    The mapped text of a lazily loaded document.
+
+    Containers are read one level at a time: reading an object or an array decodes its keys,
+    scalars and small containers, while large nested containers are only skipped over (their
+    brackets matched) and represented by `LazyDict` and `LazyList` nodes pointing at their
+    offset.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.loads = get_json_backend().loads
+
+    def _error(self, message, position):
+        # Only the text before the error is decoded, to report its line and column.
+        prefix = self.buffer[:position].decode("utf-8", "replace")
+        return json.JSONDecodeError(message, prefix, len(prefix))
+
+    def _skip_whitespace(self, position):
+        return _WHITESPACE.match(self.buffer, position).end()
+
+    def _char(self, position):
+        try:
+            return self.buffer[position]
+        except IndexError:
+            raise self._error("Unexpected end of JSON input", position) from None
+
+    def _string(self, position):
+        match = _STRING.match(self.buffer, position)
+        if match is None:
+            raise self._error("Unterminated string", position)
+        raw = match.group()
+        if b"\\" in raw:
+            return json.loads(raw), match.end()
+        return raw[1:-1].decode("utf-8"), match.end()
+
+    def _skip_container(self, position):
+        # Returns the offset just past the object or array starting at `position`. The first
+        # bytes are scanned token by token; past them the container is a large one, and the
+        # rest is skipped a chunk at a time.
+        depth = 0
+        buffer = self.buffer
+        limit = position + _SCAN_BYTES
+        start = position
+        for match in _STRUCTURAL.finditer(buffer, position):
+            char = buffer[match.start()]
+            if char != _QUOTE:
+                if char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return match.end()
+            if match.end() >= limit:
+                return self._skip_chunks(match.end(), depth, start)
+        raise self._error("Unterminated object or array", start)
+
+    def _skip_chunks(self, position, depth, start):
+        # `position` is outside any string, `depth` containers deep into the one being skipped.
+        buffer = self.buffer
+        while True:
+            chunk = buffer[position:position + _CHUNK_BYTES]
+            if not chunk:
+                raise self._error("Unterminated object or array", start)
+            if b"\\" not in chunk:
+                # Without escapes, the quotes pair up; a chunk ending inside a string is cut
+                # before its opening quote. What remains of the brackets once the strings are
+                # removed and the matching pairs cancelled is ")" * closed + "(" * opened.
+                if chunk.count(b'"') % 2:
+                    chunk = chunk[:chunk.rfind(b'"')]
+                brackets = _PLAIN_STRING.sub(b"", chunk).translate(_TO_PARENTHESES, _NOT_BRACKETS)
+                # Each pass cancels one level of nesting; deeply nested chunks are scanned instead.
+                for _ in range(_CANCEL_PASSES):
+                    if b"()" not in brackets:
+                        break
+                    brackets = brackets.replace(b"()", b"")
+                closed = brackets.find(b"(")
+                if closed == -1:
+                    closed = len(brackets)
+                if chunk and closed < depth and b"()" not in brackets:
+                    # The container does not end in this chunk.
+                    depth += len(brackets) - 2 * closed
+                    position += len(chunk)
+                    continue
+            # The container may end in this chunk (or the chunk has escapes): scan it token by token.
+            limit = position + len(chunk)
+            for match in _STRUCTURAL.finditer(buffer, position):
+                char = buffer[match.start()]
+                if char != _QUOTE:
+                    if char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            return match.end()
+                if match.end() >= limit:
+                    position = match.end()
+                    break
+            else:
+                raise self._error("Unterminated object or array", start)
+
+    def read_value(self, position):
+        """Returns the value starting at `position` and the offset just past it."""
+        char = self._char(position)
+        if char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+            # Small containers are decoded at once: the text of the next `_SMALL_BYTES` bytes
+            # (without a trailing incomplete character) holds them whole.
+            try:
+                text = codecs.utf_8_decode(self.buffer[position:position + _SMALL_BYTES], "strict", False)[0]
+                value, end = _scan_value(text, 0)
+            except (StopIteration, ValueError, RecursionError):
+                pass
+            else:
+                return value, position + (end if text.isascii() else len(text[:end].encode("utf-8")))
+            end = self._skip_container(position)
+            if end - position <= _SMALL_BYTES:
+                # Invalid JSON: the backend reports the error.
+                try:
+                    return self.loads(self.buffer[position:end]), end
+                except json.JSONDecodeError as e:
+                    raise self._error(e.msg, position + e.pos) from None
+            lazy = LazyDict if char == _OPEN_OBJECT else LazyList
+            return lazy(self, position), end
+        if char == _QUOTE:
+            return self._string(position)
+        match = _LITERAL.match(self.buffer, position)
+        if match is None:
+            raise self._error("Expecting value", position)
+        literal = match.group()
+        if literal in _CONSTANTS:
+            return _CONSTANTS[literal], match.end()
+        try:
+            return json.loads(literal), match.end()
+        except json.JSONDecodeError:
+            raise self._error("Expecting value", position) from None
+
+    def read_object(self, position):
+        """Returns the (key, value) pairs of the object starting at `position`."""
+        members = []
+        position = self._skip_whitespace(position + 1)
+        if self._char(position) == _CLOSE_OBJECT:
+            return members
+        while True:
+            if self._char(position) != _QUOTE:
+                raise self._error("Expecting property name enclosed in double quotes", position)
+            key, position = self._string(position)
+            position = self._skip_whitespace(position)
+            if self._char(position) != _COLON:
+                raise self._error("Expecting ':' delimiter", position)
+            position = self._skip_whitespace(position + 1)
+            value, position = self.read_value(position)
+            members.append((key, value))
+            position = self._skip_whitespace(position)
+            char = self._char(position)
+            if char == _CLOSE_OBJECT:
+                return members
+            if char != _COMMA:
+                raise self._error("Expecting ',' delimiter", position)
+            position = self._skip_whitespace(position + 1)
+
+    def read_array(self, position):
+        """Returns the items of the array starting at `position`."""
+        items = []
+        position = self._skip_whitespace(position + 1)
+        if self._char(position) == _CLOSE_ARRAY:
+            return items
+        while True:
+            value, position = self.read_value(position)
+            items.append(value)
+            position = self._skip_whitespace(position)
+            char = self._char(position)
+            if char == _CLOSE_ARRAY:
+                return items
+            if char != _COMMA:
+                raise self._error("Expecting ',' delimiter", position)
+            position = self._skip_whitespace(position + 1)
+
+
+def load_lazy_json(source):
+    """
+    Loads a JSON document lazily, decoding its objects only when they are accessed.
+
+    A file is memory-mapped instead of read. The root value is returned right away:
+    objects and arrays are returned as `LazyDict` and `LazyList` nodes, which read one level
+    of the mapped text on first access and then behave exactly like dicts and lists. Objects
+    and arrays of a few KiB are decoded at once with their parent. Walking a few paths of a
+    large document (with `query_path`, `JsoniFy.__call__` or plain `[]` access) therefore
+    only decodes the values on those paths; the rest of the document is only scanned to find
+    where its containers end.
+
+    Args:
+        source (str | Path | bytes): The path to a JSON file, or the raw JSON bytes.
+
+    Returns:
+        The root value: a `LazyDict`, a `LazyList` or a scalar.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        json.JSONDecodeError: If the text read so far is not valid JSON. Errors in parts of the
+            document that are skipped over are only raised when those parts are accessed, or
+            not at all.
+
+    Note:
+        The file stays mapped while nodes of the document are alive, so it should not be
+        modified in the meantime.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buffer = bytes(source)
+    else:
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"The file '{source}' was not found.")
+        with path.open('rb') as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                raise json.JSONDecodeError("Expecting value", "", 0) from None
+
+    lazy_source = _LazySource(buffer)
+    # A UTF-8 byte order mark is skipped, as when decoding with "utf-8-sig".
+    start = lazy_source._skip_whitespace(3 if buffer[:3] == b"\xef\xbb\xbf" else 0)
+    # The end of the root container is not needed, so the document is not scanned yet.
+    if buffer[start:start + 1] == b"{":
+        return LazyDict(lazy_source, start)
+    if buffer[start:start + 1] == b"[":
+        return LazyList(lazy_source, start)
+    value, _ = lazy_source.read_value(start)
+    return value
@@ -1,24 +1,152 @@
 import re
 import os
 import json
+import gzip
 from pathlib import Path
+from functools import lru_cache
+
+from .backends import get_json_backend
+from .lazy import load_lazy_json
+from .columnar import RecordTable
+from .profiling import instrument
+from .memo import _memoizing, _active_memo, _copy_shared, _NOT_FOUND
 
 # from pprint import pprint
 # import threading
 
 
-from copy import deepcopy
+from copy import copy, deepcopy
+
+
+__all__ = [
+    "traverse", "query", "CompiledQuery", "compile_query", "CompiledPath", "compile_path",
+    "query_path", "query_paths", "json_pseudo_format", "soft_modify", "hard_modify", "deep_merge",
+    "merge_content", "Merger", "filter", "structure_data", "flatten_dict", "iter_flatten",
+    "save_dict_as_json_to_folder", "read_json_file", "iter_jsonl", "write_jsonl",
+    "find_keys_by_regex", "find_keys_by_patterns", "find_values_by_depth",
+]
+
+
+
+
+
+
+### traversal core
+
+
+# Walkers with a recursive fast path (see `soft_modify`) call themselves down to this depth,
+# which is faster on ordinary documents, and hand deeper subtrees to `_drive`.
+RECURSION_DEPTH = 200
+
+
+def _walked(count):
+    # Receives the number of nodes a recursive fast path walked itself, without `_drive`. It is
+    # only replaced while profiling, to count them (see `profiling`).
+    pass
+
+
+def _drive(walker):
+    """
+    Runs a tree walker with an explicit stack instead of the Python call stack.
+
+    A walker is a generator that handles one node and yields a new walker for each child
+    it wants to descend into, exactly where a recursive function would call itself. The
+    child is run to completion before the parent resumes, so the visiting order (and any
+    work done after the `yield`) is the same as with recursion, while the depth of the
+    input is only limited by memory.
+    """
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    current = walker
+    while True:
+        for child in current:
+            push(current)
+            current = child
+            break
+        else:
+            if not stack:
+                return
+            current = pop()
+
+
+def _iter_drive(walker, output):
+    """
+    Runs a tree walker like `_drive`, yielding the items the walkers append to `output`.
+
+    The items are handed out as soon as the walker that produced them yields, so only
+    the results of one node at a time are buffered.
+    """
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    current = walker
+    while True:
+        for child in current:
+            if output:
+                yield from output
+                output.clear()
+            push(current)
+            current = child
+            break
+        else:
+            if output:
+                yield from output
+                output.clear()
+            if not stack:
+                return
+            current = pop()
+
 
+@instrument()
+def traverse(data, visit=None, leave=None):
+    """
+    Walks every node of a nested structure of dictionaries and lists, without recursion.
 
+    The callbacks receive the path to the node being visited, so tree walkers can be
+    written without handling the stack themselves. The input can be arbitrarily deep.
 
+    Args:
+        data (dict | list): The structure to walk. The root itself is not visited.
+        visit (callable, optional): Called in pre-order for every node as
+            `visit(path, value, parent)`. If it returns False, the children of `value` are skipped.
+        leave (callable, optional): Called in post-order as `leave(path, value, parent)`, after
+            the children of `value` (if any) have been walked.
+
+    Callback arguments:
+        - path (list): The keys and list indices from the root to `value`. The same list is
+          reused while walking; copy it (e.g. `list(path)`) to keep it.
+        - value: The current node.
+        - parent (dict | list): The container holding `value`, so `parent[path[-1]]` is `value`.
+
+    Example:
+        leaves = []
+        traverse(data, visit=lambda path, value, parent: (
+            None if isinstance(value, (dict, list)) else leaves.append(list(path))))
+    """
+    path = []
+
+    def walk(node):
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            path.append(key)
+            if visit is None or visit(path, value, node) is not False:
+                if isinstance(value, (dict, list)):
+                    yield walk(value)
+            if leave is not None:
+                leave(path, value, node)
+            path.pop()
 
+    if isinstance(data, (dict, list)):
+        _drive(walk(data))
 
 
 ### functions specifyed to data 
 
 
 
-def query(data_structure, criteria):
+@instrument()
+def query(data_structure, criteria, memo=None):
     """
     Filters structured data using the specified criteria.
 
@@ -27,12 +155,15 @@ def query(data_structure, criteria):
     return only the corresponding fields.
 
     Args:
-    - data_structure (dict | list): The structured data to be parsed.
+    - data_structure (dict | list | RecordTable): The structured data to be parsed.
     - criteria (dict | list | bool | callable): The criteria to be used for filtering.
       - If a dictionary, the function will return a new dictionary with corresponding fields.
-      - If a list, it will return a list of filtered data.
+      - If a list, it will return a list of filtered data. A `RecordTable` filtered by a
+        dictionary is filtered a column at a time and gives a new `RecordTable`.
       - If True, it will return the original data without filtering.
       - If a callable, it will apply the function to the respective value in the dictionary.
+    - memo (Memo, optional): A memo (see `Memo`) for the criteria functions declared with `pure`:
+      their results are reused for identical values, e.g. repeated subtrees. Defaults to None.
 
 
     Returns:
@@ -53,8 +184,19 @@ def query(data_structure, criteria):
         data = [{"name": "John"}, {"name": "Alice"}]
         criteria = [{"name": True}, {"name": lambda x: x.lower()}]
         result = query(data, criteria)
+
+        # Normalizing the repeated values once, with a memo kept across calls
+        memo = Memo()
+        result = query(data, [{"name": pure(normalize_name)}], memo=memo)
     """
 
+    if memo is not None:
+        with _memoizing(memo):
+            return _query(data_structure, criteria)
+
+    if isinstance(criteria, CompiledQuery):
+        return criteria(data_structure)
+
     if isinstance(criteria, bool):
         if criteria:
             return data_structure
@@ -69,14 +211,14 @@ def query(data_structure, criteria):
                     if callable(sub_criteria):
                         output[key] = sub_criteria(data_structure[key])
                     else:
-                        output[key] = query(data_structure[key], sub_criteria)
+                        output[key] = _query(data_structure[key], sub_criteria)
         elif isinstance(criteria, list) and len(criteria) == 1:
             sub_criteria = criteria[0]
             for key, value in data_structure.items():
                 if key in sub_criteria:
                     filtered_value = (
                         sub_criteria[key](value) if callable(sub_criteria[key]) else
-                        query(value, sub_criteria[key]) if isinstance(value, (dict, list)) else
+                        _query(value, sub_criteria[key]) if isinstance(value, (dict, list, RecordTable)) else
                         value
                     )
                     output[key] = filtered_value
@@ -85,12 +227,377 @@ def query(data_structure, criteria):
     elif isinstance(data_structure, list) and criteria:
         sub_criteria = criteria[0]
         if isinstance(sub_criteria, dict):
-            return [query(item, sub_criteria) for item in data_structure]
+            return [_query(item, sub_criteria) for item in data_structure]
+        elif callable(sub_criteria):
+            return [sub_criteria(item) for item in data_structure]
+
+    elif isinstance(data_structure, RecordTable) and criteria:
+        sub_criteria = criteria[0]
+        if isinstance(sub_criteria, dict):
+            # The records are filtered a column at a time, into a new table.
+            return data_structure.project([
+                (key, _field_function(sub_criteria[key], lambda value, sub=sub_criteria[key]: _query(value, sub)))
+                for key in sub_criteria
+            ])
         elif callable(sub_criteria):
             return [sub_criteria(item) for item in data_structure]
     return None
 
 
+# For the recursive calls: `query` is only replaced by its measured version while profiling
+# (see `instrument`), and only the outer call is measured.
+_query = query
+
+
+def _field_function(sub_criteria, apply):
+    # The function a `RecordTable` column is mapped with for a key of the criteria; None keeps it.
+    if sub_criteria is True:
+        return None
+    if callable(sub_criteria):
+        return sub_criteria
+    return apply
+
+
+class CompiledQuery:
+    """
+    A reusable query plan built from a criteria tree by `compile_query`.
+
+    The criteria are inspected once: key lookups, callables and the dict/list branches
+    are resolved into a tree of small functions, so applying the plan to a record only
+    pays for the data it touches. Applying a plan gives the same result as
+    `query(record, criteria)`.
+
+    Attributes:
+    - criteria: The criteria tree the plan was compiled from.
+
+    Examples:
+        plan = compile_query({"name": True, "address": {"city": lambda x: x.upper()}})
+        results = [plan(record) for record in records]
+    """
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+        self._apply = _compile_criteria(criteria)
+
+    def __call__(self, data_structure):
+        return self._apply(data_structure)
+
+    def __repr__(self):
+        return f"CompiledQuery({self.criteria!r})"
+
+    def __reduce__(self):
+        # Plans are pickled as their criteria and compiled again when loaded.
+        return (CompiledQuery, (self.criteria,))
+
+
+@instrument()
+def compile_query(criteria):
+    """
+    Compiles a criteria tree into a reusable `CompiledQuery` plan.
+
+    Use it when the same criteria are applied to many records: the plan is built once
+    and can then be called on every record, or passed to `query` and `JsoniFy.__call__`
+    in place of the raw criteria.
+
+    Args:
+    - criteria (dict | list | bool | callable | CompiledQuery): The criteria, in the same
+      format accepted by `query`. A `CompiledQuery` is returned unchanged.
+
+    Returns:
+    - CompiledQuery: The compiled plan.
+
+    Example:
+        plan = compile_query([{"name": lambda x: x.lower()}])
+        plan([{"name": "John"}, {"name": "Alice"}])  # Returns: [{"name": "john"}, {"name": "alice"}]
+    """
+    if isinstance(criteria, CompiledQuery):
+        return criteria
+    return CompiledQuery(criteria)
+
+
+_MISSING = object()
+
+
+def _compile_criteria(criteria):
+    # Mirrors the branches of `query`, resolving everything that only depends on the criteria.
+    if isinstance(criteria, CompiledQuery):
+        return criteria._apply
+
+    if isinstance(criteria, bool):
+        if criteria:
+            return lambda data_structure: data_structure
+
+        def reject(data_structure):
+            raise ValueError("Criteria must be True to include data_structure.")
+        return reject
+
+    if isinstance(criteria, dict):
+        return _compile_dict_criteria(criteria)
+    if isinstance(criteria, list):
+        return _compile_list_criteria(criteria)
+
+    # Any other criteria type has no structure to resolve ahead of time.
+    return lambda data_structure: _query(data_structure, criteria)
+
+
+def _compile_item_criteria(sub_criteria):
+    # Handles a list of records filtered by the first element of the criteria.
+    if isinstance(sub_criteria, dict):
+        apply_item = _compile_dict_criteria(sub_criteria)
+        fields = [
+            (key, _field_function(sub, None if callable(sub) else _compile_criteria(sub)))
+            for key, sub in sub_criteria.items()
+        ]
+
+        def apply_items(items):
+            if isinstance(items, RecordTable):
+                return items.project(fields)
+            return [apply_item(item) for item in items]
+        return apply_items
+    if callable(sub_criteria):
+        return lambda items: [sub_criteria(item) for item in items]
+    return lambda items: None
+
+
+def _compile_dict_criteria(criteria):
+    fields = [
+        (key, sub_criteria if callable(sub_criteria) else _compile_criteria(sub_criteria))
+        for key, sub_criteria in criteria.items()
+    ]
+
+    if not criteria:
+        apply_items = None
+    elif 0 in criteria:
+        apply_items = _compile_item_criteria(criteria[0])
+    else:
+        def apply_items(items):
+            raise KeyError(0)
+
+    def apply(data_structure):
+        if isinstance(data_structure, dict):
+            output = {}
+            for key, apply_field in fields:
+                if key in data_structure:
+                    output[key] = apply_field(data_structure[key])
+            return output
+        if isinstance(data_structure, (list, RecordTable)) and apply_items is not None:
+            return apply_items(data_structure)
+        return None
+
+    return apply
+
+
+def _compile_list_criteria(criteria):
+    if len(criteria) != 1:
+        apply_fields = lambda data_structure: {}
+    elif isinstance(criteria[0], dict):
+        # Each entry is (is_callable, function) for a key of the single criteria dict.
+        fields = {
+            key: (True, sub_criteria) if callable(sub_criteria) else (False, _compile_criteria(sub_criteria))
+            for key, sub_criteria in criteria[0].items()
+        }
+
+        def apply_fields(data_structure):
+            output = {}
+            for key, value in data_structure.items():
+                field = fields.get(key, _MISSING)
+                if field is _MISSING:
+                    continue
+                is_callable, apply_field = field
+                if is_callable or isinstance(value, (dict, list, RecordTable)):
+                    output[key] = apply_field(value)
+                else:
+                    output[key] = value
+            return output
+    else:
+        apply_fields = lambda data_structure: _query(data_structure, criteria)
+
+    apply_items = _compile_item_criteria(criteria[0]) if criteria else None
+
+    def apply(data_structure):
+        if isinstance(data_structure, dict):
+            return apply_fields(data_structure)
+        if isinstance(data_structure, (list, RecordTable)) and apply_items is not None:
+            return apply_items(data_structure)
+        return None
+
+    return apply
+
+
+# The prefix that makes a path segment a regular expression instead of a literal key.
+_REGEX_PREFIX = "re:"
+
+PATH_CACHE_SIZE = 1024
+
+
+class CompiledPath:
+    """
+    A parsed "A/B/C" key path, ready to be evaluated against nested data.
+
+    Each segment of the path is classified once:
+    - A literal key (the common case) is looked up directly in each dictionary.
+    - "*" matches every key of a dictionary.
+    - "**" matches any depth: it selects the current dictionaries and every dictionary
+      nested below them, at any level.
+    - A segment starting with "re:" is a regular expression: the text after the prefix is
+      matched against the whole key (`re.fullmatch`), e.g. "re:B\\d+". A key equal to the
+      whole segment (prefix included) also matches, and a segment whose pattern is not valid
+      is treated as a literal key.
+    - Any other segment is a literal key, even if it contains regular expression characters
+      ("v1.0" only matches the key "v1.0"), as in the paths of earlier versions. The only
+      exceptions are keys named "*" or "**", which cannot be addressed literally.
+
+    Use `compile_path` to build instances: it keeps recently used paths in a bounded
+    LRU cache keyed by the path string.
+
+    Attributes:
+    - key_path (str): The original path.
+    - segments (tuple): One `(kind, text, pattern)` entry per segment, where kind is one
+      of "literal", "regex", "wildcard" or "deep".
+    """
+
+    def __init__(self, key_path):
+        self.key_path = key_path
+        self.segments = tuple(_parse_segment(segment) for segment in key_path.split('/'))
+        self.is_literal = all(kind == "literal" for kind, _, _ in self.segments)
+
+    def __call__(self, data):
+        return self.evaluate(data)
+
+    def __repr__(self):
+        return f"CompiledPath({self.key_path!r})"
+
+    def evaluate(self, data):
+        """Returns the list of values matching the path in `data`, like `query_path`."""
+        current_data = [data]
+        for segment in self.segments:
+            current_data = _step_path(current_data, segment)
+        return current_data
+
+    def key_matcher(self, index):
+        """Returns a predicate telling whether a dictionary key matches the segment at `index`."""
+        return _segment_matcher(self.segments[index])
+
+
+def _segment_matcher(segment):
+    kind, text, pattern = segment
+    if kind == "literal":
+        return lambda key: key == text
+    if kind == "wildcard":
+        return lambda key: True
+    if kind == "regex":
+        return lambda key: key == text or (isinstance(key, str) and pattern.fullmatch(key) is not None)
+    raise ValueError("'**' segments cannot be matched key by key.")
+
+
+def _parse_segment(segment):
+    if segment == "*":
+        return ("wildcard", segment, None)
+    if segment == "**":
+        return ("deep", segment, None)
+    if not segment.startswith(_REGEX_PREFIX):
+        return ("literal", segment, None)
+    try:
+        return ("regex", segment, re.compile(segment[len(_REGEX_PREFIX):]))
+    except re.error:
+        return ("literal", segment, None)
+
+
+def _collect_segment(dct, segment, output):
+    # Appends the values of `dct` selected by a single (non-"**") segment.
+    kind, text, pattern = segment
+    if kind == "literal":
+        if text in dct:
+            output.append(dct[text])
+    elif kind == "wildcard":
+        output.extend(dct.values())
+    else:
+        fullmatch = pattern.fullmatch
+        for key, value in dct.items():
+            if key == text or (isinstance(key, str) and fullmatch(key) is not None):
+                output.append(value)
+
+
+def _collect_nested_dicts(item, output):
+    # Pre-order collection of `item` and every dictionary below it.
+    stack = [item]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            output.append(node)
+            children = list(node.values())
+        elif isinstance(node, list):
+            children = node
+        elif isinstance(node, RecordTable):
+            children = list(node)
+        else:
+            continue
+        stack.extend(child for child in reversed(children) if isinstance(child, (dict, list)))
+
+
+def _step_path(current_data, segment):
+    # Applies one segment to the current values; lists fan out to the dictionaries they hold.
+    new_data = []
+    kind, key, _ = segment
+    if kind == "literal":
+        for item in current_data:
+            if isinstance(item, dict):
+                if key in item:
+                    new_data.append(item[key])
+            elif isinstance(item, list):
+                for subitem in item:
+                    if isinstance(subitem, dict) and key in subitem:
+                        new_data.append(subitem[key])
+            elif isinstance(item, RecordTable):
+                new_data.extend(item.column(key))
+        return new_data
+
+    if kind == "deep":
+        for item in current_data:
+            _collect_nested_dicts(item, new_data)
+        return new_data
+
+    for item in current_data:
+        if isinstance(item, dict):
+            _collect_segment(item, segment, new_data)
+        elif isinstance(item, list):
+            for subitem in item:
+                if isinstance(subitem, dict):
+                    _collect_segment(subitem, segment, new_data)
+        elif isinstance(item, RecordTable):
+            # Each key table of the records is matched once.
+            new_data.extend(item.select(_segment_matcher(segment)))
+    return new_data
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _compile_path_cached(key_path):
+    return CompiledPath(key_path)
+
+
+@instrument()
+def compile_path(key_path):
+    """
+    Returns the `CompiledPath` for a key path, reusing it from a bounded LRU cache.
+
+    Args:
+        key_path (str | CompiledPath): The path of keys in the format "A/B/C". A `CompiledPath`
+            is returned unchanged.
+
+    Returns:
+        CompiledPath: The compiled path. The cache keeps the `PATH_CACHE_SIZE` most recently
+        used paths; `compile_path.cache_info()` reports its hits and misses.
+    """
+    if isinstance(key_path, CompiledPath):
+        return key_path
+    return _compile_path_cached(key_path)
+
+
+compile_path.cache_info = _compile_path_cached.cache_info
+compile_path.cache_clear = _compile_path_cached.cache_clear
+
+
+@instrument()
 def query_path(data, key_path):
     """
     Accesses nested values within a dictionary using a path of keys which can contain regular expressions.
@@ -100,8 +607,15 @@ def query_path(data, key_path):
     for flexible and pattern-based searching.
 
     Args:
-        data (dict): The dictionary from which values will be accessed.
-        key_path (str): The path of keys in the format "A/B/C", where segments can be regular expressions.
+        data (dict): The dictionary from which values will be accessed. The records of a
+            `RecordTable` are read a column at a time.
+        key_path (str | CompiledPath): The path of keys in the format "A/B/C". Segments can be:
+            - a literal key, looked up directly (regular expression characters have no
+              special meaning: "v1.0" only matches "v1.0");
+            - "*", matching every key of a dictionary;
+            - "**", matching any number of nested levels;
+            - "re:" followed by a regular expression, matched against the whole key
+              (e.g. "re:B\\d"). See `CompiledPath`.
 
     Returns:
         list: A list of values corresponding to the key path or an empty list if no match is found.
@@ -114,27 +628,68 @@ def query_path(data, key_path):
             }
         }
         result = query_path(nested_data, "A/B1/C")  # Returns: ["value1"]
+        result = query_path(nested_data, "A/re:B\\d/C")  # Returns: ["value1", "value2"]
+        result = query_path(nested_data, "**/C")  # Returns: ["value1", "value2"]
     """
-    keys = key_path.split('/')
-    current_data = [data]
-
+    compiled = key_path if isinstance(key_path, CompiledPath) else _compile_path_cached(key_path)
     try:
-        for key in keys:
-            new_data = []
-            for item in current_data:
-                if isinstance(item, dict) and key in item:
-                    new_data.append(item[key])
-                elif isinstance(item, list):
-                    for subitem in item:
-                        if isinstance(subitem, dict) and key in subitem:
-                            new_data.append(subitem[key])
-            current_data = new_data
+        current_data = [data]
+        for segment in compiled.segments:
+            current_data = _step_path(current_data, segment)
     except (KeyError, TypeError):
         return []
 
     return current_data
 
 
+@instrument()
+def query_paths(data, key_paths):
+    """
+    Accesses the values of several key paths in a single traversal of the data.
+
+    The paths are merged into a prefix trie, so segments shared by several paths (such as
+    "A/B" in "A/B/C" and "A/B/D") are evaluated once instead of once per path.
+
+    Args:
+        data (dict): The dictionary from which values will be accessed.
+        key_paths (list of str | CompiledPath): The key paths, in the format accepted by `query_path`.
+
+    Returns:
+        list of lists: One list of values per key path, in the same order as `key_paths`.
+        Each inner list is equal to `query_path(data, key_path)`.
+
+    Example:
+        query_paths(nested_data, ["A/B1/C", "A/B2/C"])  # Returns: [["value1"], ["value2"]]
+    """
+    # Each trie node is (children keyed by segment, indices of the paths ending there).
+    root = ({}, [])
+    for index, key_path in enumerate(key_paths):
+        node = root
+        for segment in compile_path(key_path).segments:
+            children = node[0]
+            if segment not in children:
+                children[segment] = ({}, [])
+            node = children[segment]
+        node[1].append(index)
+
+    results = [[] for _ in key_paths]
+    stack = [(root, [data])]
+    while stack:
+        (children, ends), current_data = stack.pop()
+        for position, index in enumerate(ends):
+            results[index] = current_data if position == 0 else list(current_data)
+        if not current_data:
+            continue
+        for segment, child in children.items():
+            try:
+                stack.append((child, _step_path(current_data, segment)))
+            except (KeyError, TypeError):
+                continue
+
+    return results
+
+
+@instrument()
 def json_pseudo_format(data, bullet="-", custom_format_func=None, indentation_func=None):
     """
     Format the keys of a (possibly nested) dictionary with custom keys based on the provided options.
@@ -182,21 +737,22 @@ def json_pseudo_format(data, bullet="-", custom_format_func=None, indentation_fu
         return None
 
     def recursive_format(data_element, depth):
-        if isinstance(data_element, dict):
-            for key, value in data_element.items():
-                formatted_key = format_key(key, value, depth)
-                if formatted_key is not None:
-                    formatted_keys.append(formatted_key)
-                if isinstance(value, list) and any(isinstance(item, dict) for item in value):
-                    recursive_format(value[0], depth + 1)
-                else:
-                    recursive_format(value, depth + 1)
+        for key, value in data_element.items():
+            formatted_key = format_key(key, value, depth)
+            if formatted_key is not None:
+                formatted_keys.append(formatted_key)
+            if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+                value = value[0]
+            if isinstance(value, dict):
+                yield recursive_format(value, depth + 1)
 
-    recursive_format(data, 0)
+    if isinstance(data, dict):
+        _drive(recursive_format(data, 0))
     return formatted_keys
 
 
-def soft_modify(data, value_function, inplace = False):
+@instrument()
+def soft_modify(data, value_function, inplace = False, share = False, memo = None):
     """
     Replaces nested values in a dictionary based on the provided value function.
 
@@ -208,34 +764,78 @@ def soft_modify(data, value_function, inplace = False):
           The function should return:
             - The replacement value for the current key, or
             - None, to keep the current value unchanged.
+        inplace (bool, optional): If True, modifies `data` in place. Defaults to False.
+        share (bool, optional): Only used when `inplace` is False. If True, instead of deep-copying
+            the whole document, only the dictionaries and lists on the way from the root to a
+            replaced value are copied; every untouched subtree is shared with `data`. In this mode
+            `value_function` must return new values instead of mutating the ones it receives,
+            and the result must not be mutated in place where it shares nodes with `data`.
+            Defaults to False.
+        memo (Memo, optional): If `value_function` is declared with `pure`, a memo (see `Memo`)
+            its results are looked up in, so identical (key, value) pairs are only computed once.
+            With `share` also True, a dictionary equal to one already modified (e.g. a repeated
+            subtree) gets a copy of the same result without being walked again. Defaults to None.
 
     Returns:
         dict: A new dictionary with the values replaced as specified by the value_function.
     """
+    if memo is not None:
+        with _memoizing(memo):
+            return _soft_modify(data, value_function, inplace, share)
 
     if not isinstance(data, (dict, list) ):
       raise ValueError("data must be a dict or list(dict)")
 
+    if share and not inplace:
+        return _soft_modify_shared(data, value_function)
+
     if inplace:
         modified_data = data
     else:
         modified_data = deepcopy(data)
 
 
-    def recursive_insertion(dct):
+    # `recursive_insertion` recurses while the document is shallow; below `RECURSION_DEPTH`
+    # the same work continues in `deep_insertion`, a walker run by `_drive`. It returns the
+    # number of dictionaries it walked itself.
+    def recursive_insertion(dct, depth):
         if not isinstance(dct, dict):
             raise ValueError("data must be a dict")
+        if depth >= RECURSION_DEPTH:
+            _drive(deep_insertion(dct))
+            return 0
+        walked = 1
         keys_to_modify = list(dct.keys())
         for key in keys_to_modify:
             value = dct[key]
 
             if isinstance(value, dict):
-                recursive_insertion(value)
+                walked += recursive_insertion(value, depth + 1)
             
             elif isinstance(value, list):
                 for item in value:
                     if isinstance(item, dict):
-                        recursive_insertion(item)
+                        walked += recursive_insertion(item, depth + 1)
+
+            new_value = value_function(key, value)            
+            if new_value is not None:
+                dct[key] = new_value
+        return walked
+
+    def deep_insertion(dct):
+        if not isinstance(dct, dict):
+            raise ValueError("data must be a dict")
+        keys_to_modify = list(dct.keys())
+        for key in keys_to_modify:
+            value = dct[key]
+
+            if isinstance(value, dict):
+                yield deep_insertion(value)
+            
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict):
+                        yield deep_insertion(item)
 
             new_value = value_function(key, value)            
             if new_value is not None:
@@ -243,15 +843,98 @@ def soft_modify(data, value_function, inplace = False):
 
 
     if isinstance(modified_data, dict):
-        recursive_insertion(modified_data)
+        _walked(recursive_insertion(modified_data, 0))
     elif isinstance(modified_data, list):
-        for item in modified_data:
-            recursive_insertion(item)
+        _walked(sum([recursive_insertion(item, 0) for item in modified_data]))
 
     return modified_data
 
 
-def hard_modify(data, path, func, inplace=False):
+# For the memoized calls: only the outer call of `soft_modify` is measured.
+_soft_modify = soft_modify
+
+
+def _soft_modify_shared(data, value_function):
+    # Same visiting order as `soft_modify`, but a node is copied only when something below it changes.
+    # Each walker stores the (possibly copied) dictionary it produced in `result[0]`.
+    memo = _active_memo(value_function)
+    call = value_function
+    if memo is not None:
+        # The dictionaries are memoized whole by `memoized_insertion`, so only the calls with
+        # other values go through the memo: hashing the containers again would cost more.
+        function = value_function.function
+        call = lambda key, value: function(key, value) if isinstance(value, (dict, list)) else value_function(key, value)
+        stored = {}
+
+    def memoized_insertion(dct, result):
+        # A dictionary equal to one already walked gets a copy of the same result, without walking
+        # it again. An unchanged dictionary is stored as None, so that its equals are kept (and
+        # shared) as they are. The memo keeps its own copy of a result, sharing only the unchanged
+        # subtrees with the dictionary it was computed for; `stored` maps the ids of the results
+        # of this call to the memo's copies, which the copies of their parents reuse.
+        args = (value_function, dct)
+        key, entry = memo._lookup(_soft_modify_shared, args)
+        if entry is not _NOT_FOUND:
+            found = entry[2]
+            if found is None:
+                result[0] = dct
+            else:
+                result[0] = _copy_shared(found, entry[1][1], dct, {})
+                stored[id(result[0])] = found
+            return
+        yield shared_insertion(dct, result)
+        if result[0] is dct:
+            memo._store(key, _soft_modify_shared, args, None)
+        else:
+            memo._store(key, _soft_modify_shared, args, _copy_shared(result[0], dct, dct, stored))
+
+    def shared_insertion(dct, result):
+        if not isinstance(dct, dict):
+            raise ValueError("data must be a dict")
+        output = dct
+        for key in list(dct.keys()):
+            value = dct[key]
+            new_child = value
+
+            if isinstance(value, dict):
+                child_result = [value]
+                yield insertion(value, child_result)
+                new_child = child_result[0]
+
+            elif isinstance(value, list):
+                for position, item in enumerate(value):
+                    if isinstance(item, dict):
+                        child_result = [item]
+                        yield insertion(item, child_result)
+                        new_item = child_result[0]
+                        if new_item is not item:
+                            if new_child is value:
+                                new_child = copy(value)
+                            new_child[position] = new_item
+
+            new_value = call(key, new_child)
+            if new_value is None:
+                new_value = new_child
+            if new_value is not value:
+                if output is dct:
+                    output = copy(dct)
+                output[key] = new_value
+        result[0] = output
+
+    insertion = shared_insertion if memo is None else memoized_insertion
+
+    def run(dct):
+        result = [dct]
+        _drive(insertion(dct, result))
+        return result[0]
+
+    if isinstance(data, dict):
+        return run(data)
+    return [run(item) for item in data]
+
+
+@instrument()
+def hard_modify(data, path, func, inplace=False, share=False):
     """
     Modify a value in a nested dictionary based on a given path and function.
     
@@ -265,6 +948,10 @@ def hard_modify(data, path, func, inplace=False):
     - func (callable): The function to be applied to the specified value.
     - inplace (bool, optional): If True, modifies the original dictionary in place. 
       Otherwise, returns a modified copy. Default is False.
+    - share (bool, optional): Only used when `inplace` is False. If True, only the dictionaries
+      from the root down to the modified value are copied and every other subtree is shared
+      with `data`, instead of deep-copying the whole document. `func` must then return a new
+      value rather than mutate the one it receives. Default is False.
       
     Returns:
     - dict: The modified dictionary (either the original modified in place or a copy).
@@ -282,6 +969,10 @@ def hard_modify(data, path, func, inplace=False):
 
     if inplace:
         current = data
+    elif share:
+        current = copy(data)
+        _modify_spine(current, keys, func, {id(current)})
+        return current
     else:
         current = deepcopy(data)
 
@@ -301,88 +992,375 @@ def hard_modify(data, path, func, inplace=False):
     return current
 
 
+def _modify_spine(root, keys, func, copied):
+    """
+    Applies `func` at `keys` below `root`, copying every node on the way that is not a copy yet.
+
+    `root` must already be a copy, and `copied` holds the ids of the copies made so far, so
+    several paths can be applied to the same result without copying a node twice.
+    """
+    sub_data = root
+    for key in keys[:-1]:
+        if key not in sub_data:
+            return
+        child = sub_data[key]
+        if id(child) not in copied:
+            child = copy(child)
+            sub_data[key] = child
+            copied.add(id(child))
+        sub_data = child
+
+    if keys[-1] in sub_data:
+        sub_data[keys[-1]] = func(sub_data[keys[-1]])
+
+
+def _modify_all_shared(data, paths, funcs):
+    # Applies every (path, func) pair to one structurally shared copy of `data`.
+    result = copy(data)
+    copied = {id(result)}
+    for path, func in zip(paths, funcs):
+        _modify_spine(result, path.split("/"), func, copied)
+    return result
+
+
 ### general ( level 1 ) functions
 
 
-def deep_merge(d):
+def _merge_collect(key, values):
+    return values
+
+
+def _merge_first(key, values):
+    return values[0]
+
+
+def _merge_last(key, values):
+    return values[-1]
+
+
+def _merge_sum(key, values):
+    # Numbers are added and lists concatenated; anything else is collected.
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return sum(values)
+    if all(isinstance(value, list) for value in values):
+        return [item for value in values for item in value]
+    return values
+
+
+def _merge_union(key, values):
+    # Lists are joined without repeated items; other values are reduced to the distinct ones.
+    if all(isinstance(value, list) for value in values):
+        return _unique(item for value in values for item in value)
+    distinct = _unique(values)
+    return distinct[0] if len(distinct) == 1 else distinct
+
+
+def _unique(items):
+    # Keeps the first occurrence of each item, in order; unhashable items are compared by equality.
+    seen = set()
+    unique = []
+    for item in items:
+        try:
+            if item in seen:
+                continue
+            seen.add(item)
+        except TypeError:
+            if item in unique:
+                continue
+        unique.append(item)
+    return unique
+
+
+_MERGE_STRATEGIES = {
+    "collect": _merge_collect,
+    "first": _merge_first,
+    "last": _merge_last,
+    "sum": _merge_sum,
+    "union": _merge_union,
+}
+
+
+def _merge_strategy(strategy):
+    if callable(strategy):
+        return strategy
+    if strategy not in _MERGE_STRATEGIES:
+        raise ValueError(f"strategy must be a callable or one of {', '.join(map(repr, _MERGE_STRATEGIES))}.")
+    return _MERGE_STRATEGIES[strategy]
+
+
+def _group_values(data_list):
+    # Key -> the values stored under it, in the order of the dictionaries.
+    groups = {}
+    for data in data_list:
+        for key, value in data.items():
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [value]
+            else:
+                group.append(value)
+    return groups
+
+
+@instrument()
+def deep_merge(d, strategy="collect"):
     """
     Recursively merge nested dictionaries or lists of dictionaries.
     
     Given a dictionary `d`, if any value in `d` is a list of dictionaries, 
-    those dictionaries are merged using the `merge_content` function. If a 
+    those dictionaries are merged like `merge_content` does. If a 
     value in `d` is a dictionary, the function is applied recursively on 
     this dictionary. 
+
+    The values a key takes across the merged dictionaries are grouped in a single pass:
+    groups made only of dictionaries are merged key by key in turn, and the other groups
+    are combined with `strategy`. Every subtree is visited once.
     
     Parameters:
     - d (dict or list): Input dictionary or list to process.
+    - strategy (str or callable, optional): How the values of a key are combined when it
+      appears in more than one dictionary (see `merge_content`). Defaults to "collect".
 
     Returns:
     - dict or list: Merged dictionary or list.
     """
-    
-    # If the input is a dictionary, apply deep_merge recursively to its values
-    if isinstance(d, dict):
-        return {key: deep_merge(value) for key, value in d.items()}
-    # If the input is a list and all items are dictionaries, apply merge_content
-    elif isinstance(d, list) and all(isinstance(item, dict) for item in d):
-        merged_content = merge_content(d)
-        # Check if the merged content is a dictionary and reapply deep_merge
-        if isinstance(merged_content, dict):
-            return deep_merge(merged_content)
-        return merged_content
-    # If the input is a list (not necessarily containing only dictionaries), apply deep_merge to each item
-    elif isinstance(d, list):
-        return [deep_merge(item) for item in d]
-    # Base case: if the input isn't any of the above types, return it as it is
-    else:
+    combine = _merge_strategy(strategy)
+
+    # `merge` stores the merged form of a container in `output[key]` and returns a walker for
+    # the nested containers still to merge, or None when there are none.
+    def merge(d, output, key):
+        # If the input is a dictionary, merge its values
+        # Scalars are copied as they are; nested containers are replaced by their merged form.
+        if isinstance(d, dict):
+            output[key] = merged = dict(d)
+            for value in d.values():
+                if isinstance(value, (dict, list)):
+                    return merge_items(d.items(), merged)
+            return None
+        # If the input is a list and all items are dictionaries, merge them key by key
+        if all(isinstance(item, dict) for item in d):
+            return merge_dicts(d, output, key)
+        # If the input is a list (not necessarily containing only dictionaries), merge each item
+        output[key] = merged = list(d)
+        for item in d:
+            if isinstance(item, (dict, list)):
+                return merge_items(enumerate(d), merged)
+        return None
+
+    def merge_items(items, merged):
+        for k, value in items:
+            if isinstance(value, (dict, list)):
+                walker = merge(value, merged, k)
+                if walker is not None:
+                    yield walker
+
+    def merge_dicts(dicts, output, key):
+        output[key] = merged = {}
+        for k, values in _group_values(dicts).items():
+            if len(values) == 1:
+                merged[k] = value = values[0]
+            elif all(isinstance(value, dict) for value in values):
+                merged[k] = None
+                yield merge_dicts(values, merged, k)
+                continue
+            else:
+                merged[k] = value = combine(k, values)
+                if value is values:
+                    # The collected values are a new list, merged in place.
+                    yield merge_items(enumerate(values), values)
+                    continue
+            if isinstance(value, (dict, list)):
+                walker = merge(value, merged, k)
+                if walker is not None:
+                    yield walker
+
+    # Base case: if the input isn't a dictionary or a list, return it as it is
+    if not isinstance(d, (dict, list)):
         return d
 
+    output = [None]
+    walker = merge(d, output, 0)
+    if walker is not None:
+        _drive(walker)
+    return output[0]
 
-def merge_content(data_list):
+
+@instrument()
+def merge_content(data_list, strategy="collect"):
     """
     Merges a list of dictionaries by aggregating their values.
 
     Given a list of dictionaries, this function combines them by aggregating 
-    values associated with the same keys. The values are combined into lists. 
-    If, after the merge, a key is associated with a list containing only a 
-    single value, the list is unpacked, and the value is stored directly.
+    values associated with the same keys. By default the values are combined into lists. 
+    A key that appears in a single dictionary keeps its value as it is.
 
     Parameters:
     - data_list (list of dict): A list of dictionaries to be merged.
+    - strategy (str or callable, optional): How the values of a key found in more than one
+      dictionary are combined:
+        * "collect": a list of the values (default).
+        * "first" / "last": the first / last value.
+        * "sum": numbers are added and lists concatenated; other values are collected.
+        * "union": lists are joined without repeated items; other values are reduced to
+          their distinct values (a single one is stored directly).
+        * A callable `strategy(key, values)` returning the combined value.
 
     Returns:
     - dict: A merged dictionary with values combined into lists where keys are duplicated.
+
+    Raises:
+    - ValueError: If `strategy` is not a callable or a known strategy name.
+
+    See `Merger` to merge the dictionaries one at a time, as they arrive.
     """
+    combine = _merge_strategy(strategy)
 
-    merged = {}
-    
-    for data in data_list:
-        for key, value in data.items():
-            if key not in merged:
-                merged[key] = [value]
+    return {
+        key: values[0] if len(values) == 1 else combine(key, values)
+        for key, values in _group_values(data_list).items()
+    }
+
+
+
+
+class _Distinct:
+    # The distinct values added so far, in order of first occurrence (see `_unique`).
+    __slots__ = ("items", "seen")
+
+    def __init__(self, value):
+        self.items = []
+        self.seen = set()
+        self.add(value)
+
+    def add(self, value):
+        try:
+            if value in self.seen:
+                return self
+            self.seen.add(value)
+        except TypeError:
+            if value in self.items:
+                return self
+        self.items.append(value)
+        return self
+
+
+# How `Merger` keeps the values of a key seen more than once, per strategy: (start, fold,
+# finish) where `start(value)` makes the state from the first value, `fold(state, value)`
+# returns it updated with a new value and `finish(key, state)` gives the merged value.
+# Strategies that need every value (and callables) keep the list of the values.
+def _append_value(values, value):
+    values.append(value)
+    return values
+
+
+_KEEP_VALUES = (lambda value: [value], _append_value, None)
+_MERGE_FOLDS = {
+    "first": (lambda value: value, lambda first, value: first, lambda key, first: first),
+    "last": (lambda value: value, lambda last, value: value, lambda key, last: last),
+    # The union of all the values is the union of their distinct values.
+    "union": (_Distinct, _Distinct.add, lambda key, distinct: _merge_union(key, distinct.items)),
+}
+
+
+class Merger:
+    """
+    Merges dictionaries (e.g. the pages of a paginated API) one at a time, as `merge_content`.
+
+    Each page added is folded into the accumulated values of its keys right away, so the pages
+    themselves do not have to be kept: memory holds what the merged output needs, not every page.
+    With the "first", "last" and "union" strategies only the first, last or distinct values of a
+    key are kept; the other strategies (and callables) keep the values of the keys found in more
+    than one page, since they are all needed to combine them.
+
+    `result()` can be called at any time, and gives what `merge_content(pages, strategy)` gives
+    for the pages added so far: a key found in a single page keeps its value as it is, the
+    others are combined with `strategy` then.
+
+    Args:
+    - strategy (str or callable, optional): How the values of a key found in more than one
+      page are combined (see `merge_content`). Defaults to "collect".
+
+    Attributes:
+    - pages (int): The number of pages added.
+
+    Raises:
+    - ValueError: If `strategy` is not a callable or a known strategy name.
+
+    Example:
+        merger = Merger(strategy="union")
+        for page in fetch_pages():
+            merger.add(page)
+        merged = merger.result()
+    """
+
+    def __init__(self, strategy="collect"):
+        self._combine = _merge_strategy(strategy)
+        self.strategy = strategy
+        self.pages = 0
+        self._start, self._fold, self._finish = (
+            _MERGE_FOLDS.get(strategy, _KEEP_VALUES) if isinstance(strategy, str) else _KEEP_VALUES
+        )
+        # Key -> [number of values, the value if there is one, else the state of the strategy].
+        self._groups = {}
+
+    def add(self, page):
+        """Folds the keys and values of a dictionary into the merged values."""
+        if not isinstance(page, dict):
+            raise TypeError(f"Merger pages must be dictionaries, not {type(page).__name__}.")
+        groups = self._groups
+        for key, value in page.items():
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, value]
+                continue
+            if group[0] == 1:
+                group[1] = self._start(group[1])
+            group[0] += 1
+            group[1] = self._fold(group[1], value)
+        self.pages += 1
+        return self
+
+    def extend(self, pages):
+        """Adds every dictionary of an iterable."""
+        for page in pages:
+            self.add(page)
+        return self
+
+    def result(self):
+        """
+        Returns the merged dictionary of the pages added so far.
+
+        The merger is left unchanged: more pages can be added and `result` called again.
+        """
+        finish = self._finish
+        combine = self._combine
+        output = {}
+        for key, (count, state) in self._groups.items():
+            if count == 1:
+                output[key] = state
+            elif finish is not None:
+                output[key] = finish(key, state)
             else:
-                if isinstance(merged[key], list):
-                    merged[key].append(value)
-                else:
-                    merged[key] = [merged[key], value]
-    
-    # Convert single-item lists back to their values
-    for key, value in merged.items():
-        if isinstance(value, list) and len(value) == 1:
-            merged[key] = value[0]
-    
-    return merged
+                # A copy, so that the result is not changed by the next pages.
+                output[key] = combine(key, list(state))
+        return output
 
+    def __repr__(self):
+        return f"Merger(strategy={self.strategy!r}, pages={self.pages})"
 
 
 
 ### general ( level 2 )functions
 
 
+@instrument()
 def filter(content, keys_to_use):
     return {key: content[key] for key in keys_to_use if key in content}
 
 
+_filter = filter
+
+
+@instrument()
 def structure_data(data, nested=False, keys_content=None, adjust_list=False):
     """
     Structures a list of dictionaries into a nested dictionary based on given paths.
@@ -420,87 +1398,130 @@ def structure_data(data, nested=False, keys_content=None, adjust_list=False):
     -----
     The path string in the input data is split using the '/' delimiter, and the function expects 
     paths to be correctly formatted. Using '[' and ']' indicates a position in a list for adjust_list=True.
+    Consecutive entries with the same parent path (as produced by `flatten_dict`) are inserted
+    without walking the structure again from the root.
     """
 
 
     root = {}
 
-    # Helper function to insert content to the final structure.
-    def insert_content(tree, path_parts, content):
-        if not path_parts:
-            if isinstance(tree, list):
-                tree.append(content)
-            else:
-                if nested:
-                    # If content is a dictionary
-                    if keys_content and isinstance(content, dict):
-                        content = filter(content, keys_content)
-
-                    return content
-                target = tree.setdefault("value", {})
-                
-                # If content is a direct value
-                if not isinstance(content, dict):
-                    if 'content_value' not in target:
-                        target['content_value'] = []
-                    target['content_value'].append(content)
-                    return
-
-                # If content is a dictionary
-                if keys_content:
-                    content = filter(content, keys_content)
-                for key, val in content.items():
-                    if key not in target:
-                        target[key] = val
-                    else:
-                        if isinstance(val, list):
-                            if not isinstance(target[key], list):
-                                target[key] = [target[key]]
-                            target[key].extend(val)
-                        else:
-                            if not isinstance(target[key], list):
-                                target[key] = [target[key]]
-                            target[key].append(val)
+    # The "name[n]" path parts seen so far, parsed as (name, 0-based index).
+    list_parts = {}
+    # Ids of the containers inserted as content.
+    placed = set()
+
+    def place(value):
+        if isinstance(value, (dict, list)):
+            placed.add(id(value))
+
+    # Resolves a "name[n]" path part below `tree`, padding the list with empty dictionaries.
+    # Returns the list, the index in the list and the child.
+    def descend_list(tree, current):
+        parsed = list_parts.get(current)
+        if parsed is None:
+            name, index = current.split("[")
+            parsed = list_parts[current] = (name, int(index[:-1]) - 1)  # Convert to 0-based index
+        name, index = parsed
+
+        if name not in tree:
+            tree[name] = []
+        container = tree[name]
+        if len(container) <= index:
+            container.extend([{} for _ in range(index + 1 - len(container))])
+        return container, index, container[index]
+
+    # Merges `content` into the "value" dictionary of `tree` (nested=False).
+    def merge_content_value(tree, content):
+        target = tree.setdefault("value", {})
+
+        # If content is a direct value
+        if not isinstance(content, dict):
+            if 'content_value' not in target:
+                target['content_value'] = []
+            target['content_value'].append(content)
+            place(content)
             return
 
-        current = path_parts.pop(0)
-
-        # Check for list adjustment syntax in the current path part
-        if adjust_list and "[" in current and "]" in current:
-            current, index = current.split("[")
-            index = int(index[:-1]) - 1  # Convert to 0-based index
-
-            if current not in tree:
-                tree[current] = []
-
-            while len(tree[current]) <= index:
-                tree[current].append({})
-
-            subtree = insert_content(tree[current][index], path_parts, content)
-            if subtree is not None:  # Check for nested case to replace placeholder dictionary
-                tree[current][index] = subtree
+        # If content is a dictionary
+        if keys_content:
+            content = _filter(content, keys_content)
+        for key, val in content.items():
+            if key not in target:
+                target[key] = val
+                place(val)
+            else:
+                if not isinstance(target[key], list):
+                    target[key] = [target[key]]
+                if isinstance(val, list):
+                    target[key].extend(val)
+                    for item in val:
+                        place(item)
+                else:
+                    target[key].append(val)
+                    place(val)
 
-        else:
-            if current not in tree:
-                tree[current] = {}
-            subtree = insert_content(tree[current], path_parts, content)
-            if subtree is not None:  # Check for nested case
-                tree[current] = subtree
+    # The parent path ("A/B/" for "A/B/C") of the previous entry, and the node it leads to.
+    # Consecutive entries usually share their parent, so it is only resolved once for them.
+    # It is only reused when every node on the way was created here (content objects may
+    # be shared and modified through another path) and no "name[0]" part was used (it
+    # addresses the last item, which changes as the list grows).
+    parent_path = None
+    parent = root
 
     # Process each entry in the data list.
     for entry in data:
-        path_parts = entry["path"].split("/")
-        insert_content(root, path_parts, entry["content"])
+        path = entry["path"]
+        split_at = path.rfind("/") + 1
+
+        if path[:split_at] != parent_path:
+            parent_path = path[:split_at]
+            parent = root
+            for current in (parent_path[:-1].split("/") if parent_path else ()):
+                # Check for list adjustment syntax in the current path part
+                if adjust_list and "[" in current and "]" in current:
+                    container, index, parent = descend_list(parent, current)
+                    if index < 0 or id(container) in placed:
+                        parent_path = None
+                else:
+                    if current not in parent:
+                        parent[current] = {}
+                    parent = parent[current]
+                if id(parent) in placed:
+                    parent_path = None
+
+        current = path[split_at:]
+        if adjust_list and "[" in current and "]" in current:
+            container, key, tree = descend_list(parent, current)
+        else:
+            if current not in parent:
+                parent[current] = {}
+            container, key, tree = parent, current, parent[current]
+        content = entry["content"]
+
+        if isinstance(tree, list):
+            tree.append(content)
+            place(content)
+        elif nested:
+            # If content is a dictionary
+            if keys_content and isinstance(content, dict):
+                content = _filter(content, keys_content)
+            # The content replaces the placeholder node
+            if content is not None:
+                container[key] = content
+                place(content)
+        else:
+            merge_content_value(tree, content)
 
     return root
 
 
+@instrument()
 def flatten_dict(d, parent_key='', content_key=None, func=None):
     """
     Flattens a nested dictionary or list structure into a list of dictionaries with paths and content.
     
     Parameters:
-    - d (dict or list): The input dictionary or list to be flattened.
+    - d (dict or list or RecordTable): The input dictionary or list to be flattened.
     - parent_key (str, optional): Used for recursive calls to keep track of the current path. Defaults to ''.
     - content_key (str, optional): The specific key to extract content from the dictionary. If not provided, all values are considered as content.
     - func (function, optional): A function to apply on the content. If provided, it's applied to the content of each item.
@@ -527,51 +1548,119 @@ def flatten_dict(d, parent_key='', content_key=None, func=None):
     - The function handles both dictionaries and lists.
     - For lists, the path will include indices (starting from 1).
     - If `content_key` is provided, only values associated with that key will be included in the output.
+    - `iter_flatten` yields the same items one at a time, without building the list.
     """
 
-    items = []
-    
-    if not isinstance(d, (dict, list)):
+    if not isinstance(d, (dict, list, RecordTable)):
         return []
-    
-    if isinstance(d, dict):
-        for k, v in d.items():
-            new_key = f"{parent_key}/{k}" if parent_key else k
+
+    items = []
+    _drive(_flatten_walker(content_key, func, False, True, items)(d, parent_key))
+    return items
+
+
+@instrument()
+def iter_flatten(d, parent_key='', content_key=None, func=None, path_tuples=False):
+    """
+    Lazily flattens a nested dictionary or list structure into `(path, content)` pairs.
+
+    This is the generator version of `flatten_dict`: it yields the same paths and contents,
+    in the same order, but one at a time, so the flattened records can be streamed (e.g. to
+    a file) without holding the whole list in memory, and stopping early skips the rest of
+    the document.
+
+    Parameters:
+    - d (dict or list or RecordTable): The input dictionary or list to be flattened.
+    - parent_key (str or tuple, optional): A path prefix for every yielded path. Defaults to ''.
+    - content_key (str, optional): The specific key to extract content from the dictionary, as in `flatten_dict`.
+    - func (function, optional): A function to apply on the content of each item.
+    - path_tuples (bool, optional): If True, paths are yielded as tuples of keys and list indices
+      (starting from 0, so they address the item directly, e.g. `('A', 'B', 1, 'C')` for "A/B[2]/C")
+      instead of strings. Defaults to False.
+
+    Yields:
+    - tuple: `(path, content)` pairs.
+
+    Example:
+    for path, content in iter_flatten(data, content_key='value'):
+        print(path, content)
+    # A/B example
+    # C[3] inside_list
+    """
+    if not isinstance(d, (dict, list, RecordTable)):
+        return
+
+    if path_tuples:
+        if not isinstance(parent_key, tuple):
+            parent_key = (parent_key,) if parent_key else ()
+    items = []
+    walk = _flatten_walker(content_key, func, path_tuples, False, items)
+    yield from _iter_drive(walk(d, parent_key), items)
+
+
+def _flatten_walker(content_key, func, path_tuples, as_dicts, items):
+    """
+    Returns the walker shared by `flatten_dict` and `iter_flatten`.
+
+    The walker appends the flattened items to `items`, as {'path': ..., 'content': ...}
+    dictionaries if `as_dicts` is True, or as (path, content) pairs otherwise.
+    """
+    def add(path, content):
+        if func:
+            content = func(content)
+        items.append({'path': path, 'content': content} if as_dicts else (path, content))
+
+    def walk(d, parent_key):
+        if isinstance(d, dict):
+            return walk_members(d.items(), parent_key)
+        if isinstance(d, RecordTable):
+            return walk_table(d, parent_key)
+        return walk_list(d, parent_key)
+
+    def walk_members(members, parent_key):
+        for k, v in members:
+            if path_tuples:
+                new_key = parent_key + (k,)
+            else:
+                new_key = f"{parent_key}/{k}" if parent_key else k
             if isinstance(v, dict):
                 if content_key and content_key in v:
-                    if func:
-                        items.append({'path': new_key, 'content': func(v[content_key]) })
-                    else:
-                        items.append({'path': new_key, 'content': v[content_key] })
+                    add(new_key, v[content_key])
                 else:
-                    items.extend(flatten_dict(v, new_key, content_key, func))
+                    yield walk_members(v.items(), new_key)
             elif isinstance(v, list):
-                for idx, item in enumerate(v, 1):
-                    list_key = f"{new_key}[{idx}]"
+                for idx, item in enumerate(v):
+                    # Paths are only built for the items that produce output.
                     if content_key and isinstance(item, dict) and content_key in item:
-                        if func:
-                            items.append({'path': list_key, 'content': func(item[content_key])})
-                        else:
-                            items.append({'path': list_key, 'content': item[content_key]})
-                    else:
-                        items.extend(flatten_dict(item, list_key, content_key, func))
+                        add(new_key + (idx,) if path_tuples else f"{new_key}[{idx + 1}]", item[content_key])
+                    elif isinstance(item, (dict, list, RecordTable)):
+                        yield walk(item, new_key + (idx,) if path_tuples else f"{new_key}[{idx + 1}]")
+            elif isinstance(v, RecordTable):
+                yield walk_table(v, new_key, content_key)
+            elif not content_key:
+                if func:
+                    v = func(v)
+                items.append({'path': new_key, 'content': v} if as_dicts else (new_key, v))
+
+    def walk_list(d, parent_key):
+        for idx, item in enumerate(d):
+            if isinstance(item, (dict, list, RecordTable)):
+                yield walk(item, parent_key + (idx,) if path_tuples else f"{parent_key}[{idx + 1}]")
+
+    def walk_table(table, parent_key, content_key=None):
+        # The rows are walked from their columns, like the dictionaries of a list.
+        for idx, (keys, values) in enumerate(table.iter_rows()):
+            path = parent_key + (idx,) if path_tuples else f"{parent_key}[{idx + 1}]"
+            if content_key and content_key in keys:
+                add(path, values[keys.index(content_key)])
             else:
-                if not content_key:
-                    if func:
-                        items.append({'path': new_key, 'content': func(v) })
-                    else:
-                        items.append({'path': new_key, 'content': v})
+                yield walk_members(zip(keys, values), path)
 
-    elif isinstance(d, list):
-        for idx, item in enumerate(d, 1):
-            list_key = f"{parent_key}[{idx}]"
-            if isinstance(item, (dict, list)):
-                items.extend(flatten_dict(item, list_key, content_key, func))
-
-    return items
+    return walk
 
 
-def save_dict_as_json_to_folder(dictionary, folder_path, file_name):
+@instrument()
+def save_dict_as_json_to_folder(dictionary, folder_path, file_name, indent=4, backend=None):
     """
     Save a dictionary as a JSON formatted file within a specified folder.
 
@@ -579,6 +1668,10 @@ def save_dict_as_json_to_folder(dictionary, folder_path, file_name):
         dictionary (dict): The dictionary to be saved as JSON.
         folder_path (str): The path to the folder where the file will be saved.
         file_name (str): The name of the file to be created.
+        indent (int, optional): The indentation width, or None for compact output
+            (smaller and faster to write). Defaults to 4.
+        backend (str | JsonBackend, optional): The JSON backend that encodes the file
+            (see `set_json_backend`). Defaults to the active backend.
 
     Raises:
         FileNotFoundError: If the specified folder doesn't exist.
@@ -588,16 +1681,23 @@ def save_dict_as_json_to_folder(dictionary, folder_path, file_name):
 
     full_path = os.path.join(folder_path, file_name)
 
-    with open(full_path, 'w', encoding='utf-8') as file:
-        json.dump(dictionary, file, ensure_ascii=False, indent=4)
+    # The backend encodes straight to UTF-8 bytes.
+    with open(full_path, 'wb') as file:
+        file.write(get_json_backend(backend).dumps(dictionary, indent))
 
 
-def read_json_file(file_path: str) -> dict:
+@instrument()
+def read_json_file(file_path: str, backend=None, lazy=False) -> dict:
     """
     Read a JSON file and return its content as a Python dictionary.
 
     Args:
         file_path (str): The path to the JSON file to be read.
+        backend (str | JsonBackend, optional): The JSON backend that decodes the file
+            (see `set_json_backend`). Defaults to the active backend.
+        lazy (bool, optional): If True, the file is memory-mapped and its objects are only
+            decoded when accessed (see `load_lazy_json`), which suits reading a few paths
+            of a large file. The backend is not used in this mode. Defaults to False.
 
     Returns:
         dict: A dictionary representing the content of the JSON file.
@@ -610,15 +1710,115 @@ def read_json_file(file_path: str) -> dict:
     if not path.exists():
         raise FileNotFoundError(f"The file '{file_path}' was not found.")
 
+    if lazy:
+        return load_lazy_json(path)
+
     try:
-        with path.open('r', encoding='utf-8') as file:
-            json_content = json.load(file)
-            return json_content
+        # The bytes are decoded as they are, without a text layer.
+        return get_json_backend(backend).loads(path.read_bytes())
     except json.JSONDecodeError as e:
         raise json.JSONDecodeError(f"Error decoding JSON: {str(e)}", e.doc, e.pos)
 
 
+def _open_jsonl(file_path, mode, compression):
+    # Opens a JSON Lines file in binary mode, gzip-compressed or not.
+    if compression == "infer":
+        compression = "gzip" if str(file_path).endswith(".gz") else None
+    if compression == "gzip":
+        return gzip.open(file_path, mode + "b", compresslevel=6)
+    if compression is None:
+        return open(file_path, mode + "b")
+    raise ValueError("compression must be 'infer', 'gzip' or None.")
+
+
+@instrument()
+def iter_jsonl(file_path, compression="infer", backend=None):
+    """
+    Read a JSON Lines (NDJSON) file one record at a time.
+
+    Each non-blank line is decoded as one JSON document and yielded as soon as it is read,
+    so only the current line is held in memory. The records can be fed straight to
+    `query`, `flatten_dict`, `soft_modify` or `write_jsonl`.
+
+    Args:
+        file_path (str): The path to the JSON Lines file.
+        compression (str, optional): "gzip", None, or "infer" to read the file as gzip when
+            its name ends with ".gz". Defaults to "infer".
+        backend (str | JsonBackend, optional): The JSON backend that decodes the lines
+            (see `set_json_backend`). Defaults to the active backend.
+
+    Yields:
+        The decoded record of each line (usually a dict).
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        json.JSONDecodeError: If a line is not valid JSON; the message gives its line number.
 
+    Example:
+        names = (query(record, {"name": True}) for record in iter_jsonl("records.jsonl.gz"))
+        write_jsonl("names.jsonl", names)
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"The file '{file_path}' was not found.")
+
+    loads = get_json_backend(backend).loads
+    with _open_jsonl(path, "r", compression) as file:
+        for line_number, line in enumerate(file, 1):
+            if line.isspace():
+                continue
+            try:
+                yield loads(line)
+            except json.JSONDecodeError as e:
+                raise json.JSONDecodeError(f"Error decoding JSON on line {line_number}: {e.msg}", e.doc, e.pos)
+
+
+@instrument()
+def write_jsonl(file_path, records, append=False, compression="infer", buffer_size=1000, backend=None):
+    """
+    Write records to a JSON Lines (NDJSON) file, one compact JSON document per line.
+
+    `records` can be any iterable, including a generator such as `iter_jsonl`: the lines
+    are encoded one record at a time and written in bulk every `buffer_size` records, so
+    the whole collection never needs to be in memory.
+
+    Args:
+        file_path (str): The path to the file to write.
+        records (iterable): The records (JSON-serializable values) to write.
+        append (bool, optional): If True, the records are added at the end of an existing
+            file instead of replacing it. Defaults to False.
+        compression (str, optional): "gzip", None, or "infer" to write gzip when the file name
+            ends with ".gz". Defaults to "infer".
+        buffer_size (int, optional): The number of lines gathered before each write. Defaults to 1000.
+        backend (str | JsonBackend, optional): The JSON backend that encodes the lines
+            (see `set_json_backend`). Defaults to the active backend.
+
+    Returns:
+        int: The number of records written.
+
+    Raises:
+        TypeError: If a record is not JSON serializable.
+    """
+    dumps = get_json_backend(backend).dumps
+    count = 0
+    with _open_jsonl(file_path, "a" if append else "w", compression) as file:
+        lines = []
+        for record in records:
+            lines.append(dumps(record))
+            if len(lines) >= buffer_size:
+                file.write(b"\n".join(lines))
+                file.write(b"\n")
+                count += len(lines)
+                lines = []
+        if lines:
+            file.write(b"\n".join(lines))
+            file.write(b"\n")
+            count += len(lines)
+    return count
+
+
+
+@instrument()
 def find_keys_by_regex(data, regex, return_type="dict"):
     """
     Searches for dictionary keys that match a given regular expression.
@@ -633,38 +1833,151 @@ def find_keys_by_regex(data, regex, return_type="dict"):
         dict or list: Depending on the `return_type`, either a nested dictionary containing matched keys
                       or a list of matched key paths.
     """
+    return _search_keys(data, {regex: regex}, return_type)[regex]
+
+
+@instrument()
+def find_keys_by_patterns(data, patterns, return_type="dict"):
+    """
+    Searches for the dictionary keys that match any of several regular expressions, in a
+    single traversal.
+
+    The result for each pattern is the one `find_keys_by_regex` would return, so auditing a
+    document for many patterns (e.g. sensitive keys) walks it once instead of once per
+    pattern. Each distinct key is matched once, against all the patterns combined into one
+    alternation, and only the keys that match it are checked pattern by pattern.
+
+    Args:
+        data (dict): The dictionary to be searched.
+        patterns (list | dict): The regular expressions (str or compiled), or a dictionary of
+            name -> regular expression to label them.
+        return_type (str, optional): "dict" for nested dictionaries of the matched keys or "list"
+            for lists of the matched key paths, as in `find_keys_by_regex`. Defaults to "dict".
+
+    Returns:
+        dict: Pattern (or its name, for a dictionary of patterns) -> the nested dictionary or the
+        list of paths of the keys it matched. A key matched by several patterns is reported
+        under each of them.
+
+    Example:
+        data = {"user": {"password": "x", "api_key": "y"}, "token": "z"}
+        find_keys_by_patterns(data, {"secret": "pass|token", "key": "key$"}, return_type="list")
+        # Returns: {"secret": ["user/password", "token"], "key": ["user/api_key"]}
+    """
+    if not isinstance(patterns, dict):
+        patterns = {pattern: pattern for pattern in patterns}
+    return _search_keys(data, patterns, return_type)
+
+
+# Backreferences (numbered or named) change meaning when patterns are joined into one alternation.
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _key_matcher(patterns):
+    """
+    Returns a function giving the positions (in `patterns`) of the patterns that search
+    successfully in a key, memoized per key.
+    """
+    compiled = [re.compile(pattern) for pattern in patterns]
+    combined = None
+    if len(compiled) > 1 and len({pattern.flags for pattern in compiled}) == 1 and not any(
+        isinstance(pattern.pattern, str) and _BACKREFERENCE.search(pattern.pattern) for pattern in compiled
+    ):
+        try:
+            combined = re.compile("|".join(f"(?:{pattern.pattern})" for pattern in compiled), compiled[0].flags)
+        except (re.error, TypeError):
+            # E.g. inline global flags or a group name used by two patterns.
+            combined = None
+    positions = range(len(compiled))
+    memo = {}
+
+    def matches(key):
+        text = str(key)
+        found = memo.get(text)
+        if found is None:
+            if combined is not None and not combined.search(text):
+                found = ()
+            else:
+                found = tuple(position for position in positions if compiled[position].search(text))
+            memo[text] = found
+        return found
+
+    return matches
+
+
+def _search_keys(data, patterns, return_type):
+    # The single traversal behind `find_keys_by_regex` and `find_keys_by_patterns`.
     if return_type not in ["dict", "list"]:
         raise ValueError("return_type must be either 'dict' or 'list'.")
 
-    if return_type == "dict":
-        result = {}
-    else:
-        result = []
-
-    def search_keys(item, path=[]):
+    names = list(patterns)
+    matches = _key_matcher(list(patterns.values()))
+    as_dict = return_type == "dict"
+    results = [{} if as_dict else [] for _ in names]
+
+    # The path of the current item, shared by every walker, and per level of it:
+    # - prefixes: the "A/B/0" string of the path down to that level, built once per container;
+    # - nodes: pattern position -> the nested result dictionary at that level, created the
+    #   first time a key below it matches.
+    path = []
+    prefixes = [""]
+    nodes = [dict(enumerate(results))]
+
+    def node_for(position):
+        # The result dictionary of pattern `position` for the current path, creating the
+        # missing levels from the deepest one that exists.
+        depth = len(path)
+        level = depth
+        while position not in nodes[level]:
+            level -= 1
+        current = nodes[level][position]
+        while level < depth:
+            current = current.setdefault(path[level], {})
+            level += 1
+            nodes[level][position] = current
+        return current
+
+    def descend(key):
+        prefixes.append(f"{prefixes[-1]}/{key!s}" if path else str(key))
+        path.append(key)
+        nodes.append({})
+
+    def ascend():
+        path.pop()
+        prefixes.pop()
+        nodes.pop()
+
+    def search_keys(item):
         if isinstance(item, dict):
             for key, value in item.items():
-                new_path = path + [key]
                 if isinstance(value, (dict, list)):
-                    search_keys(value, new_path)
-                if re.search(regex, str(key)):
-                    if return_type == "dict":
-                        current = result
-                        for p in new_path[:-1]:
-                            current = current.setdefault(p, {})
-                        current[new_path[-1]] = value
+                    descend(key)
+                    yield search_keys(value)
+                    ascend()
+                found = matches(key)
+                if found:
+                    if as_dict:
+                        # As in a key-by-key search, a matched key replaces what its own
+                        # descendants added under it.
+                        for position in found:
+                            node_for(position)[key] = value
                     else:
-                        result.append('/'.join(map(str, new_path)))
+                        key_path = f"{prefixes[-1]}/{key!s}" if path else str(key)
+                        for position in found:
+                            results[position].append(key_path)
 
         elif isinstance(item, list):
             for i, element in enumerate(item):
-                new_path = path + [i]
-                search_keys(element, new_path)
+                if isinstance(element, (dict, list)):
+                    descend(i)
+                    yield search_keys(element)
+                    ascend()
 
-    search_keys(data)
-    return result
+    _drive(search_keys(data))
+    return dict(zip(names, results))
 
 
+@instrument()
 def find_values_by_depth(data, regex):
     """
     Searches for values within a nested dictionary or list structure that match
@@ -693,20 +2006,27 @@ def find_values_by_depth(data, regex):
     """
     results = []
 
-    def search_depth(item, path=[]):
+    pattern = re.compile(regex)
+    # The path of the current item, shared by every walker.
+    path = []
+
+    def search_depth(item):
         if isinstance(item, dict):
             for key, value in item.items():
-                new_path = path + [key]
                 if isinstance(value, (dict, list)):
-                    search_depth(value, new_path)
-                elif re.match(regex, str(value)):
-                    results.append((new_path, value))
+                    path.append(key)
+                    yield search_depth(value)
+                    path.pop()
+                elif pattern.match(str(value)):
+                    results.append((path + [key], value))
         elif isinstance(item, list):
             for i, element in enumerate(item):
-                new_path = path + [i]
-                search_depth(element, new_path)
+                if isinstance(element, (dict, list)):
+                    path.append(i)
+                    yield search_depth(element)
+                    path.pop()
 
-    search_depth(data)
+    _drive(search_depth(data))
     return results
 
 
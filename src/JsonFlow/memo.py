@@ -0,0 +1,305 @@
+import threading
+from copy import copy, deepcopy
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+__all__ = ["PureFunction", "pure", "Memo"]
+
+
+MEMO_CACHE_SIZE = 4096
+
+
+def _fingerprint(root, cache, ordered=False):
+    """
+    Returns a structural hash of a container, equal for equal containers: dictionaries are
+    hashed regardless of the order of their keys, as they are compared (unless `ordered` is
+    True), and scalars with their type, so that 1, 1.0 and True differ.
+
+    The hash of every container below `root` is stored in `cache` by id, so it is computed once
+    per diff, or per memoized call of `query` and `soft_modify`. Walks with an explicit stack,
+    so deep documents are fine.
+    """
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in cache:
+            continue
+        is_dict = isinstance(node, dict)
+        children = node.values() if is_dict else node
+        if not ready:
+            # The children are hashed first, then the node (pushed back below them).
+            stack.append((node, True))
+            stack.extend([(child, False) for child in children if isinstance(child, (dict, list)) and id(child) not in cache])
+            continue
+        if is_dict and ordered:
+            cache[id(node)] = hash(("dict", tuple([(key, _child_hash(value, cache)) for key, value in node.items()])))
+        elif is_dict:
+            # A sum is independent of the order of the keys.
+            total = sum([hash((key, _child_hash(value, cache))) for key, value in node.items()])
+            cache[id(node)] = hash(("dict", len(node), total & 0xFFFFFFFFFFFFFFFF))
+        else:
+            cache[id(node)] = hash(("list", tuple([_child_hash(item, cache) for item in node])))
+    return cache[id(root)]
+
+
+def _child_hash(value, cache):
+    if isinstance(value, (dict, list)):
+        return cache[id(value)]
+    try:
+        return hash((type(value), value))
+    except TypeError:
+        # Unhashable values only count by type; equal fingerprints are confirmed with `==`.
+        return hash(type(value))
+
+
+# The result of a call that is not in a memo (None is a valid result).
+_NOT_FOUND = object()
+
+# The types of the results that are cached and returned without being copied.
+_IMMUTABLE = frozenset([str, int, float, bool, complex, bytes, type(None), range])
+
+
+def _copy_result(result):
+    # A result that can be modified in place is copied, so the memo never hands out its own.
+    return result if type(result) in _IMMUTABLE else deepcopy(result)
+
+
+def _copy_shared(result, original, current, copies):
+    """
+    Returns a copy of `result`, the output of a `share=True` walk over `original`, for `current`,
+    a document equal to `original`.
+
+    The subtrees of `result` taken unchanged from `original` are replaced by the same subtrees of
+    `current` (they are shared, as `share=True` promises), and everything else (the containers
+    copied on the way to a replaced value, and the replaced values) is copied. `copies` maps the
+    ids of containers to the copies to use for them, and the containers copied are added to it,
+    so the subtrees already copied (e.g. the results stored for the nested dictionaries) are not
+    copied again. Walks with an explicit stack, so deep results are fine.
+    """
+    output = [None]
+    stack = [(result, original, current, output, 0)]
+    immutable = _IMMUTABLE
+    while stack:
+        node, source, target, parent, slot = stack.pop()
+        if node is source:
+            parent[slot] = target
+            continue
+        copied = copies.get(id(node), _NOT_FOUND)
+        if copied is not _NOT_FOUND:
+            parent[slot] = copied
+            continue
+        if isinstance(node, dict):
+            # The shallow copy already holds the immutable values.
+            copied = copy(node)
+            matched = isinstance(source, dict)
+            for key, value in node.items():
+                if type(value) not in immutable:
+                    if matched and key in source:
+                        stack.append((value, source[key], target[key], copied, key))
+                    else:
+                        stack.append((value, _NOT_FOUND, None, copied, key))
+        elif isinstance(node, list):
+            copied = copy(node)
+            matched = isinstance(source, list) and len(source) == len(node)
+            for position, value in enumerate(node):
+                if type(value) not in immutable:
+                    if matched:
+                        stack.append((value, source[position], target[position], copied, position))
+                    else:
+                        stack.append((value, _NOT_FOUND, None, copied, position))
+        else:
+            parent[slot] = _copy_result(node)
+            continue
+        copies[id(node)] = copied
+        parent[slot] = copied
+    return output[0]
+
+
+# The memo of the `query` or `soft_modify` call running in each thread, with the fingerprints
+# computed during that call.
+_state = threading.local()
+
+
+@contextmanager
+def _memoizing(memo):
+    """
+    Makes the `PureFunction`s called in the block look up their results in `memo`.
+
+    The fingerprints of the containers are kept for the whole block, by id, so the ones of nested
+    subtrees are computed once; the containers are kept alive until the end of the block so that
+    their ids are not reused. A nested block with the same memo continues the outer one.
+    """
+    previous = getattr(_state, "memo", None)
+    if memo is None or memo is previous:
+        yield
+        return
+    saved = (previous, getattr(_state, "fingerprints", None), getattr(_state, "hashed", None))
+    _state.memo, _state.fingerprints, _state.hashed = memo, {}, []
+    try:
+        yield
+    finally:
+        _state.memo, _state.fingerprints, _state.hashed = saved
+
+
+class PureFunction:
+    """
+    A function declared pure with `pure`.
+
+    It is called like the function it wraps. Inside `query` and `soft_modify` calls given a
+    `memo`, its results are looked up in the memo by the content of its arguments, so identical
+    subtrees are only transformed once.
+
+    Attributes:
+    - function: The wrapped function.
+    """
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, *args, **kwargs):
+        memo = getattr(_state, "memo", None)
+        if memo is None or kwargs:
+            return self.function(*args, **kwargs)
+        return memo._call(self.function, args)
+
+    def __repr__(self):
+        return f"pure({self.function!r})"
+
+
+def pure(function):
+    """
+    Declares a function pure, so that `query` and `soft_modify` can memoize it.
+
+    A pure function returns equal results for equal arguments and does not modify them, nor
+    depend on anything else (no I/O, randomness or counters). Only the functions declared this
+    way are memoized: the others are always called.
+
+    Args:
+        function (callable): The function, e.g. a criteria function of `query` or the value
+            function of `soft_modify`. Also works as a decorator.
+
+    Returns:
+        PureFunction: A callable wrapping `function`. A `PureFunction` is returned unchanged.
+
+    Raises:
+        TypeError: If `function` is not callable.
+
+    Example:
+        normalize = pure(lambda text: " ".join(text.lower().split()))
+        query(data, {"A": {"B": [{"C": normalize}]}}, memo=Memo())
+    """
+    if isinstance(function, PureFunction):
+        return function
+    if not callable(function):
+        raise TypeError(f"pure expects a callable, not {type(function).__name__}.")
+    return PureFunction(function)
+
+
+class Memo:
+    """
+    A bounded cache of the results of pure functions, keyed by the content of their arguments.
+
+    Pass a memo to `query` or `soft_modify` (or `JsoniFy.__call__` and `JsoniFy.soft_insert`) to
+    reuse the results of the functions declared with `pure` for identical inputs, e.g. the
+    repeated subtrees of a catalog, within one call and across calls.
+
+    The arguments are fingerprinted with a structural hash (computed once per subtree and call)
+    and compared with `==` on a match, so equal subtrees at different places, or in different
+    documents, share their result. The least recently used results are evicted beyond `maxsize`.
+
+    The memo keeps its own copy of every result that can be modified in place (dictionaries,
+    lists and other objects than numbers, strings, bytes and None) and returns a new copy of it
+    on each hit, so modifying a result never changes the memo or another result. With
+    `soft_modify(..., share=True)`, a memoized subtree is shared with the document where it was
+    unchanged, and copied where it was modified, as when it is walked. The memo also keeps the
+    arguments of its results, to compare them. Memoizing pays off for functions that cost more
+    than hashing their arguments and copying their result, such as text normalization or parsing.
+
+    Args:
+    - maxsize (int, optional): The number of results kept. Defaults to `MEMO_CACHE_SIZE`.
+
+    Attributes:
+    - maxsize: The number of results kept.
+    - hits: The calls answered from the memo.
+    - misses: The calls that ran the function.
+
+    Raises:
+    - ValueError: If `maxsize` is smaller than 1.
+
+    Example:
+        memo = Memo(maxsize=10000)
+        clean = pure(lambda key, value: value.strip() if isinstance(value, str) else None)
+        soft_modify(catalog, clean, memo=memo)
+        memo.hits, memo.misses
+    """
+
+    def __init__(self, maxsize=MEMO_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # (id of the function, fingerprints of the arguments) -> (function, arguments, result)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"Memo(maxsize={self.maxsize}, size={len(self)}, hits={self.hits}, misses={self.misses})"
+
+    def clear(self):
+        """Removes every cached result and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _lookup(self, function, args):
+        """
+        Returns the key of a call and its entry `(function, arguments, result)`, or `_NOT_FOUND`.
+
+        Only called inside `_memoizing`, which holds the fingerprints of the call.
+        """
+        fingerprints = _state.fingerprints
+        hashes = []
+        for arg in args:
+            if isinstance(arg, (dict, list)):
+                hashes.append(_fingerprint(arg, fingerprints))
+                _state.hashed.append(arg)
+            else:
+                hashes.append(_child_hash(arg, fingerprints))
+        key = (id(function), tuple(hashes))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is function and entry[1] == args:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry
+            self.misses += 1
+        return key, _NOT_FOUND
+
+    def _store(self, key, function, args, result):
+        with self._lock:
+            self._entries[key] = (function, args, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _call(self, function, args):
+        key, entry = self._lookup(function, args)
+        if entry is not _NOT_FOUND:
+            return _copy_result(entry[2])
+        result = function(*args)
+        self._store(key, function, args, _copy_result(result))
+        return result
+
+
+def _active_memo(function):
+    # The memo of the running `query` or `soft_modify` call, if `function` is declared pure.
+    if isinstance(function, PureFunction):
+        return getattr(_state, "memo", None)
+    return None
@@ -0,0 +1,244 @@
+import os
+import sys
+import pickle
+import itertools
+import traceback
+import multiprocessing
+
+
+__all__ = ["RecordError", "BatchError", "RecordPool", "map_records"]
+
+
+class RecordError:
+    """
+    The failure of one record in `map_records`.
+
+    Attributes:
+    - index (int): The position of the record in the input.
+    - error (Exception): The exception raised for the record. An exception that cannot be
+      sent back from a worker process is replaced by a `RuntimeError` with the same message.
+    - traceback (str): The formatted traceback, from the process that ran the record.
+    """
+
+    __slots__ = ("index", "error", "traceback")
+
+    def __init__(self, index, error, traceback):
+        self.index = index
+        self.error = error
+        self.traceback = traceback
+
+    def __repr__(self):
+        return f"RecordError(index={self.index}, error={self.error!r})"
+
+
+class BatchError(Exception):
+    """
+    Raised by `map_records` when some records failed and `errors="raise"`.
+
+    Every record is processed before it is raised.
+
+    Attributes:
+    - failures (list of RecordError): The failed records, in input order.
+    - results (list): The results of all the records, with the `RecordError` of each failed
+      record in its place.
+    """
+
+    def __init__(self, failures, results):
+        first = failures[0]
+        super().__init__(f"{len(failures)} record(s) failed; the first at index {first.index}: {first.error!r}")
+        self.failures = failures
+        self.results = results
+
+
+# Batches run by forked workers, by id. The workers inherit them at fork time, so the
+# function and the records are never pickled; only the results travel back.
+_BATCHES = {}
+_batch_ids = itertools.count()
+# The function of a batch run by spawned workers, set by `_set_function`.
+_FUNCTION = None
+
+
+def _record_error(index, exc, portable):
+    error = exc
+    if portable:
+        try:
+            pickle.dumps(exc)
+        except Exception:
+            error = RuntimeError(f"{type(exc).__name__}: {exc}")
+    return RecordError(index, error, traceback.format_exc())
+
+
+def _apply_chunk(function, records, start, portable=True):
+    results = []
+    failures = []
+    for offset, record in enumerate(records):
+        try:
+            results.append(function(record))
+        except Exception as exc:
+            failure = _record_error(start + offset, exc, portable)
+            results.append(failure)
+            failures.append(failure)
+    return results, failures
+
+
+def _run_inherited(task):
+    batch_id, start, stop = task
+    function, records = _BATCHES[batch_id]
+    return _apply_chunk(function, records[start:stop], start)
+
+
+def _set_function(function):
+    global _FUNCTION
+    _FUNCTION = function
+
+
+def _run_sent(task):
+    start, records = task
+    return _apply_chunk(_FUNCTION, records, start)
+
+
+def _run_pooled(task):
+    function, start, records = task
+    return _apply_chunk(function, records, start)
+
+
+def _start_method():
+    # "fork" is only safe by default on Linux: macOS has it, but system libraries may crash in
+    # forked children (Python itself defaults to "spawn" there).
+    return "fork" if sys.platform == "linux" else "spawn"
+
+
+class RecordPool:
+    """
+    A pool of worker processes reused by several `map_records` calls.
+
+    Starting worker processes costs tens of milliseconds (much more with "spawn"), so code
+    calling `map_records` repeatedly on small batches should create a pool once and pass it
+    as `pool=`. The workers are started on the first call and stopped by `close` or at the
+    end of a `with` block.
+
+    As the workers outlive the calls, the function and the records of each chunk are pickled
+    to them, so the function must be picklable (a module-level function or a `functools.partial`
+    of one, not a lambda or a closure).
+
+    Args:
+    - processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+    - start_method (str, optional): The multiprocessing start method. Defaults to "fork" on
+      Linux and "spawn" elsewhere.
+
+    Example:
+        with RecordPool(4) as pool:
+            for batch in batches:
+                results = map_records(batch, flatten_dict, pool=pool)
+    """
+
+    def __init__(self, processes=None, start_method=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.start_method = start_method or _start_method()
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        state = "running" if self._pool is not None else "idle"
+        return f"RecordPool(processes={self.processes}, start_method={self.start_method!r}, {state})"
+
+    def map(self, function, records, spans):
+        """Runs `function` on the chunks of `records` given by the (start, stop) `spans`."""
+        try:
+            pickle.dumps(function)
+        except Exception as exc:
+            raise TypeError(f"The function must be picklable to run in a RecordPool: {exc}") from None
+        if self._pool is None:
+            self._pool = multiprocessing.get_context(self.start_method).Pool(self.processes)
+        tasks = [(function, start, records[start:stop]) for start, stop in spans]
+        return self._pool.map(_run_pooled, tasks, chunksize=1)
+
+    def close(self):
+        """Stops the worker processes. The pool starts new ones if it is used again."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+def map_records(records, function, processes=None, chunk_size=1000, errors="raise", pool=None):
+    """
+    Applies a function to every record of a collection in a process pool.
+
+    The records are split into chunks of `chunk_size` consecutive records, and each chunk is
+    processed by one worker. The results are returned in the order of the records and are
+    the same as `[function(record) for record in records]`.
+
+    Without `pool`, the workers are started for the call. On Linux they are forked and
+    inherit the function and the records, so any callable works (lambdas, closures,
+    `CompiledQuery` plans) and only the results are pickled. Elsewhere they are spawned and
+    the function and the chunks are pickled to them. To run many calls, pass a `RecordPool`
+    so the workers are started once.
+
+    Args:
+    - records (list | iterable): The records (e.g. dictionaries) to process.
+    - function (callable): Called with one record; returns its result, which must be
+      picklable. E.g. a `CompiledQuery`, `flatten_dict`, or
+      `functools.partial(soft_modify, value_function=func)`.
+    - processes (int, optional): The number of worker processes. Defaults to the number of
+      CPUs. With 1 process (or a single chunk) the records are processed in this process.
+    - chunk_size (int, optional): The number of records sent to a worker at a time.
+      Defaults to 1000.
+    - errors (str, optional): What to do when `function` raises for some records:
+        * "raise": process every record, then raise a `BatchError` listing the failures (default).
+        * "return": return the results with a `RecordError` in place of each failed record.
+    - pool (RecordPool, optional): Worker processes to reuse; `processes` is then ignored.
+      `function` must be picklable. Defaults to None (a pool is started for the call).
+
+    Returns:
+    - list: The result of each record, in order.
+
+    Raises:
+    - BatchError: If some records failed and `errors` is "raise".
+    - ValueError: If `errors` or `chunk_size` is invalid.
+    - TypeError: If `pool` is given and `function` cannot be pickled.
+
+    Example:
+        plan = compile_query({"name": True, "address": {"city": lambda x: x.upper()}})
+        results = map_records(records, plan, chunk_size=5000)
+    """
+    if errors not in ("raise", "return"):
+        raise ValueError("errors must be either 'raise' or 'return'.")
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    if not isinstance(records, list):
+        records = list(records)
+    spans = [(start, min(start + chunk_size, len(records))) for start in range(0, len(records), chunk_size)]
+    processes = min(processes or os.cpu_count() or 1, len(spans))
+
+    if pool is not None and len(spans) > 1:
+        chunks = pool.map(function, records, spans)
+    elif processes <= 1 or pool is not None:
+        chunks = [_apply_chunk(function, records[start:stop], start, False) for start, stop in spans]
+    elif _start_method() == "fork":
+        batch_id = next(_batch_ids)
+        _BATCHES[batch_id] = (function, records)
+        try:
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                chunks = pool.map(_run_inherited, [(batch_id, start, stop) for start, stop in spans], chunksize=1)
+        finally:
+            del _BATCHES[batch_id]
+    else:
+        with multiprocessing.get_context("spawn").Pool(processes, _set_function, (function,)) as pool:
+            chunks = pool.map(_run_sent, [(start, records[start:stop]) for start, stop in spans], chunksize=1)
+
+    results = []
+    failures = []
+    for chunk_results, chunk_failures in chunks:
+        results.extend(chunk_results)
+        failures.extend(chunk_failures)
+
+    if failures and errors == "raise":
+        raise BatchError(failures, results)
+    return results
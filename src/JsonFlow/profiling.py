@@ -0,0 +1,584 @@
+import sys
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from copy import deepcopy as _deepcopy
+
+from .columnar import RecordTable
+
+
+__all__ = [
+    "CallRecord", "OperationStats", "Profiler", "instrument", "enable_profiling",
+    "disable_profiling", "get_profiler", "profile",
+]
+
+
+_CO_GENERATOR = 0x20
+
+# The profiler the instrumented functions report to, or None when profiling is disabled.
+_active = None
+
+
+class CallRecord:
+    """
+    The measurements of one call of an instrumented function.
+
+    The counters include the work of the instrumented functions it called, like the time.
+
+    Attributes:
+    - name (str): The operation, e.g. "query_path" or "JsoniFy.soft_insert".
+    - time (float): The wall time of the call, in seconds. For the generators (such as
+      `iter_flatten`), the time spent producing their items.
+    - nodes (int): The nodes visited: the containers walked by the traversals, the values
+      stepped through by the key paths and the structures filtered by `query`.
+    - copy_bytes (int): The memory allocated by deep copies of the data, in bytes. Only the
+      containers are counted, since the copies share their (immutable) values with the original.
+    - cache_hits (int): The lookups answered by a cache: compiled paths, `JsoniFy` query plans,
+      path indexes, value indexes and memos of pure functions.
+    - cache_misses (int): The lookups that had to compile or build their entry.
+    - error (str | None): The name of the exception raised by the call, if any.
+    """
+
+    __slots__ = ("name", "time", "nodes", "copy_bytes", "cache_hits", "cache_misses", "error", "_started")
+
+    def __init__(self, name):
+        self.name = name
+        self.time = 0.0
+        self.nodes = 0
+        self.copy_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.error = None
+
+    def __repr__(self):
+        return (
+            f"CallRecord({self.name!r}, time={self.time:.6f}, nodes={self.nodes}, copy_bytes={self.copy_bytes}, "
+            f"cache_hits={self.cache_hits}, cache_misses={self.cache_misses}, error={self.error!r})"
+        )
+
+
+class OperationStats:
+    """
+    The measurements of all the calls of one operation, summed.
+
+    Attributes:
+    - calls (int): The number of calls.
+    - errors (int): The number of calls that raised an exception.
+    - total_time (float): The wall time of all the calls, in seconds.
+    - max_time (float): The wall time of the slowest call, in seconds.
+    - nodes, copy_bytes, cache_hits, cache_misses (int): The sums of the `CallRecord` counters.
+    """
+
+    __slots__ = ("calls", "errors", "total_time", "max_time", "nodes", "copy_bytes", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.nodes = 0
+        self.copy_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def mean_time(self):
+        """The mean wall time of a call, in seconds."""
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def add(self, record):
+        """Adds the measurements of a call."""
+        self.calls += 1
+        self.errors += record.error is not None
+        self.total_time += record.time
+        self.max_time = max(self.max_time, record.time)
+        self.nodes += record.nodes
+        self.copy_bytes += record.copy_bytes
+        self.cache_hits += record.cache_hits
+        self.cache_misses += record.cache_misses
+
+    def as_dict(self):
+        """Returns the measurements as a dictionary, including `mean_time`."""
+        output = {name: getattr(self, name) for name in self.__slots__}
+        output["mean_time"] = self.mean_time
+        return output
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"OperationStats({fields})"
+
+
+class Profiler:
+    """
+    Collects the measurements of the instrumented functions while it is active.
+
+    The public functions of `main` and the methods of `JsoniFy` are instrumented. Their
+    measured versions, and the internal helpers that count nodes, copies and cache lookups,
+    are only swapped in by `enable_profiling`, so disabled profiling costs nothing.
+
+    Nested calls are measured too: a call of `JsoniFy.query_path` records its own time and
+    counters and those of the `query_paths` and `compile_path` calls it made.
+
+    Args:
+    - callback (callable, optional): Called with the `CallRecord` of every call when it ends,
+      e.g. to forward the measurements to a metrics system.
+
+    Attributes:
+    - stats (dict): Operation name -> `OperationStats`.
+
+    Example:
+        with profile() as profiler:
+            JsoniFy(data).query_path("A/B/C")
+        print(profiler.report())
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        # The calls in progress in the current thread, innermost last.
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def _current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _enter(self, record):
+        self._stack().append(record)
+        record._started = time.perf_counter()
+
+    def _leave(self, record):
+        record.time += time.perf_counter() - record._started
+        self._stack().pop()
+
+    def _finish(self, record):
+        parent = self._current()
+        if parent is not None:
+            parent.nodes += record.nodes
+            parent.copy_bytes += record.copy_bytes
+            parent.cache_hits += record.cache_hits
+            parent.cache_misses += record.cache_misses
+        with self._lock:
+            stats = self.stats.get(record.name)
+            if stats is None:
+                stats = self.stats[record.name] = OperationStats()
+            stats.add(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def _call(self, name, function, args, kwargs):
+        record = CallRecord(name)
+        self._enter(record)
+        try:
+            return function(*args, **kwargs)
+        except BaseException as error:
+            record.error = type(error).__name__
+            raise
+        finally:
+            self._leave(record)
+            self._finish(record)
+
+    def _iterate(self, name, iterator):
+        # Measures a generator over its whole life, timing only the steps it runs.
+        record = CallRecord(name)
+        try:
+            while True:
+                self._enter(record)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                except BaseException as error:
+                    record.error = type(error).__name__
+                    raise
+                finally:
+                    self._leave(record)
+                yield item
+        finally:
+            iterator.close()
+            self._finish(record)
+
+    def reset(self):
+        """Drops the measurements collected so far."""
+        with self._lock:
+            self.stats = {}
+
+    def as_dict(self):
+        """Returns the measurements as nested dictionaries: operation name -> `OperationStats.as_dict()`."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def report(self, sort="total_time"):
+        """
+        Returns the measurements as a text table, one line per operation.
+
+        Args:
+        - sort (str, optional): The `OperationStats` attribute the operations are sorted by,
+          in decreasing order. Defaults to "total_time".
+        """
+        with self._lock:
+            rows = sorted(self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True)
+        header = f"{'operation':<28} {'calls':>8} {'errors':>6} {'total s':>10} {'mean s':>10} {'max s':>10} {'nodes':>10} {'copy B':>12} {'hits':>8} {'misses':>8}"
+        lines = [header, "-" * len(header)]
+        for name, stats in rows:
+            lines.append(
+                f"{name:<28} {stats.calls:>8} {stats.errors:>6} {stats.total_time:>10.4f} {stats.mean_time:>10.6f} "
+                f"{stats.max_time:>10.4f} {stats.nodes:>10} {stats.copy_bytes:>12} {stats.cache_hits:>8} {stats.cache_misses:>8}"
+            )
+        return "\n".join(lines)
+
+
+def _measured(function, label):
+    # The version of `function` that reports its calls to the active profiler.
+    # `inspect.isgeneratorfunction`, without importing `inspect` (slow) with the package.
+    generator = bool(function.__code__.co_flags & _CO_GENERATOR)
+
+    @functools.wraps(function)
+    def instrumented(*args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return function(*args, **kwargs)
+        if generator:
+            return profiler._iterate(label, function(*args, **kwargs))
+        return profiler._call(label, function, args, kwargs)
+    return instrumented
+
+
+# The functions decorated by `instrument`, with their measured versions.
+_instrumented = []
+
+
+def instrument(name=None):
+    """
+    Decorates a function so that its calls are measured while a profiler is active.
+
+    The function is returned as it is, so it costs nothing while profiling is disabled:
+    `enable_profiling` replaces it with its measured version where it is bound by its name in
+    its own module or class and in the modules of the package (so `JsonFlow.query_path` is
+    measured), and `disable_profiling` puts it back. Other modules are never modified: a name
+    they imported before profiling started (e.g. with `from JsonFlow import query_path`), like
+    a reference kept in a local variable or a `functools.partial`, calls the plain function.
+    Nested functions cannot be found by their name, so they are always wrapped.
+
+    Args:
+    - name (str, optional): The operation name of the calls. Defaults to the qualified name
+      of the function (e.g. "JsoniFy.query_path").
+
+    Example:
+        @instrument()
+        def load_batch(path):
+            ...
+    """
+    def decorate(function):
+        measured = _measured(function, name or function.__qualname__)
+        if "<locals>" in function.__qualname__:
+            return measured
+        _instrumented.append((function, measured))
+        return function
+    return decorate
+
+
+def _bindings():
+    # (owner, attribute, measured version) of every binding of the instrumented functions: in the
+    # modules of the package, in the module of a function decorated elsewhere, and in the class
+    # of a method. Modules of other packages are left alone.
+    package = __name__.rpartition(".")[0]
+    modules = [
+        module for name, module in list(sys.modules.items())
+        if name == package or name.startswith(package + ".")
+    ]
+    bindings = []
+    for function, measured in _instrumented:
+        attribute = function.__name__
+        home = sys.modules.get(function.__module__)
+        if "." in function.__qualname__:
+            owner = home
+            for part in function.__qualname__.split(".")[:-1]:
+                owner = getattr(owner, part, None)
+            owners = [owner]
+        else:
+            owners = modules if home in modules else modules + [home]
+        for owner in owners:
+            if owner is not None and vars(owner).get(attribute) is function:
+                bindings.append((owner, attribute, measured))
+    return bindings
+
+
+### counting hooks
+# While a profiler is active, these replace internal helpers of the other modules, so that the
+# nodes, copies and cache lookups are only counted when someone is looking.
+
+
+def _count_nodes(count):
+    record = _active._current() if _active is not None else None
+    if record is not None:
+        record.nodes += count
+
+
+def _count_cache(hit):
+    record = _active._current() if _active is not None else None
+    if record is not None:
+        if hit:
+            record.cache_hits += 1
+        else:
+            record.cache_misses += 1
+
+
+def _container_size(data):
+    # The memory of the containers of `data`, each counted once.
+    size = 0
+    seen = set()
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, RecordTable):
+            stack.append(item._columns)
+            stack.append(item._rows)
+        elif not hasattr(item, "__array_interface__") and not isinstance(item, (bytearray, memoryview)):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+    return size
+
+
+def _counting_deepcopy(data, memo=None):
+    copied = _deepcopy(data, memo)
+    record = _active._current() if _active is not None else None
+    if record is not None:
+        record.copy_bytes += _container_size(copied)
+    return copied
+
+
+def _counting_walked(count):
+    # `main._walked`: the nodes walked by a recursive fast path.
+    _count_nodes(count)
+
+
+def _counting_drive(walker):
+    # `main._drive`, counting the walkers (one per container) it runs.
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    current = walker
+    count = 1
+    while True:
+        for child in current:
+            push(current)
+            current = child
+            count += 1
+            break
+        else:
+            if not stack:
+                _count_nodes(count)
+                return
+            current = pop()
+
+
+def _counting_iter_drive(walker, output):
+    # `main._iter_drive`, counting the walkers it runs.
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    current = walker
+    count = 1
+    try:
+        while True:
+            for child in current:
+                if output:
+                    yield from output
+                    output.clear()
+                push(current)
+                current = child
+                count += 1
+                break
+            else:
+                if output:
+                    yield from output
+                    output.clear()
+                if not stack:
+                    return
+                current = pop()
+    finally:
+        _count_nodes(count)
+
+
+def _counting_step_path(step_path):
+    @functools.wraps(step_path)
+    def counting_step_path(current_data, segment):
+        new_data = step_path(current_data, segment)
+        _count_nodes(len(new_data))
+        return new_data
+    return counting_step_path
+
+
+def _counting_calls(function):
+    # Counts each call (e.g. each structure `query` filters) as a node.
+    @functools.wraps(function)
+    def counting_calls(*args, **kwargs):
+        _count_nodes(1)
+        return function(*args, **kwargs)
+    return counting_calls
+
+
+def _counting_lru(cached):
+    @functools.wraps(cached)
+    def counting_lru(*args):
+        hits = cached.cache_info().hits
+        result = cached(*args)
+        _count_cache(cached.cache_info().hits > hits)
+        return result
+    return counting_lru
+
+
+def _counting_cached_plan(method):
+    # `JsoniFy._cached_plan`: a miss compiles (or replaces) the plan stored for the criteria.
+    @functools.wraps(method)
+    def counting_cached_plan(self, criteria):
+        before = self._plans.get(id(criteria))
+        plan = method(self, criteria)
+        if plan is not criteria:
+            _count_cache(self._plans.get(id(criteria)) is before)
+        return plan
+    return counting_cached_plan
+
+
+def _counting_index(attribute):
+    # `JsoniFy.path_index` and `JsoniFy.value_index`: a miss builds the index.
+    def wrap(method):
+        @functools.wraps(method)
+        def counting_index(self):
+            before = getattr(self, attribute)
+            index = method(self)
+            _count_cache(index is before)
+            return index
+        return counting_index
+    return wrap
+
+
+def _counting_memo(method):
+    # `Memo._lookup`: a miss runs the pure function (or walks the subtree).
+    @functools.wraps(method)
+    def counting_memo(self, function, args):
+        hits = self.hits
+        found = method(self, function, args)
+        _count_cache(self.hits > hits)
+        return found
+    return counting_memo
+
+
+def _hooks():
+    # (owner, attribute, replacement factory) of every internal helper swapped while profiling.
+    from . import main, jsonify, vector, memo
+    return [
+        (main, "_drive", lambda original: _counting_drive),
+        (main, "_walked", lambda original: _counting_walked),
+        (main, "_iter_drive", lambda original: _counting_iter_drive),
+        (main, "_step_path", _counting_step_path),
+        (vector, "_step_path", _counting_step_path),
+        (main, "_query", _counting_calls),
+        (main, "_compile_path_cached", _counting_lru),
+        (main, "deepcopy", lambda original: _counting_deepcopy),
+        (jsonify, "deepcopy", lambda original: _counting_deepcopy),
+        (vector, "deepcopy", lambda original: _counting_deepcopy),
+        (jsonify.JsoniFy, "_cached_plan", _counting_cached_plan),
+        (memo.Memo, "_lookup", _counting_memo),
+        (jsonify.JsoniFy, "path_index", _counting_index("_index")),
+        (jsonify.JsoniFy, "value_index", _counting_index("_value_index")),
+    ]
+
+
+# The helpers replaced by `enable_profiling`: (owner, attribute, original).
+_originals = []
+_switch = threading.Lock()
+
+
+def enable_profiling(callback=None):
+    """
+    Starts measuring the calls of the public functions of `main` and the methods of `JsoniFy`.
+
+    A new `Profiler` replaces the active one, if any. Until `disable_profiling`, the instrumented
+    functions are replaced by their measured versions (see `instrument`) and some internal
+    helpers by counting ones, for the whole process: calls from every thread are measured.
+
+    Args:
+    - callback (callable, optional): Called with the `CallRecord` of every call when it ends.
+
+    Returns:
+    - Profiler: The active profiler, holding the measurements.
+
+    Example:
+        profiler = enable_profiling(callback=lambda record: metrics.timing(record.name, record.time))
+        ...
+        disable_profiling()
+        print(profiler.report())
+    """
+    global _active
+    profiler = Profiler(callback)
+    with _switch:
+        if not _originals:
+            for owner, attribute, measured in _bindings():
+                _originals.append((owner, attribute, vars(owner)[attribute]))
+                setattr(owner, attribute, measured)
+            for owner, attribute, replacement in _hooks():
+                original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+                _originals.append((owner, attribute, original))
+                setattr(owner, attribute, replacement(original))
+        _active = profiler
+    return profiler
+
+
+def disable_profiling():
+    """
+    Stops measuring the calls and restores the plain functions.
+
+    Returns:
+    - Profiler | None: The profiler that was active, with its measurements, or None.
+    """
+    global _active
+    with _switch:
+        profiler = _active
+        _active = None
+        while _originals:
+            owner, attribute, original = _originals.pop()
+            setattr(owner, attribute, original)
+    return profiler
+
+
+def get_profiler():
+    """Returns the active `Profiler`, or None if profiling is disabled."""
+    return _active
+
+
+@contextmanager
+def profile(callback=None):
+    """
+    Measures the calls made inside a `with` block (see `enable_profiling`).
+
+    Yields:
+    - Profiler: The profiler collecting the measurements. It keeps them after the block.
+
+    Example:
+        with profile() as profiler:
+            flatten_dict(data)
+        profiler.stats["flatten_dict"].nodes
+    """
+    profiler = enable_profiling(callback)
+    try:
+        yield profiler
+    finally:
+        if _active is profiler:
+            disable_profiling()
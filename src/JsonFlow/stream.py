@@ -0,0 +1,318 @@
+import re
+import os
+import json
+import codecs
+from pathlib import Path
+
+from .main import compile_path
+
+
+__all__ = ["stream_query_path"]
+
+
+_NON_WHITESPACE = re.compile(r'[^ \t\n\r]')
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_LITERAL_END = re.compile(r'[ \t\n\r,\]}]')
+
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """
+    A chunked reader over JSON text used by the streaming path evaluator.
+
+    Only the unread part of the buffer is kept between chunks.
+    """
+
+    def __init__(self, read, chunk_size):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._decoder = None
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def read_text(self):
+        """Returns the next non-empty chunk of text, or None once the input is exhausted."""
+        text = ""
+        while not text:
+            if self.eof:
+                return None
+            raw = self._read(self._chunk_size)
+            if isinstance(raw, str):
+                text = raw
+                if not raw:
+                    self.eof = True
+                continue
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            if not raw:
+                self.eof = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                text = self._decoder.decode(raw)
+        return text
+
+    def fill(self):
+        """
+        Appends the next chunk to the buffer, dropping the consumed prefix.
+
+        Returns the number of characters dropped (callers shift their indices by it),
+        or None once the input is exhausted.
+        """
+        text = self.read_text()
+        if text is None:
+            return None
+        keep = self.pos
+        self.buf = self.buf[keep:] + text
+        self.pos = 0
+        return keep
+
+    def decode_value(self):
+        """
+        Decodes the value starting at `pos` and moves past it.
+
+        The decoder is run on the text read so far; while the value is incomplete, at least
+        three times as much text is read before trying again, so the failed attempts cost
+        less than the final one and a match of any size is decoded in linear time. A number
+        or literal is only complete once a delimiter follows it (or the input ends).
+        """
+        text = self.buf[self.pos:]
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(text)
+                if self.eof or (end < len(text) and (text[end - 1] in '"]}' or _LITERAL_END.match(text, end))):
+                    break
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            pieces = [text]
+            size = len(text)
+            wanted = 3 * size
+            while size < wanted:
+                chunk = self.read_text()
+                if chunk is None:
+                    break
+                pieces.append(chunk)
+                size += len(chunk)
+            text = "".join(pieces)
+        self.buf = text
+        self.pos = end
+        return value
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or None at the end of input."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if self.fill() is None:
+                return None
+
+    def string_end(self, start, keep=True):
+        """
+        Returns the index just past the string whose opening quote is at `start`.
+
+        With `keep=False` the string is only skipped, so its text may be dropped from the
+        buffer while reading further chunks.
+        """
+        index = start + 1
+        while True:
+            quote = self.buf.find('"', index)
+            if quote == -1:
+                index = len(self.buf)
+                if not keep:
+                    # Trailing backslashes are kept to tell whether the next quote is escaped.
+                    self.pos = len(self.buf.rstrip("\\"))
+                shift = self.fill()
+                if shift is None:
+                    raise ValueError("Unterminated string in JSON input.")
+                index -= shift
+                continue
+            backslash = quote - 1
+            while backslash >= 0 and self.buf[backslash] == "\\":
+                backslash -= 1
+            if (quote - 1 - backslash) % 2 == 0:
+                return quote + 1
+            index = quote + 1
+
+    def skip_value(self):
+        """Moves past the value starting at `pos` and returns the index where it ends."""
+        char = self.buf[self.pos]
+
+        if char == '"':
+            self.pos = self.string_end(self.pos, keep=False)
+            return self.pos
+
+        if char in "{[":
+            depth = 0
+            index = self.pos
+            while True:
+                match = _STRUCTURAL.search(self.buf, index)
+                if match is None:
+                    # Everything scanned so far can be dropped.
+                    self.pos = len(self.buf)
+                    if self.fill() is None:
+                        raise ValueError("Unexpected end of JSON input.")
+                    index = self.pos
+                    continue
+                char = match.group()
+                index = match.end()
+                if char == '"':
+                    self.pos = match.start()
+                    index = self.string_end(self.pos, keep=False)
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        self.pos = index
+                        return index
+
+        index = self.pos
+        while True:
+            match = _LITERAL_END.search(self.buf, index)
+            if match is not None:
+                self.pos = match.start()
+                return self.pos
+            index = len(self.buf)
+            shift = self.fill()
+            if shift is None:
+                self.pos = index
+                return index
+            index -= shift
+
+    def read_key(self):
+        """Reads an object key and its colon, returning the key and the next character."""
+        if self.buf[self.pos] != '"':
+            raise ValueError(f"Expected an object key in JSON input, got {self.buf[self.pos]!r}.")
+        end = self.string_end(self.pos)
+        raw = self.buf[self.pos + 1:end - 1]
+        key = json.loads(self.buf[self.pos:end]) if "\\" in raw else raw
+        self.pos = end
+        if self.peek() != ":":
+            raise ValueError("Expected ':' after an object key in JSON input.")
+        self.pos += 1
+        return key, self.peek()
+
+
+def _iter_matches(stream, segments):
+    """
+    Yields the values of `stream` reached by `segments`, following the rules of `query_path`.
+
+    Each container on the stack records how many segments were matched to reach it.
+    Values that can no longer match are skipped without being parsed, and only the
+    text of a matching value is kept in memory until it is decoded.
+    """
+    target = len(segments)
+    stack = []
+    state = 0
+    char = stream.peek()
+    if char is None:
+        return
+
+    while True:
+        # `char` starts a value reached after matching `state` segments (None: no match).
+        opened = False
+        if state is not None and state < target and char in "{[":
+            stream.pos += 1
+            stack.append((char == "{", state))
+            opened = True
+        elif state == target:
+            yield stream.decode_value()
+        else:
+            stream.skip_value()
+
+        # Move to the start of the next value, closing finished containers on the way.
+        while True:
+            if not stack:
+                return
+            is_object, frame_state = stack[-1]
+            char = stream.peek()
+            if char is None:
+                raise ValueError("Unexpected end of JSON input.")
+            if char in "}]":
+                stream.pos += 1
+                stack.pop()
+                opened = False
+                continue
+            if not opened:
+                if char != ",":
+                    raise ValueError(f"Expected ',' in JSON input, got {char!r}.")
+                stream.pos += 1
+                char = stream.peek()
+                if char is None:
+                    raise ValueError("Unexpected end of JSON input.")
+            break
+
+        if is_object:
+            key, char = stream.read_key()
+            if char is None:
+                raise ValueError("Unexpected end of JSON input.")
+            state = frame_state + 1 if segments[frame_state](key) else None
+        else:
+            # A list fans out to the dictionaries it contains, as in `query_path`.
+            state = frame_state if char == "{" else None
+
+
+def stream_query_path(source, key_path, chunk_size=65536):
+    """
+    Streams the values matching a key path out of a JSON document without loading it.
+
+    The document is read in chunks and walked token by token. Subtrees that cannot match
+    the path are skipped without being decoded, and only the matching subtrees are built
+    as Python objects, so memory stays bounded by the size of the largest match instead
+    of the size of the document. Lists fan out to the dictionaries they contain, exactly
+    as in `query_path`, and matches are yielded in document order.
+
+    Args:
+        source (str | Path | bytes | file object): A path to a JSON file, the raw JSON bytes,
+            or an open file object (text or binary) to read from.
+        key_path (str | CompiledPath): The path of keys in the format "A/B/C". Literal, regular
+            expression and "*" segments are supported, as in `query_path`.
+        chunk_size (int, optional): Number of bytes (or characters) read per chunk. Defaults to 65536.
+
+    Yields:
+        The values found at the key path, one at a time.
+
+    Raises:
+        FileNotFoundError: If `source` is a path and the file is not found.
+        ValueError: If the JSON input ends early or is malformed around the traversed keys,
+            or if the path contains a "**" segment.
+
+    Note:
+        Only the structure along the path is checked while streaming; matching subtrees are
+        fully validated when decoded. If an object repeats a key, every occurrence is matched,
+        while `json.load` would only keep the last one.
+
+    Example:
+        for value in stream_query_path("dump.json", "A/B/C"):
+            print(value)
+    """
+    compiled = compile_path(key_path)
+    segments = [compiled.key_matcher(index) for index in range(len(compiled.segments))]
+
+    if isinstance(source, (bytes, bytearray)):
+        source = memoryview(source)
+        offset = 0
+
+        def read(size):
+            nonlocal offset
+            chunk = bytes(source[offset:offset + size])
+            offset += size
+            return chunk
+
+        yield from _iter_matches(_JsonStream(read, chunk_size), segments)
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"The file '{source}' was not found.")
+        with path.open('rb') as file:
+            yield from _iter_matches(_JsonStream(file.read, chunk_size), segments)
+        return
+
+    yield from _iter_matches(_JsonStream(source.read, chunk_size), segments)
@@ -1,5 +1,13 @@
-from bs4 import BeautifulSoup, NavigableString
-import pandoc
+import importlib
+
+
+def _import(module):
+    # bs4 and pandoc are optional and slow to import: they are imported by the functions
+    # that use them, on their first call.
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"{module} is required by the parsers: pip install JsonFlow[parse]") from None
 
 # pandoc.configure(auto=True)
 # pandoc.configure(read=True)
@@ -102,6 +110,7 @@ def pandoc_to_dict(doc):
     Returns:
     list: The pandoc document structure converted into a list of dictionaries.
     """
+    pandoc = _import("pandoc")
 
     results = []
     path_occurrences = {}
@@ -372,8 +381,6 @@ def pandoc_to_dict(doc):
 
 
 
-from bs4 import BeautifulSoup, Tag
-
 def dict_to_html(data, content_key="content", path_key="path", split_tag="/"):
     """
     Convert a list of dictionaries (e.g., from html_to_dict) back into an HTML string.
@@ -387,8 +394,9 @@ def dict_to_html(data, content_key="content", path_key="path", split_tag="/"):
     Returns:
     str: Reconstructed HTML string.
     """
+    bs4 = _import("bs4")
 
-    root = BeautifulSoup('', 'html.parser')
+    root = bs4.BeautifulSoup('', 'html.parser')
 
     for item in data:
         # Split the path into individual tags and their potential indices
@@ -405,7 +413,7 @@ def dict_to_html(data, content_key="content", path_key="path", split_tag="/"):
             # Attempt to find the tag by its name and potential index
             found = None
             for idx, child in enumerate(current.children):
-                if isinstance(child, Tag) and child.name == tag_name:
+                if isinstance(child, bs4.Tag) and child.name == tag_name:
                     if index is None or idx == index - 1:
                         found = child
                         break
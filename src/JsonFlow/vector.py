@@ -0,0 +1,146 @@
+import operator
+import importlib
+import collections
+from copy import deepcopy
+
+from .main import compile_path, _step_path, _segment_matcher
+from .columnar import RecordTable
+
+
+__all__ = ["gather_path", "transform_path"]
+
+
+def _numpy():
+    # NumPy is optional: it is only imported by the functions of this module, when called.
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        raise ImportError("NumPy is required for the vectorized functions: pip install JsonFlow[numpy]") from None
+
+
+def _locate(data, key_path):
+    """
+    Returns the places of the values `query_path(data, key_path)` selects, as two lists: the
+    container (dictionary, or column of a `RecordTable`) holding each value and its key in it.
+    """
+    compiled = compile_path(key_path)
+    *parent_segments, last = compiled.segments
+    if last[0] == "deep":
+        raise ValueError("The last segment of the path must select keys, not '**'.")
+
+    parents = [data]
+    try:
+        for segment in parent_segments:
+            parents = _step_path(parents, segment)
+    except (KeyError, TypeError):
+        parents = []
+
+    containers = []
+    keys = []
+    kind, text, _ = last
+    matches = _segment_matcher(last)
+    for item in parents:
+        if isinstance(item, dict):
+            dicts = [item]
+        elif isinstance(item, list):
+            dicts = [subitem for subitem in item if isinstance(subitem, dict)]
+        elif isinstance(item, RecordTable):
+            item._locate(matches, containers, keys)
+            continue
+        else:
+            continue
+        if kind == "literal":
+            found = [dct for dct in dicts if text in dct]
+            containers.extend(found)
+            keys.extend([text] * len(found))
+        else:
+            for dct in dicts:
+                for key in dct:
+                    if matches(key):
+                        containers.append(dct)
+                        keys.append(key)
+    return containers, keys
+
+
+def gather_path(data, key_path, dtype=None):
+    """
+    Gathers the values of a key path across a document into a NumPy array.
+
+    The values are the ones `query_path(data, key_path)` returns, in the same order, so
+    "items/price" gathers the price of every record of the "items" list.
+
+    Args:
+        data (dict | list | RecordTable): The document.
+        key_path (str | CompiledPath): The path of keys, in the format accepted by `query_path`.
+            Its last segment cannot be "**".
+        dtype (optional): The NumPy dtype of the array. Defaults to the one NumPy infers.
+
+    Returns:
+        numpy.ndarray: The array of the values: one-dimensional for scalars, two-dimensional for
+        lists of the same length (e.g. embeddings), one row per value.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+
+    Example:
+        data = {"items": [{"price": 10.0}, {"price": 12.5}]}
+        gather_path(data, "items/price")  # Returns: array([10. , 12.5])
+    """
+    numpy = _numpy()
+    containers, keys = _locate(data, key_path)
+    return numpy.array(list(map(operator.getitem, containers, keys)), dtype=dtype)
+
+
+def transform_path(data, key_path, function, inplace=False, as_array=False, dtype=None):
+    """
+    Applies a vectorized function to the values of a key path, all at once.
+
+    The values are gathered into a NumPy array (see `gather_path`), `function` is called once
+    with the array, and its result is scattered back to the places the values came from, as
+    Python numbers. This replaces one Python call per value, as `soft_modify` and `query` make,
+    with one NumPy operation over all of them.
+
+    Args:
+        data (dict | list | RecordTable): The document.
+        key_path (str | CompiledPath): The path of keys, in the format accepted by `query_path`.
+            Its last segment cannot be "**".
+        function (callable): Called with the array of values; returns an array of the same
+            length (or anything NumPy broadcasts to it, such as a scalar).
+            E.g. `numpy.log1p` or `lambda prices: prices * 1.1`.
+        inplace (bool, optional): If True, the values are replaced in `data` itself. Otherwise
+            a deep copy of `data` is modified. Defaults to False.
+        as_array (bool, optional): If True, the result of `function` is returned as an array
+            and `data` is left unchanged. Defaults to False.
+        dtype (optional): The NumPy dtype of the gathered array. Defaults to the one NumPy infers.
+
+    Returns:
+        dict | list | RecordTable | numpy.ndarray: The modified document (`data` itself when
+        `inplace` is True), or the array returned by `function` if `as_array` is True.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If the result of `function` does not have one value per gathered value.
+
+    Example:
+        data = {"items": [{"price": 10.0}, {"price": 12.5}]}
+        transform_path(data, "items/price", lambda prices: prices * 2)
+        # Returns: {"items": [{"price": 20.0}, {"price": 25.0}]}
+    """
+    numpy = _numpy()
+    if not inplace and not as_array:
+        data = deepcopy(data)
+    containers, keys = _locate(data, key_path)
+    values = numpy.array(list(map(operator.getitem, containers, keys)), dtype=dtype)
+    result = numpy.asarray(function(values))
+    if as_array:
+        return result
+
+    try:
+        result = numpy.broadcast_to(result, values.shape)
+    except ValueError:
+        raise ValueError(
+            f"function returned {result.shape[0] if result.ndim else 1} value(s) for {len(values)} gathered value(s)."
+        ) from None
+    # `tolist` turns NumPy scalars back into Python numbers, which the JSON backends can encode.
+    collections.deque(map(operator.setitem, containers, keys, result.tolist()), maxlen=0)
+    return data
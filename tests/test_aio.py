@@ -0,0 +1,88 @@
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+
+from JsonFlow import aread_json_files, asave_json_files, read_json_file
+from JsonFlow import aio
+
+
+DOCUMENTS = {f"doc{number}.json": {"id": number, "items": list(range(number * 50))} for number in range(12)}
+
+
+def write_documents(folder):
+    for name, document in DOCUMENTS.items():
+        (folder / name).write_text(json.dumps(document))
+    return [folder / name for name in DOCUMENTS]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 100])
+def test_results_keep_the_order_of_the_paths(tmp_path, monkeypatch, limit):
+    paths = write_documents(tmp_path)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_read(path, backend=None):
+        # The later files finish first, so the completion order is not the order of the paths.
+        with lock:
+            running.append(path)
+            peak.append(len(running))
+        time.sleep(0.002 * (len(paths) - paths.index(path)))
+        with lock:
+            running.remove(path)
+        return read_json_file(path, backend)
+
+    monkeypatch.setattr(aio, "read_json_file", slow_read)
+    assert asyncio.run(aread_json_files(paths, limit=limit)) == list(DOCUMENTS.values())
+    # No more than `limit` files are read at the same time.
+    assert max(peak) <= limit
+    assert asyncio.run(aread_json_files(reversed(paths), limit=limit)) == list(DOCUMENTS.values())[::-1]
+
+
+def test_save_then_read(tmp_path):
+    paths = asyncio.run(asave_json_files(DOCUMENTS, str(tmp_path), indent=None, limit=3))
+    assert paths == [str(tmp_path / name) for name in DOCUMENTS]
+    assert asyncio.run(aread_json_files(paths, limit=4)) == list(DOCUMENTS.values())
+    # Pairs are accepted as well as a mapping.
+    pairs = [("first.json", {"a": 1}), ("second.json", {"b": 2})]
+    assert asyncio.run(asave_json_files(pairs, str(tmp_path))) == [str(tmp_path / name) for name, _ in pairs]
+    assert asyncio.run(aread_json_files([tmp_path / name for name, _ in pairs])) == [{"a": 1}, {"b": 2}]
+    assert asyncio.run(aread_json_files([])) == []
+
+
+def test_errors_return_puts_the_exceptions_in_place(tmp_path):
+    paths = write_documents(tmp_path)[:3]
+    (tmp_path / "broken.json").write_text("{not json")
+    paths = [paths[0], tmp_path / "missing.json", paths[1], tmp_path / "broken.json", paths[2]]
+
+    results = asyncio.run(aread_json_files(paths, limit=2, errors="return"))
+    assert results[0] == DOCUMENTS["doc0.json"]
+    assert isinstance(results[1], FileNotFoundError)
+    assert results[2] == DOCUMENTS["doc1.json"]
+    assert isinstance(results[3], json.JSONDecodeError)
+    assert results[4] == DOCUMENTS["doc2.json"]
+
+    # By default the first error is raised, once every file is done.
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(aread_json_files(paths, limit=2))
+
+    results = asyncio.run(asave_json_files({"good.json": {"a": 1}, "bad.json": {"a": object()}}, str(tmp_path), errors="return"))
+    assert results[0] == str(tmp_path / "good.json")
+    assert isinstance(results[1], TypeError)
+
+
+def test_missing_folder_and_invalid_arguments(tmp_path):
+    missing = tmp_path / "missing"
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(asave_json_files(DOCUMENTS, str(missing)))
+    # Nothing was written.
+    assert not missing.exists()
+
+    for arguments in [{"limit": 0}, {"limit": 1.5}, {"errors": "ignore"}]:
+        with pytest.raises(ValueError):
+            asyncio.run(aread_json_files([], **arguments))
+        with pytest.raises(ValueError):
+            asyncio.run(asave_json_files({}, str(tmp_path), **arguments))
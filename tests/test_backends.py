@@ -0,0 +1,72 @@
+import json
+import math
+
+import pytest
+
+from JsonFlow import available_json_backends, encode_json, decode_json, get_json_backend, RecordTable
+
+
+BACKENDS = available_json_backends()
+
+EDGE_VALUES = [
+    {"nan": float("nan"), "inf": float("inf"), "-inf": float("-inf"), "none": None},
+    [float("nan")],
+    float("-inf"),
+    {"big": 2 ** 64, "negative": -2 ** 63 - 1, "huge": 10 ** 40, "max": 2 ** 64 - 1, "min": -2 ** 63},
+    {"text": "unicode é中 \U0001f600 \"quoted\" / slash", "id": "12345678901234567890123"},
+    {"float": 0.1, "small": 5e-324, "large": 1.7976931348623157e308, "int": 1, "bool": True},
+    {1: "int key", "nested": [[], {}, [{"a": [1, 2, {"b": None}]}]]},
+]
+
+
+def same(a, b):
+    # Equality that also holds for NaN.
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("indent", [None, 2, 4])
+def test_backends_write_what_the_standard_library_reads(backend, indent):
+    for value in EDGE_VALUES:
+        encoded = encode_json(value, indent, backend)
+        assert same(json.loads(encoded), json.loads(json.dumps(value)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_what_the_standard_library_writes(backend):
+    for value in EDGE_VALUES:
+        for indent in (None, 4):
+            text = json.dumps(value, indent=indent, ensure_ascii=False)
+            expected = json.loads(text)
+            assert same(decode_json(text, backend), expected)
+            assert same(decode_json(text.encode("utf-8"), backend), expected)
+    assert decode_json(b"1e400", backend) == math.inf
+    assert decode_json(b"[123456789012345678901234567890]", backend) == [123456789012345678901234567890]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_indent_like_the_standard_library(backend):
+    value = {"a": [1, {"b": "text"}], "c": {}}
+    for indent in (2, 4):
+        assert encode_json(value, indent, backend) == json.dumps(value, indent=indent).encode()
+    assert encode_json(value, backend=backend) == json.dumps(value, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_agree_with_each_other(backend):
+    for value in EDGE_VALUES:
+        for indent in (None, 2, 4):
+            encoded = encode_json(value, indent, backend)
+            for reader in BACKENDS:
+                assert same(decode_json(encoded, reader), json.loads(json.dumps(value)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_write_record_tables_and_reject_invalid_input(backend):
+    table = RecordTable([{"a": 1, "b": "x"}, {"a": 2, "b": "y"}])
+    assert json.loads(encode_json({"table": table}, backend=backend)) == {"table": table.to_records()}
+    with pytest.raises(TypeError):
+        encode_json({"set": {1, 2}}, backend=backend)
+    with pytest.raises(json.JSONDecodeError):
+        decode_json(b'{"a": ', backend)
+    assert get_json_backend(backend).name == backend
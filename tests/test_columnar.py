@@ -0,0 +1,109 @@
+import copy
+import pickle
+
+import pytest
+
+from JsonFlow import RecordTable, query, query_path, flatten_dict
+from JsonFlow.columnar import _ABSENT
+
+
+RECORDS = [
+    {"id": 1, "name": "a", "tags": ["x"]},
+    {"id": 2, "name": "b", "tags": ["y", "z"]},
+    {"name": "c", "id": 3, "extra": {"deep": 1}},
+    {"id": 4},
+    {},
+    {"id": 6, "name": "f", "tags": [], "extra": {"deep": 2}},
+]
+
+
+def test_append_fills_the_missing_keys():
+    table = RecordTable()
+    for record in RECORDS:
+        table.append(record)
+    assert len(table) == len(RECORDS)
+    assert table == RECORDS
+    assert table.to_records() == RECORDS
+    assert table.keys() == ["id", "name", "tags", "extra"]
+    # Every column has a value per row, the rows without the key hold the marker.
+    assert all(len(column) == len(RECORDS) for column in table._columns.values())
+    assert table._columns["extra"] == [_ABSENT, _ABSENT, {"deep": 1}, _ABSENT, _ABSENT, {"deep": 2}]
+    # The records keep their key order, and rows with the same keys share a key table.
+    assert list(table[2]) == ["name", "id", "extra"]
+    assert len(table._key_tables) == 5
+    table.append({"id": 7, "name": "g", "tags": ["w"]})
+    assert len(table._key_tables) == 5
+    with pytest.raises(TypeError):
+        table.append(["not", "a", "record"])
+
+
+def test_column_select_and_project():
+    table = RecordTable(RECORDS)
+    for key in ["id", "name", "tags", "extra", "missing"]:
+        assert table.column(key) == [record[key] for record in RECORDS if key in record]
+    assert table.select(lambda key: key in ("id", "extra")) == [
+        value for record in RECORDS for key, value in record.items() if key in ("id", "extra")
+    ]
+    assert table.select(lambda key: False) == []
+    assert RecordTable([{"a": 1}, {"a": 2}]).select(lambda key: True) == [1, 2]
+
+    projected = table.project([("extra", None), ("id", lambda value: value * 10), ("missing", None)])
+    assert isinstance(projected, RecordTable)
+    assert projected == [
+        {key: record[key] if key == "extra" else record[key] * 10 for key in ("extra", "id") if key in record}
+        for record in RECORDS
+    ]
+    # The source table is unchanged.
+    assert table == RECORDS
+
+
+def test_indexing_and_slicing():
+    table = RecordTable(RECORDS)
+    assert [table[index] for index in range(len(RECORDS))] == RECORDS
+    assert table[-1] == RECORDS[-1]
+    assert table[-4] == RECORDS[-4]
+    with pytest.raises(IndexError):
+        table[len(RECORDS)]
+    for index in [slice(1, 4), slice(None, None, 2), slice(None, None, -1), slice(4, 1, -1), slice(10, 20)]:
+        part = table[index]
+        assert isinstance(part, RecordTable)
+        assert part == RECORDS[index]
+        assert part.column("id") == [record["id"] for record in RECORDS[index] if "id" in record]
+    # The records are new dictionaries.
+    table[0]["id"] = 100
+    assert table[0]["id"] == 1
+
+
+def test_copies_and_pickles_keep_the_marker():
+    table = RecordTable(RECORDS)
+    assert _ABSENT.__reduce__() == "_ABSENT"
+    for other in [copy.deepcopy(table), copy.copy(table), pickle.loads(pickle.dumps(table))]:
+        assert other == RECORDS
+        assert other._columns["extra"][0] is _ABSENT
+        assert other.column("extra") == [{"deep": 1}, {"deep": 2}]
+    assert copy.deepcopy(_ABSENT) is _ABSENT
+    assert pickle.loads(pickle.dumps(_ABSENT)) is _ABSENT
+    # Nested values are copied by a deep copy.
+    deep = copy.deepcopy(table)
+    deep.column("tags")[0].append("changed")
+    assert table[0]["tags"] == ["x"]
+
+
+def test_functions_read_a_table_as_its_records():
+    table = RecordTable(RECORDS)
+    criteria = [
+        [{"id": True, "name": lambda value: value.upper()}],
+        [{"extra": {"deep": True}, "tags": True}],
+        [lambda record: len(record)],
+        [{"missing": True}],
+    ]
+    for criterion in criteria:
+        assert query(table, criterion) == query(RECORDS, criterion)
+        assert query({"rows": table}, {"rows": criterion}) == query({"rows": RECORDS}, {"rows": criterion})
+    assert isinstance(query(table, criteria[0]), RecordTable)
+
+    for path in ["id", "name", "tags", "extra/deep", "missing"]:
+        assert query_path(table, path) == query_path(RECORDS, path)
+        assert query_path({"rows": table}, "rows/" + path) == query_path({"rows": RECORDS}, "rows/" + path)
+    assert flatten_dict(table) == flatten_dict(RECORDS)
+    assert flatten_dict({"rows": table, "other": [table]}) == flatten_dict({"rows": RECORDS, "other": [RECORDS]})
@@ -0,0 +1,164 @@
+import copy
+import random
+
+import pytest
+
+from JsonFlow import JsoniFy, RecordTable, diff_documents, apply_patch, soft_modify
+
+
+def _document(rng, depth=0):
+    if depth > 3 or rng.random() < 0.2:
+        return rng.choice([1, 2, 1.0, True, None, "a", "b", ""])
+    if rng.random() < 0.5:
+        return {rng.choice("ABCDE"): _document(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    return [_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def _edit(rng, value):
+    # A copy of `value` with a few random changes.
+    value = copy.deepcopy(value)
+    if not isinstance(value, (dict, list)) or rng.random() < 0.1:
+        return _document(rng)
+    for _ in range(rng.randint(1, 3)):
+        if isinstance(value, dict) and rng.random() < 0.15:
+            keys = list(value)
+            rng.shuffle(keys)
+            value = {key: value[key] for key in keys}
+        elif isinstance(value, dict):
+            key = rng.choice("ABCDEF")
+            if key in value and rng.random() < 0.3:
+                del value[key]
+            else:
+                value[key] = _edit(rng, value[key]) if key in value else _document(rng)
+        elif value and rng.random() < 0.6:
+            position = rng.randrange(len(value))
+            value[position] = _edit(rng, value[position])
+        elif value and rng.random() < 0.5:
+            del value[rng.randrange(len(value))]
+        else:
+            value.insert(rng.randint(0, len(value)), _document(rng))
+    return value
+
+
+def _identical(a, b):
+    # Equal, with the same types and key order everywhere (`==` finds 1, 1.0 and True equal,
+    # and dictionaries with their keys in another order).
+    if isinstance(a, dict):
+        return type(b) is dict and list(a) == list(b) and all(_identical(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return type(b) is list and len(a) == len(b) and all(map(_identical, a, b))
+    return type(a) is type(b) and a == b
+
+
+def test_patch_turns_the_old_document_into_the_new_one():
+    rng = random.Random(0)
+    for _ in range(500):
+        old = {"root": _document(rng)}
+        new = _edit(rng, old)
+        ops = diff_documents(old, new)
+        patched = apply_patch(copy.deepcopy(old), ops)
+        assert _identical(patched, new)
+        assert diff_documents(new, new) == []
+        assert diff_documents(old, copy.deepcopy(old)) == []
+
+
+def test_diff_documents_operations():
+    assert diff_documents({"A": {"B": [1, 2]}, "C": 1}, {"A": {"B": [1, 3]}, "D": 2}) == [
+        {"op": "replace", "path": "A/B[2]", "value": 3},
+        {"op": "remove", "path": "C"},
+        {"op": "add", "path": "D", "value": 2},
+    ]
+    # Inserting and removing list items gives one operation per item.
+    assert diff_documents([1, 2, 3, 4], [1, 9, 2, 3, 4]) == [{"op": "add", "path": "[2]", "value": 9}]
+    assert diff_documents({"L": [1, 2, 3, 4]}, {"L": [1, 4]}) == [
+        {"op": "remove", "path": "L[3]"},
+        {"op": "remove", "path": "L[2]"},
+    ]
+    assert diff_documents({"A": 1}, {"A": True}) == [{"op": "replace", "path": "A", "value": True}]
+    assert diff_documents({"A": [1]}, {"A": [1.0]}) == [{"op": "replace", "path": "A[1]", "value": 1.0}]
+    assert diff_documents({"A": 1}, [1]) == [{"op": "replace", "path": "", "value": [1]}]
+
+
+def test_patch_keeps_the_key_order_of_the_new_document():
+    old = {"A": 1, "B": {"x": 1, "y": 2}, "C": 3}
+    # Keys added in the middle: the keys after them are removed and added again.
+    new = {"A": 1, "D": 4, "B": {"x": 1, "y": 2}, "C": 3}
+    assert diff_documents(old, new) == [
+        {"op": "add", "path": "D", "value": 4},
+        {"op": "remove", "path": "B"},
+        {"op": "add", "path": "B", "value": new["B"]},
+        {"op": "remove", "path": "C"},
+        {"op": "add", "path": "C", "value": 3},
+    ]
+    # Keys added at the end, or removed, need nothing else.
+    assert diff_documents(old, {"A": 1, "C": 3, "E": 5}) == [
+        {"op": "remove", "path": "B"},
+        {"op": "add", "path": "E", "value": 5},
+    ]
+    for new in [
+        new,
+        {"C": 3, "B": {"x": 1, "y": 2}, "A": 1},
+        {"A": 1, "B": {"y": 2, "x": 1}, "C": 3},
+        {"A": 1, "B": {"y": 3, "z": 0, "x": 1}, "C": 3},
+        {"L": [{"b": 1, "a": 2}], **old},
+    ]:
+        patched = apply_patch(copy.deepcopy(old), diff_documents(old, new))
+        assert patched == new
+        assert list(patched) == list(new) and list(patched["B"]) == list(new["B"])
+    # Lists of dictionaries equal but for the order of their keys are not the same.
+    old = {"L": [{"a": 1, "b": 2}, {"c": 3}]}
+    new = {"L": [{"b": 2, "a": 1}, {"c": 3}]}
+    patched = apply_patch(copy.deepcopy(old), diff_documents(old, new))
+    assert [list(item) for item in patched["L"]] == [["b", "a"], ["c"]]
+
+
+def test_shared_subtrees_are_skipped():
+    data = {"A": {"Text": "x"}, "B": [{"Text": "y"}] * 1000}
+    modified = soft_modify(data, lambda key, value: "z" if value == "x" else None, share=True)
+    assert modified["B"] is data["B"]
+    assert diff_documents(data, modified) == [{"op": "replace", "path": "A/Text", "value": "z"}]
+
+
+def test_apply_patch_copies_values_and_checks_paths():
+    value = {"nested": [1]}
+    document = apply_patch({"A": {}}, [{"op": "add", "path": "A/B", "value": value}])
+    value["nested"].append(2)
+    assert document == {"A": {"B": {"nested": [1]}}}
+    assert apply_patch({"A": 1}, [{"op": "replace", "path": "", "value": [1]}]) == [1]
+
+    for op in [
+        {"op": "replace", "path": "A/missing", "value": 1},
+        {"op": "remove", "path": "A/B[3]"},
+        {"op": "add", "path": "A/B[5]", "value": 1},
+        {"op": "add", "path": "A[1]", "value": 1},
+        {"op": "remove", "path": ""},
+        {"op": "move", "path": "A"},
+        {"op": "remove", "path": "A/B[0]"},
+    ]:
+        with pytest.raises(ValueError):
+            apply_patch({"A": {"B": [1, 2]}}, [op])
+
+
+def test_keys_that_cannot_be_written_in_a_path():
+    for old, new in [({"a/b": 1}, {"a/b": 2}), ({1: 1}, {1: 2}), ({"": 1}, {})]:
+        with pytest.raises(ValueError):
+            diff_documents(old, new)
+    # Keys that do not lead to a change are not checked.
+    assert diff_documents({"a/b": 1, "c": 1}, {"a/b": 1, "c": 2}) == [{"op": "replace", "path": "c", "value": 2}]
+
+
+def test_jsonify_diff_and_patch():
+    old = {"A": {"B": [1, 2]}, "C": 1}
+    new = {"A": {"B": [1, 3]}, "D": 2}
+    replica = JsoniFy(copy.deepcopy(old), index=True)
+    assert replica.query_path("A/B") == [[1, 2]]
+    replica.patch(JsoniFy(old).diff(JsoniFy(new)))
+    assert replica.data == new
+    assert replica.query_path("A/B") == [[1, 3]]
+
+    records = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    table = JsoniFy(RecordTable(copy.deepcopy(records)))
+    changed = [{"id": 1, "name": "c"}, {"id": 2, "name": "b"}, {"id": 3, "name": "d"}]
+    table.patch(table.diff(changed))
+    assert isinstance(table.data, RecordTable)
+    assert list(table.data) == changed
@@ -0,0 +1,43 @@
+import re
+
+from JsonFlow import find_keys_by_regex, find_keys_by_patterns
+
+
+DATA = {
+    "user": {"password": "x", "api_key": "y", "profile": [{"token": 1, "name": "n"}, [{"token": 2}], "s"]},
+    "token": "z",
+    "Tokens": {"key": {"pass": 1}},
+    1: {"key1": 2},
+}
+
+PATTERNS = ["pass|token", "key$", "^T", r"(a)\1", ".", re.compile("NAME", re.IGNORECASE)]
+
+
+def test_find_keys_by_regex_keeps_its_output():
+    # The outputs of the original recursive implementation.
+    assert find_keys_by_regex(DATA, "pass|token") == {
+        "user": {"password": "x", "profile": {0: {"token": 1}, 1: {0: {"token": 2}}}},
+        "token": "z",
+        "Tokens": {"key": {"pass": 1}},
+    }
+    assert find_keys_by_regex(DATA, "pass|token", "list") == [
+        "user/password", "user/profile/0/token", "user/profile/1/0/token", "token", "Tokens/key/pass",
+    ]
+    assert find_keys_by_regex(DATA, "key$", "list") == ["user/api_key", "Tokens/key"]
+    assert find_keys_by_regex(DATA, ".", "list") == [
+        "user/password", "user/api_key", "user/profile/0/token", "user/profile/0/name", "user/profile/1/0/token",
+        "user/profile", "user", "token", "Tokens/key/pass", "Tokens/key", "Tokens", "1/key1", "1",
+    ]
+    assert find_keys_by_regex(DATA, ".") == DATA
+
+
+def test_find_keys_by_patterns_matches_find_keys_by_regex():
+    for return_type in ("dict", "list"):
+        found = find_keys_by_patterns(DATA, PATTERNS, return_type)
+        assert list(found) == PATTERNS
+        for pattern in PATTERNS:
+            assert found[pattern] == find_keys_by_regex(DATA, pattern, return_type)
+
+    named = find_keys_by_patterns(DATA, {"secret": "pass|token", "key": "key$"}, return_type="list")
+    assert named == {"secret": find_keys_by_regex(DATA, "pass|token", "list"), "key": ["user/api_key", "Tokens/key"]}
+    assert find_keys_by_patterns(DATA, []) == {}
@@ -0,0 +1,66 @@
+from itertools import islice
+
+from JsonFlow import flatten_dict, iter_flatten
+
+
+DATA = {
+    "A": {"B": [{"C": "one", "value": 1}, [2, {"value": "deep"}], 3], "D": {}},
+    "E": [],
+    "value": "root",
+    "F": {"value": None},
+}
+
+
+def _address(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def test_flatten_dict_keeps_its_output():
+    # The output of the original recursive implementation.
+    assert flatten_dict(DATA) == [
+        {"path": "A/B[1]/C", "content": "one"},
+        {"path": "A/B[1]/value", "content": 1},
+        {"path": "A/B[2][2]/value", "content": "deep"},
+        {"path": "value", "content": "root"},
+        {"path": "F/value", "content": None},
+    ]
+    assert flatten_dict(DATA, content_key="value") == [
+        {"path": "A/B[1]", "content": 1},
+        {"path": "F", "content": None},
+    ]
+    assert flatten_dict(DATA, parent_key="root", func=str)[1] == {"path": "root/A/B[1]/value", "content": "1"}
+    assert flatten_dict([{"A": 1}, 2]) == [{"path": "[1]/A", "content": 1}]
+    assert flatten_dict("text") == []
+
+
+def test_iter_flatten_matches_flatten_dict():
+    for options in [{}, {"content_key": "value"}, {"parent_key": "root", "func": str}]:
+        expected = [(item["path"], item["content"]) for item in flatten_dict(DATA, **options)]
+        assert list(iter_flatten(DATA, **options)) == expected
+    assert list(iter_flatten([{"A": 1}, 2])) == [("[1]/A", 1)]
+    assert list(iter_flatten("text")) == []
+
+
+def test_iter_flatten_path_tuples_address_the_values():
+    pairs = list(iter_flatten(DATA, path_tuples=True))
+    assert [path for path, _ in pairs] == [("A", "B", 0, "C"), ("A", "B", 0, "value"), ("A", "B", 1, 1, "value"), ("value",), ("F", "value")]
+    for path, content in pairs:
+        assert _address(DATA, path) == content
+    assert next(iter_flatten(DATA, parent_key="root", path_tuples=True))[0] == ("root", "A", "B", 0, "C")
+
+
+def test_iter_flatten_is_lazy():
+    data = {"items": [{"n": number} for number in range(100000)]}
+    assert list(islice(iter_flatten(data), 2)) == [("items[1]/n", 0), ("items[2]/n", 1)]
+
+
+def test_deep_documents_do_not_recurse():
+    data = leaf = {}
+    for _ in range(5000):
+        leaf["A"] = {}
+        leaf = leaf["A"]
+    leaf["B"] = 1
+    assert flatten_dict(data) == [{"path": "/".join(["A"] * 5000 + ["B"]), "content": 1}]
+    assert sum(1 for _ in iter_flatten(data)) == 1
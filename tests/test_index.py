@@ -0,0 +1,117 @@
+import pytest
+
+from JsonFlow import JsoniFy, PathIndex, ValueIndex, compile_path, query_path, flatten_dict, find_values_by_depth
+
+
+DATA = {
+    "A": {"B": [{"C": {"Text": "one"}}, {"C": {"Text": "two"}}, [{"C": "nested"}]]},
+    "D": [{"E": 1}, {"E": 2}],
+    "Text": "root",
+}
+
+PATHS = ["A", "A/B", "A/B/C", "A/B/C/Text", "D/E", "Text", "missing", "A/missing/C"]
+
+
+def test_indexed_query_path_matches_query_path():
+    indexed = JsoniFy(DATA, index=True)
+    for path in PATHS:
+        assert indexed.query_path(path) == query_path(DATA, path)
+    assert indexed.query_path(["A/B/C", "D/E"]) == [query_path(DATA, "A/B/C"), query_path(DATA, "D/E")]
+    # Non-literal paths fall back to the traversal.
+    assert indexed.query_path("A/*/C") == query_path(DATA, "A/*/C")
+
+
+def test_get_and_find_keys():
+    index = PathIndex(DATA)
+    assert index.get("") is DATA
+    assert index.get("A/B[2]/C") == {"Text": "two"}
+    assert index.get("A/B[3][1]/C") == "nested"
+    assert index.get("A/B[4]", "default") == "default"
+    assert index.find_keys(r"^Te") == ["A/B[1]/C/Text", "A/B[2]/C/Text", "Text"]
+    # The scalars are the ones `flatten_dict` lists, by the same paths.
+    for entry in flatten_dict(DATA):
+        assert index.get(entry["path"]) == entry["content"]
+
+
+def test_keys_with_path_syntax_do_not_collide():
+    data = {"A": [{"B": 1}, {"B": 2}], "A[1]": {"B": 9}}
+    indexed = JsoniFy(data, index=True)
+    assert indexed.query_path("A/B") == query_path(data, "A/B") == [1, 2]
+    assert indexed.query_path("A[1]/B") == query_path(data, "A[1]/B") == [9]
+    assert "A[1]/B" in indexed.path_index().ambiguous
+    with pytest.raises(ValueError):
+        indexed.get("A[1]/B")
+    assert indexed.get("A[2]/B") == 2
+
+    data = {"A/B": 1, "A": {"B": 2}}
+    indexed = JsoniFy(data, index=True)
+    assert indexed.query_path("A/B") == query_path(data, "A/B") == [2]
+
+
+def test_index_follows_in_place_modifications():
+    data = {"A": {"B": 1, "C": [{"D": 1}]}}
+    indexed = JsoniFy(data, index=True)
+    assert indexed.query_path("A/B") == [1]
+    indexed.hard_insert(["A/B"], lambda value: value + 1, inplace=True)
+    assert indexed.query_path("A/B") == [2]
+    assert indexed.get("A/B") == 2
+    indexed.hard_insert(["A/C"], lambda value: value + [{"D": 2}], inplace=True)
+    assert indexed.query_path("A/C/D") == [1, 2]
+    indexed.data = {"A": {"B": 5}}
+    assert indexed.query_path("A/B") == [5]
+
+
+def test_refresh_updates_the_node_of_its_path():
+    data = {"items": [{"id": number} for number in range(1000)], "last": {"x": 1}, "first": {"x": 0}}
+    index = PathIndex(data)
+    # Every unambiguous path knows its position, so a refresh does not scan the nodes.
+    assert all(index._order[position] == path for path, position in index._positions.items())
+    assert len(index._positions) == len(index.paths)
+    data["last"]["x"] = 2
+    assert index.refresh("last/x")
+    assert index.get("last/x") == 2
+    assert index.query_path(compile_path("last/x")) == [2]
+    assert index.query_path(compile_path("first/x")) == [0]
+
+
+VALUES = {
+    "a": {"b": "value1", "c": ["value2", "match1", {"d": "match3", "e": [["match4"]]}]},
+    "d": "match2",
+    "n": 12,
+    "f": 1.5,
+    "t": True,
+    "z": None,
+    "l": [[{"x": "match5"}]],
+}
+
+
+def test_find_values_by_depth_keeps_its_output():
+    # The output of the original recursive implementation: only the values of dictionaries are searched.
+    assert find_values_by_depth(VALUES, r"match\d") == [(["a", "c", 2, "d"], "match3"), (["d"], "match2"), (["l", 0, 0, "x"], "match5")]
+    assert find_values_by_depth(VALUES, "1") == [(["n"], 12), (["f"], 1.5)]
+    assert find_values_by_depth([{"a": "match"}, "match"], "m") == [([0, "a"], "match")]
+
+
+def test_value_index_matches_find_values_by_depth():
+    index = ValueIndex(VALUES)
+    for regex in [r"match\d", "match", "value", "1", "True|None", ".*", "^$", "m.*3", "(?i)MATCH"]:
+        assert index.find(regex) == find_values_by_depth(VALUES, regex)
+    assert index.find_prefix("match") == find_values_by_depth(VALUES, "match")
+    assert index.find_literal("12") == [(["n"], 12)]
+    assert index.find_contains("atch") == find_values_by_depth(VALUES, ".*atch")
+    assert index.find_contains("h5") == [(["l", 0, 0, "x"], "match5")]
+    assert ValueIndex([{"a": "match"}, "match"]).find("m") == [([0, "a"], "match")]
+
+    # The paths are new lists.
+    index.find("value")[0][0].append("changed")
+    assert index.find("value") == [(["a", "b"], "value1")]
+
+
+def test_find_values_uses_a_fresh_index_after_changes():
+    document = JsoniFy({"A": {"B": "old"}, "C": "other"})
+    assert document.find_values("old") == [(["A", "B"], "old")]
+    document.hard_insert(["A/B"], lambda value: "new", inplace=True)
+    assert document.find_values("old") == []
+    assert document.find_values("ne", kind="prefix") == [(["A", "B"], "new")]
+    with pytest.raises(ValueError):
+        document.find_values("x", kind="glob")
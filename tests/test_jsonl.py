@@ -0,0 +1,118 @@
+import gzip
+import json
+
+import pytest
+
+from JsonFlow import available_json_backends, iter_jsonl, write_jsonl
+from JsonFlow import main
+
+
+BACKENDS = available_json_backends()
+
+RECORDS = [
+    {"id": 1, "name": "first", "tags": ["a", "b"]},
+    {"id": 2, "name": "unicode é中 \U0001f600", "nested": {"list": [1, 2.5, None, True]}},
+    [1, 2, 3],
+    "text",
+    None,
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["records.jsonl", "records.jsonl.gz"])
+def test_round_trip(tmp_path, backend, name):
+    path = tmp_path / name
+    assert write_jsonl(path, RECORDS, backend=backend) == len(RECORDS)
+    assert list(iter_jsonl(path, backend=backend)) == RECORDS
+    # Every backend reads what the others write.
+    for other in BACKENDS:
+        assert list(iter_jsonl(path, backend=other)) == RECORDS
+    # A generator is consumed as it is written.
+    copy = tmp_path / ("copy-" + name)
+    assert write_jsonl(copy, iter_jsonl(path, backend=backend), backend=backend) == len(RECORDS)
+    assert list(iter_jsonl(copy, backend=backend)) == RECORDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compression_is_inferred_from_the_name(tmp_path, backend):
+    compressed = tmp_path / "records.jsonl.gz"
+    plain = tmp_path / "records.jsonl"
+    write_jsonl(compressed, RECORDS, backend=backend)
+    write_jsonl(plain, RECORDS, backend=backend)
+    with gzip.open(compressed, "rt", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == RECORDS
+    with open(plain, encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == RECORDS
+
+    # An explicit compression overrides the name.
+    forced = tmp_path / "forced.jsonl"
+    write_jsonl(forced, RECORDS, compression="gzip", backend=backend)
+    assert gzip.decompress(forced.read_bytes()).count(b"\n") == len(RECORDS)
+    assert list(iter_jsonl(forced, compression="gzip", backend=backend)) == RECORDS
+    with pytest.raises(ValueError):
+        write_jsonl(tmp_path / "other.jsonl", RECORDS, compression="zip")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["records.jsonl", "records.jsonl.gz"])
+def test_append(tmp_path, backend, name):
+    path = tmp_path / name
+    write_jsonl(path, RECORDS[:2], backend=backend)
+    assert write_jsonl(path, RECORDS[2:], append=True, backend=backend) == len(RECORDS) - 2
+    assert list(iter_jsonl(path, backend=backend)) == RECORDS
+    # Without append, the file is replaced.
+    write_jsonl(path, RECORDS[:1], backend=backend)
+    assert list(iter_jsonl(path, backend=backend)) == RECORDS[:1]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 5, 1000])
+def test_lines_are_written_every_buffer_size_records(tmp_path, monkeypatch, backend, buffer_size):
+    writes = []
+    open_jsonl = main._open_jsonl
+
+    class RecordingFile:
+        def __init__(self, file):
+            self.file = file
+
+        def __enter__(self):
+            self.file.__enter__()
+            return self
+
+        def __exit__(self, *exc_info):
+            return self.file.__exit__(*exc_info)
+
+        def write(self, data):
+            writes.append(data)
+            return self.file.write(data)
+
+    monkeypatch.setattr(main, "_open_jsonl", lambda *args: RecordingFile(open_jsonl(*args)))
+    path = tmp_path / "records.jsonl"
+    assert write_jsonl(path, iter(RECORDS), buffer_size=buffer_size, backend=backend) == len(RECORDS)
+    # Each bulk write is followed by its final newline.
+    chunks = [chunk for chunk in writes if chunk != b"\n"]
+    sizes = [chunk.count(b"\n") + 1 for chunk in chunks]
+    expected = [buffer_size] * (len(RECORDS) // buffer_size)
+    if len(RECORDS) % buffer_size:
+        expected.append(len(RECORDS) % buffer_size)
+    assert sizes == expected
+    assert [json.loads(line) for line in path.read_bytes().splitlines()] == RECORDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["records.jsonl", "records.jsonl.gz"])
+def test_decode_error_gives_the_line_number(tmp_path, backend, name):
+    path = tmp_path / name
+    text = b'{"id": 1}\n\n   \n{"id": 2}\n{"id": \n{"id": 4}\n'
+    path.write_bytes(gzip.compress(text) if name.endswith(".gz") else text)
+    records = iter_jsonl(path, backend=backend)
+    # Blank lines are skipped, but still counted.
+    assert next(records) == {"id": 1}
+    assert next(records) == {"id": 2}
+    with pytest.raises(json.JSONDecodeError, match="line 5"):
+        next(records)
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_jsonl(tmp_path / "missing.jsonl"))
@@ -0,0 +1,67 @@
+import copy
+import json
+
+import pytest
+
+from JsonFlow import LazyDict, LazyList, load_lazy_json, read_json_file, query_path, flatten_dict
+
+
+def _document():
+    # Large enough containers stay lazy; the strings hold brackets, quotes and escapes.
+    items = [{"id": number, "Text": f'item {number} [x] {{y}} "q" \\ é', "tags": ["a", "b"]} for number in range(200)]
+    return {
+        "meta": {"name": "catalog", "count": 200, "ratio": 0.5, "flags": [True, False, None]},
+        "items": items,
+        "index": {str(number): {"pos": number, "Text": "}" * (number % 3)} for number in range(200)},
+        "empty": {},
+        "none": [],
+    }
+
+
+def _text(document):
+    return json.dumps(document, indent=1, ensure_ascii=False).encode()
+
+
+def test_lazy_document_equals_the_loaded_one():
+    document = _document()
+    loaded = load_lazy_json(_text(document))
+    assert isinstance(loaded, LazyDict)
+    assert loaded == document
+    assert json.loads(json.dumps(load_lazy_json(_text(document)))) == document
+    assert copy.deepcopy(load_lazy_json(_text(document))) == document
+    assert load_lazy_json(b"\xef\xbb\xbf" + _text(document)) == document
+    assert load_lazy_json(b" [1, {\"a\": 2}] ") == [1, {"a": 2}]
+    assert load_lazy_json(b"12") == 12
+
+
+def test_only_the_accessed_paths_are_read():
+    loaded = load_lazy_json(_text(_document()))
+    assert loaded["meta"]["name"] == "catalog"
+    # Siblings larger than a few KiB are not read until they are reached.
+    assert type(dict.__getitem__(loaded, "items")) is LazyList
+    assert type(dict.__getitem__(loaded, "index")) is LazyDict
+    assert query_path(loaded, "items/id") == list(range(200))
+    assert type(dict.__getitem__(loaded, "index")) is LazyDict
+    assert loaded["index"]["7"] == {"pos": 7, "Text": "}"}
+
+
+def test_read_json_file_lazy(tmp_path):
+    document = _document()
+    path = tmp_path / "document.json"
+    path.write_bytes(_text(document))
+    loaded = read_json_file(path, lazy=True)
+    assert flatten_dict(loaded) == flatten_dict(document)
+    assert read_json_file(path, lazy=True) == read_json_file(path)
+
+    with pytest.raises(FileNotFoundError):
+        read_json_file(tmp_path / "missing.json", lazy=True)
+    empty = tmp_path / "empty.json"
+    empty.write_bytes(b"")
+    with pytest.raises(json.JSONDecodeError):
+        read_json_file(empty, lazy=True)
+
+
+def test_malformed_documents_raise_on_access():
+    loaded = load_lazy_json(b'{"good": 1, "bad": [1, 2,, 3]}')
+    with pytest.raises(json.JSONDecodeError):
+        loaded["bad"]
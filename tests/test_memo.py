@@ -0,0 +1,73 @@
+import pytest
+
+from JsonFlow import Memo, pure, query, soft_modify
+
+
+def _catalog(count):
+    return {"A": {"B": [{"C": {"Text": " Same  TEXT ", "Tags": ["x", "y"]}, "Id": index} for index in range(count)]}}
+
+
+def _normalize(key, value):
+    if key == "Text":
+        return " ".join(value.lower().split())
+
+
+def test_memoized_results_are_the_plain_results():
+    data = _catalog(5)
+    memo = Memo()
+    assert soft_modify(data, pure(_normalize), memo=memo) == soft_modify(data, _normalize)
+    assert soft_modify(data, pure(_normalize), share=True, memo=memo) == soft_modify(data, _normalize)
+    assert memo.hits > 0
+
+
+def test_mutable_results_are_copies():
+    split = pure(lambda key, value: {"words": value.split()} if key == "Text" else None)
+    memo = Memo()
+    first = soft_modify(_catalog(3), split, memo=memo)
+    first["A"]["B"][0]["C"]["Text"]["words"].append("changed")
+
+    second = soft_modify(_catalog(3), split, memo=memo)
+    assert memo.hits > 0
+    items = second["A"]["B"]
+    assert [item["C"]["Text"] for item in items] == [{"words": ["Same", "TEXT"]}] * 3
+    assert items[0]["C"]["Text"] is not items[1]["C"]["Text"]
+
+
+def test_shared_subtrees_are_not_shared_between_results():
+    memo = Memo()
+    data = _catalog(3)
+    result = soft_modify(data, pure(_normalize), share=True, memo=memo)
+    items = result["A"]["B"]
+    # The repeated subtrees come from the memo, but each one is a new dictionary.
+    assert items[0]["C"] is not items[1]["C"]
+    items[0]["C"]["Text"] = "changed"
+    assert items[1]["C"]["Text"] == "same text"
+
+    # The unchanged parts are shared with the document they were found in.
+    assert items[1]["C"]["Tags"] is data["A"]["B"][1]["C"]["Tags"]
+    assert items[2]["C"]["Tags"] is data["A"]["B"][2]["C"]["Tags"]
+
+    again = soft_modify(_catalog(3), pure(_normalize), share=True, memo=memo)
+    assert [item["C"]["Text"] for item in again["A"]["B"]] == ["same text"] * 3
+
+
+def test_query_results_are_copies():
+    memo = Memo()
+    data = {"A": [{"B": "x y"}, {"B": "x y"}]}
+    words = pure(lambda value: value.split())
+    first = query(data, {"A": [{"B": words}]}, memo=memo)
+    second = query(data, {"A": [{"B": words}]}, memo=memo)
+    assert first == second
+    assert memo.hits > 0
+    assert first["A"][0]["B"] is not first["A"][1]["B"]
+
+
+def test_memo_is_bounded():
+    memo = Memo(maxsize=2)
+    square = pure(lambda key, value: value * value if key == "n" else None)
+    soft_modify([{"n": number} for number in range(10)], square, memo=memo)
+    assert len(memo) == 2
+    memo.clear()
+    assert (len(memo), memo.hits, memo.misses) == (0, 0, 0)
+    with pytest.raises(ValueError):
+        Memo(maxsize=0)
@@ -0,0 +1,92 @@
+import pytest
+
+from JsonFlow import Merger, merge_content, deep_merge
+
+
+PAGES = [
+    {"a": 1, "b": [1, 2], "c": {"x": 1}, "e": {1, 2}},
+    {"a": 2, "b": [2, 3], "e": {2}},
+    {"a": 1, "d": "only", "c": {"y": 2}, "f": [{"g": 1}]},
+    {"a": 3.5, "b": [3, [4]], "f": [{"g": 1}]},
+]
+
+STRATEGIES = ["collect", "first", "last", "sum", "union", lambda key, values: (key, len(values))]
+
+
+def test_merge_content_keeps_its_output():
+    # The output of the original implementation, with the default strategy.
+    assert merge_content(PAGES[:3]) == {"a": [1, 2, 1], "b": [[1, 2], [2, 3]], "c": [{"x": 1}, {"y": 2}], "e": [{1, 2}, {2}], "d": "only", "f": [{"g": 1}]}
+    assert deep_merge({"k": PAGES[:3], "s": 1})["k"]["c"] == {"x": 1, "y": 2}
+
+
+def test_merger_matches_merge_content():
+    for strategy in STRATEGIES:
+        merger = Merger(strategy)
+        for count, page in enumerate(PAGES, 1):
+            merger.add(page)
+            assert merger.result() == merge_content(PAGES[:count], strategy)
+        assert merger.pages == len(PAGES)
+        assert Merger(strategy).extend(iter(PAGES)).result() == merge_content(PAGES, strategy)
+    assert Merger().result() == merge_content([]) == {}
+
+
+def test_results_do_not_change_with_later_pages():
+    merger = Merger()
+    merger.add({"a": 1}).add({"a": 2})
+    first = merger.result()
+    merger.add({"a": 3})
+    assert first == {"a": [1, 2]}
+    assert merger.result() == {"a": [1, 2, 3]}
+
+
+def test_invalid_pages_and_strategies():
+    with pytest.raises(TypeError):
+        Merger().add([("a", 1)])
+    with pytest.raises(ValueError):
+        Merger("average")
+    with pytest.raises(ValueError):
+        merge_content(PAGES, "average")
+
+
+DOCUMENT = {
+    "pages": [
+        {"id": 1, "tags": ["a", "b"], "meta": {"n": 1, "src": "x"}, "name": "p1"},
+        {"id": 2, "tags": ["b", "c"], "meta": {"n": 2}, "name": "p2"},
+        {"id": 2, "tags": ["c"], "meta": {"n": 3, "src": "x"}},
+    ],
+    "empty": [],
+    "k": 1,
+}
+
+
+def test_deep_merge_strategies():
+    expected = {
+        "collect": {"id": [1, 2, 2], "tags": [["a", "b"], ["b", "c"], ["c"]], "meta": {"n": [1, 2, 3], "src": ["x", "x"]}, "name": ["p1", "p2"]},
+        "first": {"id": 1, "tags": ["a", "b"], "meta": {"n": 1, "src": "x"}, "name": "p1"},
+        "last": {"id": 2, "tags": ["c"], "meta": {"n": 3, "src": "x"}, "name": "p2"},
+        "sum": {"id": 5, "tags": ["a", "b", "b", "c", "c"], "meta": {"n": 6, "src": ["x", "x"]}, "name": ["p1", "p2"]},
+        "union": {"id": [1, 2], "tags": ["a", "b", "c"], "meta": {"n": [1, 2, 3], "src": "x"}, "name": ["p1", "p2"]},
+    }
+    for strategy, pages in expected.items():
+        # An empty list is merged as a list of no dictionaries, into {} (as the original implementation does).
+        assert deep_merge(DOCUMENT, strategy) == {"pages": pages, "empty": {}, "k": 1}
+
+    count = lambda key, values: f"{key}:{len(values)}"
+    assert deep_merge(DOCUMENT, count)["pages"] == {"id": "id:3", "tags": "tags:3", "meta": {"n": "n:3", "src": "src:2"}, "name": "name:2"}
+    assert deep_merge([]) == {}
+    assert deep_merge({"a": [[]]}) == {"a": [{}]}
+    assert deep_merge("text") == "text"
+    with pytest.raises(ValueError):
+        deep_merge(DOCUMENT, "average")
+
+
+def test_merge_content_strategies():
+    pages = DOCUMENT["pages"]
+    assert merge_content(pages, "first") == {"id": 1, "tags": ["a", "b"], "meta": {"n": 1, "src": "x"}, "name": "p1"}
+    assert merge_content(pages, "last") == {"id": 2, "tags": ["c"], "meta": {"n": 3, "src": "x"}, "name": "p2"}
+    # Only the values of the keys found in several dictionaries are combined; "meta" holds dictionaries, so it is collected.
+    assert merge_content(pages, "sum") == {"id": 5, "tags": ["a", "b", "b", "c", "c"], "meta": [{"n": 1, "src": "x"}, {"n": 2}, {"n": 3, "src": "x"}], "name": ["p1", "p2"]}
+    assert merge_content(pages, "union") == {"id": [1, 2], "tags": ["a", "b", "c"], "meta": [{"n": 1, "src": "x"}, {"n": 2}, {"n": 3, "src": "x"}], "name": ["p1", "p2"]}
+    assert merge_content(pages, lambda key, values: len(values)) == {"id": 3, "tags": 3, "meta": 3, "name": 2}
+    assert merge_content([{"a": 1}, {"a": 1.0}, {"a": True}], "union") == {"a": 1}
+    assert merge_content([{"a": 1}, {"b": 2}], "sum") == {"a": 1, "b": 2}
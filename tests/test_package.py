@@ -0,0 +1,33 @@
+import importlib
+
+import JsonFlow
+
+
+SUBMODULES = ["backends", "columnar", "main", "jsonify", "stream", "index", "lazy", "profiling", "memo", "diff"]
+
+
+def test_star_import_exports_only_the_public_names():
+    namespace = {}
+    exec("import copy\nfrom JsonFlow import *", namespace)
+    # The modules the submodules import are not exported over the caller's names.
+    assert hasattr(namespace["copy"], "deepcopy")
+    for name in ["json", "os", "re", "sys", "Path", "OrderedDict", "main", "jsonify", "lazy"]:
+        assert name not in namespace
+    for name in ["JsoniFy", "query", "Memo", "PathIndex", "RecordPool", "gather_path", "aread_json_files"]:
+        assert name in namespace
+
+
+def test_all_lists_every_submodule_name():
+    expected = []
+    for name in SUBMODULES:
+        expected.extend(importlib.import_module(f"JsonFlow.{name}").__all__)
+    lazy = {}
+    for name, module in JsonFlow._LAZY_NAMES.items():
+        lazy.setdefault(module, []).append(name)
+    for module, names in lazy.items():
+        assert names == importlib.import_module(f"JsonFlow.{module}").__all__
+        expected.extend(names)
+    assert JsonFlow.__all__ == expected
+    assert len(set(expected)) == len(expected)
+    for name in JsonFlow.__all__:
+        assert getattr(JsonFlow, name) is not None
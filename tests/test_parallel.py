@@ -0,0 +1,63 @@
+import sys
+import functools
+
+import pytest
+
+from JsonFlow import map_records, RecordPool, RecordError, BatchError, JsoniFy, flatten_dict, soft_modify
+from JsonFlow import parallel
+
+
+RECORDS = [{"id": n, "name": f"name {n}", "tags": [{"t": n % 3}]} for n in range(50)]
+
+
+def invert(record):
+    return 1 / record["id"]
+
+
+def test_map_records_matches_a_loop():
+    expected = [flatten_dict(record) for record in RECORDS]
+    assert map_records(RECORDS, flatten_dict, processes=2, chunk_size=7) == expected
+    assert map_records(iter(RECORDS), flatten_dict, processes=1, chunk_size=7) == expected
+    # Forked workers inherit the function, so closures work too.
+    assert map_records(RECORDS, lambda record: record["id"] * 2, processes=2, chunk_size=7) == [n * 2 for n in range(50)]
+
+
+def test_map_records_errors():
+    with pytest.raises(BatchError) as raised:
+        map_records(RECORDS, invert, processes=2, chunk_size=10)
+    assert [failure.index for failure in raised.value.failures] == [0]
+    assert isinstance(raised.value.failures[0].error, ZeroDivisionError)
+    results = map_records(RECORDS, invert, processes=2, chunk_size=10, errors="return")
+    assert isinstance(results[0], RecordError) and results[1] == 1.0
+    with pytest.raises(ValueError):
+        map_records(RECORDS, invert, errors="ignore")
+    with pytest.raises(ValueError):
+        map_records(RECORDS, invert, chunk_size=0)
+
+
+def test_start_method_is_fork_only_on_linux(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    assert parallel._start_method() == "fork"
+    for platform in ("darwin", "win32"):
+        monkeypatch.setattr(sys, "platform", platform)
+        assert parallel._start_method() == "spawn"
+        assert RecordPool(2).start_method == "spawn"
+
+
+def test_record_pool_is_reused():
+    modify = functools.partial(soft_modify, value_function=parallel_upper)
+    expected = [soft_modify(record, parallel_upper) for record in RECORDS]
+    with RecordPool(2) as pool:
+        assert map_records(RECORDS, modify, chunk_size=9, pool=pool) == expected
+        workers = pool._pool
+        assert JsoniFy(RECORDS).map_records(flatten_dict, chunk_size=9, pool=pool) == [flatten_dict(r) for r in RECORDS]
+        assert pool._pool is workers
+        results = map_records(RECORDS, invert, chunk_size=9, errors="return", pool=pool)
+        assert isinstance(results[0], RecordError)
+        with pytest.raises(TypeError):
+            map_records(RECORDS, lambda record: record, chunk_size=9, pool=pool)
+    assert pool._pool is None
+
+
+def parallel_upper(key, value):
+    return value.upper() if isinstance(value, str) else None
@@ -0,0 +1,129 @@
+import sys
+import copy
+import types
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import JsonFlow
+from JsonFlow import (
+    JsoniFy, CallRecord, profile, enable_profiling, disable_profiling, get_profiler, instrument,
+    query_path, flatten_dict,
+)
+from JsonFlow import main
+
+
+DATA = {"A": {"B1": {"C": 1}, "B2": {"C": 2}}, "L": [{"x": n, "y": {"z": n}} for n in range(100)]}
+CRITERIA = {"L": [{"x": True, "y": {"z": True}}]}
+
+
+@instrument()
+def load_batch(size):
+    return list(range(size))
+
+
+def test_disabled_profiling_leaves_the_plain_functions():
+    assert get_profiler() is None
+    for function in (query_path, JsonFlow.query_path, main.query, JsoniFy.query_path, JsoniFy.__init__, JsoniFy.get):
+        assert not hasattr(function, "__wrapped__")
+    assert main._drive.__name__ == "_drive" and main.deepcopy is copy.deepcopy
+    assert pickle.loads(pickle.dumps(query_path)) is query_path
+
+
+def test_profile_measures_calls_and_restores_the_functions():
+    records = []
+    with profile(callback=records.append) as profiler:
+        # The functions of the package and the methods of `JsoniFy` are measured; the names this
+        # module imported before profiling started are left alone.
+        assert hasattr(JsonFlow.query_path, "__wrapped__") and hasattr(JsoniFy.query_path, "__wrapped__")
+        assert not hasattr(query_path, "__wrapped__")
+        document = JsoniFy(DATA, index=True)
+        document.query_path("A/B1/C")
+        document.query_path("A/B1/C")
+        document(CRITERIA, cache=True)
+        document(CRITERIA, cache=True)
+        document.soft_insert(lambda key, value: None)
+        JsonFlow.flatten_dict(DATA)
+        list(JsonFlow.iter_flatten(DATA))
+        load_batch(3)
+        with pytest.raises(ValueError):
+            JsonFlow.query(DATA, False)
+    stats = profiler.stats
+    assert not hasattr(JsonFlow.query_path, "__wrapped__") and get_profiler() is None
+    assert stats["query"].errors == 1
+    assert stats["JsoniFy.__call__"].cache_hits == 1 and stats["JsoniFy.__call__"].cache_misses == 1
+    # The first call compiles the path and builds the index, counted in the measurement of the method.
+    assert stats["JsoniFy.query_path"].calls == 2
+    assert stats["JsoniFy.query_path"].cache_misses == 2 and stats["JsoniFy.query_path"].cache_hits == 2
+    assert "JsoniFy.path_index" not in stats and "JsoniFy.__init__" not in stats
+    assert stats["JsoniFy.soft_insert"].copy_bytes > 0 and stats["soft_modify"].nodes > 0
+    assert stats["iter_flatten"].nodes == stats["flatten_dict"].nodes > 0
+    assert stats["load_batch"].calls == 1
+    assert records and all(isinstance(record, CallRecord) for record in records)
+
+
+def test_profile_measures_every_thread():
+    with profile() as profiler:
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda n: JsonFlow.flatten_dict(DATA), range(20)))
+    assert profiler.stats["flatten_dict"].calls == 20
+
+
+def test_nested_functions_are_always_measured():
+    @instrument("nested")
+    def nested():
+        return 1
+
+    assert nested() == 1
+    with profile() as profiler:
+        nested()
+    assert profiler.stats["nested"].calls == 1
+
+
+def test_enable_and_disable_profiling():
+    profiler = enable_profiling()
+    try:
+        JsonFlow.soft_modify(DATA, lambda key, value: None)
+        assert get_profiler() is profiler
+    finally:
+        assert disable_profiling() is profiler
+    assert disable_profiling() is None
+    assert profiler.stats["soft_modify"].calls == 1
+    assert "soft_modify" in profiler.report()
+
+
+def test_other_modules_are_left_alone(monkeypatch):
+    module = types.ModuleType("user_module")
+    module.query_path = query_path
+    module.flatten_dict = flatten_dict
+    monkeypatch.setitem(sys.modules, "user_module", module)
+    with profile() as profiler:
+        assert module.query_path is query_path and module.flatten_dict is flatten_dict
+        module.flatten_dict(DATA)
+        JsonFlow.flatten_dict(DATA)
+    assert profiler.stats["flatten_dict"].calls == 1
+
+
+def test_recursive_fast_path_is_kept_and_counted():
+    depth = main.RECURSION_DEPTH
+    shallow = {"A": {"B": {"C": 1}}, "L": [{"x": 1}, {"y": {"z": 2}}]}
+    deep = {"leaf": 0}
+    for _ in range(depth * 2):
+        deep = {"child": deep}
+    calls = []
+
+    def recursion_depth(key, value):
+        calls.append(main.RECURSION_DEPTH)
+
+    with profile() as profiler:
+        JsonFlow.soft_modify(shallow, recursion_depth)
+        assert calls and set(calls) == {depth}
+        shallow_nodes = profiler.stats["soft_modify"].nodes
+        JsonFlow.soft_modify(deep, lambda key, value: None)
+        JsonFlow.soft_modify([shallow, shallow], lambda key, value: None)
+    stats = profiler.stats["soft_modify"]
+    # Every dictionary is counted once, walked by the recursion or by `_drive` below its depth.
+    assert shallow_nodes == 6
+    assert stats.nodes == 6 + (depth * 2 + 1) + 12
+    assert main.RECURSION_DEPTH == depth
@@ -0,0 +1,54 @@
+from JsonFlow import query, compile_query, CompiledQuery, JsoniFy
+from JsonFlow import jsonify
+
+
+DATA = {
+    "name": "John",
+    "age": 30,
+    "address": {"city": "New York", "state": "NY"},
+    "orders": [{"id": 1, "item": "pen"}, {"id": 2, "item": "ink"}],
+}
+
+CRITERIA = [
+    {"name": True, "address": {"city": str.upper}},
+    {"orders": [{"item": str.upper}]},
+    {"orders": {0: {"id": True}}},
+    [{"name": True, "address": {"city": True}}],
+    {"missing": True, "age": lambda age: age + 1},
+]
+
+
+def test_compiled_query_matches_query():
+    for criteria in CRITERIA:
+        plan = compile_query(criteria)
+        assert isinstance(plan, CompiledQuery)
+        assert plan(DATA) == query(DATA, criteria)
+        assert query(DATA, plan) == query(DATA, criteria)
+
+
+def test_compile_query_returns_plans_unchanged():
+    plan = compile_query({"name": True})
+    assert compile_query(plan) is plan
+
+
+def test_cached_plans_are_reused_for_the_same_criteria():
+    document = JsoniFy(DATA)
+    criteria = {"name": True}
+    assert document(criteria, cache=True) == {"name": "John"}
+    plan = document._plans[id(criteria)][1]
+    assert document(criteria, cache=True) == {"name": "John"}
+    assert document._plans[id(criteria)][1] is plan
+
+
+def test_plan_cache_is_bounded():
+    document = JsoniFy(DATA)
+    for n in range(jsonify.PLAN_CACHE_SIZE * 3):
+        assert document({"age": lambda age, n=n: age + n}, cache=True) == {"age": 30 + n}
+    assert len(document._plans) == jsonify.PLAN_CACHE_SIZE
+
+
+def test_plan_cache_does_not_confuse_recycled_ids():
+    document = JsoniFy(DATA)
+    # Fresh criteria objects often reuse the id of a freed one: each must get its own plan.
+    for key in ["name", "age", "address"] * 20:
+        assert document({key: True}, cache=True) == {key: DATA[key]}
@@ -0,0 +1,109 @@
+import json
+
+from JsonFlow import CompiledPath, JsoniFy, compile_path, query_path, query_paths, stream_query_path
+from JsonFlow import main
+
+
+DATA = {
+    "A": {
+        "B1": {"C": "b1"},
+        "B2": {"C": "b2"},
+        "B10": {"C": "b10"},
+        "list": [{"C": "l1"}, {"D": "no C"}, {"C": "l2"}, "plain", [{"C": "nested list"}]],
+    },
+    "v1.0": {"C": "dotted"},
+    "v1x0": {"C": "not dotted"},
+    "re:x": {"C": "prefixed key"},
+    "re:[": {"C": "invalid pattern key"},
+    "*": {"C": "star key"},
+}
+
+
+def test_literal_segments():
+    assert query_path(DATA, "A/B1/C") == ["b1"]
+    assert query_path(DATA, "A/list/C") == ["l1", "l2"]
+    assert query_path(DATA, "A/missing/C") == []
+    assert query_path(DATA, "A/B1/C/deeper") == []
+    # Regular expression characters have no meaning in a literal segment, as in earlier versions.
+    assert query_path(DATA, "v1.0/C") == ["dotted"]
+    assert query_path(DATA, "A/B./C") == []
+    assert compile_path("v1.0/C").is_literal
+
+
+def test_regex_segments_match_whole_keys():
+    assert query_path(DATA, "A/re:B\\d/C") == ["b1", "b2"]
+    assert query_path(DATA, "A/re:B\\d+/C") == ["b1", "b2", "b10"]
+    assert query_path(DATA, "re:v1.0/C") == ["dotted", "not dotted"]
+    assert query_path(DATA, "A/re:B/C") == []
+    assert query_path(DATA, "re:A|v1x0/re:B1|list/C") == ["b1", "l1", "l2"]
+    assert [kind for kind, _, _ in compile_path("A/re:B\\d/C").segments] == ["literal", "regex", "literal"]
+
+
+def test_regex_segments_also_match_their_own_text():
+    # A key equal to the whole segment matches, so keys starting with "re:" can still be addressed.
+    assert query_path(DATA, "re:x/C") == ["prefixed key"]
+    # A segment whose pattern is not valid is a literal key.
+    assert compile_path("re:[/C").segments[0][0] == "literal"
+    assert query_path(DATA, "re:[/C") == ["invalid pattern key"]
+
+
+def test_wildcard_segments():
+    assert query_path(DATA, "A/*/C") == ["b1", "b2", "b10", "l1", "l2"]
+    assert query_path(DATA, "*/C") == ["dotted", "not dotted", "prefixed key", "invalid pattern key", "star key"]
+    assert query_path({"A": [{"x": 1}, {"y": 2}]}, "A/*") == [1, 2]
+
+
+def test_deep_segments():
+    assert query_path(DATA, "**/C") == [
+        "b1", "b2", "b10", "l1", "l2", "nested list", "dotted", "not dotted", "prefixed key", "invalid pattern key", "star key",
+    ]
+    assert query_path(DATA, "A/**/C") == ["b1", "b2", "b10", "l1", "l2", "nested list"]
+    assert query_path({"A": {"A": {"A": 1}}}, "**/A") == [{"A": {"A": 1}}, {"A": 1}, 1]
+    assert query_path(DATA, "**")[0] is DATA
+
+
+def test_other_evaluators_follow_the_grammar():
+    text = json.dumps(DATA).encode()
+    for path in ["A/re:B\\d/C", "re:v1.0/C", "v1.0/C", "re:x/C", "*/C", "A/list/C"]:
+        assert list(stream_query_path(text, path)) == query_path(DATA, path)
+        assert JsoniFy(DATA, index=True).query_path(path) == query_path(DATA, path)
+        assert compile_path(path)(DATA) == query_path(DATA, path)
+
+
+def test_compile_path_cache():
+    compile_path.cache_clear()
+    first = compile_path("A/re:B\\d/C")
+    assert compile_path("A/re:B\\d/C") is first
+    assert compile_path(first) is first
+    assert isinstance(first, CompiledPath)
+    info = compile_path.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+    for number in range(main.PATH_CACHE_SIZE + 10):
+        compile_path(f"A/B{number}")
+    assert compile_path.cache_info().currsize == main.PATH_CACHE_SIZE
+    # The oldest paths were evicted.
+    assert compile_path("A/re:B\\d/C") is not first
+
+
+PATHS = [
+    "A/B1/C", "A/B2/C", "A/B1", "A/B1/C", "A", "A/list/C", "A/list/D", "A/missing/C", "missing",
+    "A/re:B\\d/C", "A/re:B\\d+/C", "A/*/C", "**/C", "A/**/C", "*/C", "v1.0/C", "A/B1/C/deeper", "re:x/C",
+]
+
+
+def test_query_paths_matches_query_path():
+    results = query_paths(DATA, PATHS)
+    assert results == [query_path(DATA, path) for path in PATHS]
+    # Duplicate paths get separate lists.
+    assert results[0] is not results[3]
+    results[0].append("changed")
+    assert results[3] == ["b1"]
+    assert query_paths(DATA, [compile_path("A/B1/C"), "A/B1/C"]) == [["b1"], ["b1"]]
+    assert query_paths(DATA, []) == []
+    assert query_paths([DATA, {"A": {"B1": {"C": "second"}}}], ["A/B1/C", "v1.0/C"]) == [["b1", "second"], ["dotted"]]
+
+
+def test_jsonify_query_path_with_a_list_of_paths():
+    for document in (JsoniFy(DATA), JsoniFy(DATA, index=True)):
+        assert document.query_path(PATHS) == [query_path(DATA, path) for path in PATHS]
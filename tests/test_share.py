@@ -0,0 +1,72 @@
+import copy
+
+from JsonFlow import JsoniFy, soft_modify, hard_modify
+
+
+def _document():
+    return {
+        "A": {"B": [{"C": "one", "D": {"E": 1}}, {"C": "two", "D": {"E": 2}}], "F": {"G": [1, 2]}},
+        "H": [{"C": "three"}, "plain", [{"C": "nested"}]],
+        "I": {"J": {"K": "untouched"}},
+    }
+
+
+def _upper(key, value):
+    if key == "C":
+        return value.upper()
+
+
+def test_shared_soft_modify_matches_the_copy():
+    data = _document()
+    before = copy.deepcopy(data)
+    shared = soft_modify(data, _upper, share=True)
+    assert shared == soft_modify(data, _upper)
+    assert data == before
+    # As in the copy, dictionaries in lists of lists are not walked.
+    assert shared["H"] == [{"C": "THREE"}, "plain", [{"C": "nested"}]]
+
+    # Only the containers on the way to a replaced value are new.
+    assert shared is not data
+    assert shared["A"]["B"][0] is not data["A"]["B"][0]
+    assert shared["A"]["B"][0]["D"] is data["A"]["B"][0]["D"]
+    assert shared["A"]["F"] is data["A"]["F"]
+    assert shared["I"] is data["I"]
+
+
+def test_shared_soft_modify_without_changes_returns_the_data():
+    data = _document()
+    assert soft_modify(data, lambda key, value: None, share=True) is data
+    records = [{"C": "x"}, {"K": 1}]
+    shared = soft_modify(records, _upper, share=True)
+    assert shared == [{"C": "X"}, {"K": 1}]
+    assert shared[1] is records[1]
+
+
+def test_shared_hard_modify_matches_the_copy():
+    data = _document()
+    before = copy.deepcopy(data)
+    for path in ["A/F/G", "I/J/K", "A/missing/K", "H"]:
+        shared = hard_modify(data, path, lambda value: [value], share=True)
+        assert shared == hard_modify(data, path, lambda value: [value])
+    assert data == before
+
+    shared = hard_modify(data, "I/J/K", str.upper, share=True)
+    assert shared["I"]["J"] is not data["I"]["J"]
+    assert shared["A"] is data["A"]
+    assert shared["H"] is data["H"]
+
+
+def test_combined_hard_insert_matches_successive_modifications():
+    data = _document()
+    paths = ["I/J/K", "A/F/G", "I/J/K"]
+    funs = [str.upper, len, lambda value: value + "!"]
+    combined = JsoniFy(data).hard_insert(paths, funs, combine=True)
+
+    expected = copy.deepcopy(data)
+    for path, fun in zip(paths, funs):
+        hard_modify(expected, path, fun, inplace=True)
+    assert combined == expected
+    assert combined["A"]["B"] is data["A"]["B"]
+    assert data == _document()
+
+    assert JsoniFy(data).hard_insert(["A/F/G"], len, share=True) == JsoniFy(data).hard_insert(["A/F/G"], len)
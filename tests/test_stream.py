@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from JsonFlow import stream_query_path, query_path
+
+
+DATA = {
+    "A": [
+        {"B": {"C": 'quote " and backslash \\', "D": [1, 2.5, None]}},
+        {"B": {"C": "unicode é中\U0001f600", "D": True}},
+        {"X": {"C": "skipped"}},
+    ],
+    "E": {"B": 1e30},
+    "F": "ends with \\\\",
+}
+
+PATHS = ["A/B", "A/B/C", "A/B/D", "E/B", "F", "A/*/C", "*/B", "missing/B"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 65536])
+def test_stream_matches_query_path(chunk_size):
+    raw = json.dumps(DATA, ensure_ascii=False).encode()
+    for path in PATHS:
+        assert list(stream_query_path(raw, path, chunk_size=chunk_size)) == query_path(DATA, path)
+
+
+def test_stream_reads_text_and_binary_files(tmp_path):
+    text = json.dumps(DATA, ensure_ascii=False)
+    file = tmp_path / "data.json"
+    file.write_text(text, encoding="utf-8")
+    expected = query_path(DATA, "A/B/C")
+    assert list(stream_query_path(file, "A/B/C", chunk_size=5)) == expected
+    assert list(stream_query_path(str(file), "A/B/C")) == expected
+    assert list(stream_query_path(io.StringIO(text), "A/B/C", chunk_size=3)) == expected
+    assert list(stream_query_path(io.BytesIO(text.encode()), "A/B/C", chunk_size=3)) == expected
+
+
+def test_stream_captures_large_matches():
+    records = [{"text": 'line "%d" \\ end' % n, "values": [n, n / 2, None, False]} for n in range(20000)]
+    document = {"head": {"B": 0}, "A": {"B": records, "C": 5}, "tail": {"B": 1}}
+    raw = json.dumps(document).encode()
+    assert list(stream_query_path(raw, "A/B", chunk_size=1000)) == [records]
+    assert list(stream_query_path(raw, "*/B", chunk_size=1000)) == [0, records, 1]
+
+
+def test_stream_numbers_split_across_chunks():
+    raw = b'{"A": [{"B": 123456789}, {"B": -1.5e10}, {"B": true}], "C": 42}'
+    for chunk_size in (1, 3, 4):
+        assert list(stream_query_path(raw, "A/B", chunk_size=chunk_size)) == [123456789, -1.5e10, True]
+        assert list(stream_query_path(raw, "C", chunk_size=chunk_size)) == [42]
+
+
+def test_stream_rejects_truncated_input():
+    with pytest.raises(ValueError):
+        list(stream_query_path(b'{"A": {"B": [1, 2', "A/B", chunk_size=4))
+    with pytest.raises(ValueError):
+        list(stream_query_path(b'{"A": {"C": [1, 2', "A/B", chunk_size=4))
+    with pytest.raises(ValueError):
+        list(stream_query_path(b'{"A": "unterminated', "B"))
@@ -0,0 +1,47 @@
+from JsonFlow import structure_data, flatten_dict
+
+
+ROWS = [
+    {"path": "A/B[1]", "content": "x"},
+    {"path": "A/B[2]", "content": "y"},
+    {"path": "A/C", "content": {"k": 1, "j": 2}},
+    {"path": "D[1]/E", "content": 3},
+    {"path": "D[2]/E", "content": 4},
+]
+
+
+def test_structure_data_keeps_its_output():
+    # The outputs of the original recursive implementation.
+    assert structure_data(ROWS) == {
+        "A": {"B[1]": {"value": {"content_value": ["x"]}}, "B[2]": {"value": {"content_value": ["y"]}}, "C": {"value": {"k": 1, "j": 2}}},
+        "D[1]": {"E": {"value": {"content_value": [3]}}},
+        "D[2]": {"E": {"value": {"content_value": [4]}}},
+    }
+    assert structure_data(ROWS, nested=True) == {"A": {"B[1]": "x", "B[2]": "y", "C": {"k": 1, "j": 2}}, "D[1]": {"E": 3}, "D[2]": {"E": 4}}
+    assert structure_data(ROWS, adjust_list=True) == {
+        "A": {"B": [{"value": {"content_value": ["x"]}}, {"value": {"content_value": ["y"]}}], "C": {"value": {"k": 1, "j": 2}}},
+        "D": [{"E": {"value": {"content_value": [3]}}}, {"E": {"value": {"content_value": [4]}}}],
+    }
+    assert structure_data(ROWS, nested=True, adjust_list=True) == {"A": {"B": ["x", "y"], "C": {"k": 1, "j": 2}}, "D": [{"E": 3}, {"E": 4}]}
+    assert structure_data(ROWS, nested=True, keys_content=["k"])["A"]["C"] == {"k": 1}
+    assert structure_data(ROWS, keys_content=["k"])["A"]["C"] == {"value": {"k": 1}}
+
+
+def test_structure_data_rebuilds_flattened_documents():
+    document = {"A": {"B": [{"C": "one"}, {"C": "two"}], "E": "x"}, "F": 1}
+    assert structure_data(flatten_dict(document), nested=True, adjust_list=True) == document
+    assert structure_data(flatten_dict(document))["A"]["B[2]"] == {"C": {"value": {"content_value": ["two"]}}}
+
+
+def test_siblings_after_another_parent_are_merged():
+    # Rows with the same parent that are not consecutive go to the same dictionary.
+    rows = [{"path": "A/B", "content": 1}, {"path": "C/D", "content": 2}, {"path": "A/E", "content": 3}]
+    assert structure_data(rows, nested=True) == {"A": {"B": 1, "E": 3}, "C": {"D": 2}}
+
+
+def test_deep_paths_do_not_recurse():
+    path = "/".join(["A"] * 5000)
+    result = structure_data([{"path": path, "content": 1}], nested=True)
+    for _ in range(5000):
+        result = result["A"]
+    assert result == 1
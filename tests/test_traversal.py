@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+from JsonFlow import main, soft_modify, flatten_dict, iter_flatten, find_keys_by_regex, traverse
+
+
+def deep_document(depth):
+    data = current = {}
+    for level in range(depth):
+        current["A"] = {"Text": f"level {level}", "B": [{"C": level}, 2]}
+        current = current["A"]
+    return data
+
+
+def upper(key, value):
+    return value.upper() if isinstance(value, str) else None
+
+
+def test_soft_modify_fast_path_matches_explicit_stack(monkeypatch):
+    # Deeper than `RECURSION_DEPTH`, so both traversals are used in one call.
+    depth = main.RECURSION_DEPTH + 50
+    fast = soft_modify(deep_document(depth), upper, inplace=True)
+    monkeypatch.setattr(main, "RECURSION_DEPTH", 0)
+    stacked = soft_modify(deep_document(depth), upper, inplace=True)
+    assert fast == stacked
+    node = fast
+    for level in range(depth):
+        node = node["A"]
+        assert node["Text"] == f"LEVEL {level}"
+
+
+def test_soft_modify_beyond_the_recursion_limit():
+    depth = sys.getrecursionlimit() * 3
+    for data in (soft_modify(deep_document(depth), upper, inplace=True),
+                 soft_modify([deep_document(depth)], upper, inplace=True)[0]):
+        texts = []
+        traverse(data, visit=lambda path, value, parent: texts.append(value) if path[-1] == "Text" else None)
+        assert texts == [f"LEVEL {level}" for level in range(depth)]
+
+
+def test_walkers_beyond_the_recursion_limit():
+    depth = sys.getrecursionlimit() * 3
+    data = deep_document(depth)
+    flat = flatten_dict(data)
+    assert len(flat) == depth * 2
+    assert [{"path": path, "content": content} for path, content in iter_flatten(data)] == flat
+    assert len(find_keys_by_regex(data, "^C$", "list")) == depth
+    visited = []
+    traverse(data, visit=lambda path, value, parent: visited.append(len(path)))
+    assert max(visited) == depth + 3
+
+
+def test_soft_modify_rejects_lists_of_scalars():
+    with pytest.raises(ValueError):
+        soft_modify([1, 2], upper)
@@ -0,0 +1,107 @@
+import sys
+
+import pytest
+
+from JsonFlow import RecordTable, gather_path, transform_path, query_path
+
+numpy = pytest.importorskip("numpy")
+
+
+DATA = {
+    "items": [{"price": 10.0, "qty": 1}, {"price": 12.5}, {"qty": 3}, {"price": 1, "qty": 2}],
+    "other": {"price": 100.0},
+    "list": [[{"price": 5.0}], {"price": 6.0}],
+}
+
+
+def test_gather_path_follows_query_path():
+    for path in ["items/price", "items/qty", "*/price", "re:items|other/price", "items/missing", "missing/price"]:
+        assert gather_path(DATA, path).tolist() == query_path(DATA, path)
+    assert gather_path(DATA, "items/price", dtype="float32").dtype == numpy.float32
+    assert gather_path({"vectors": [{"v": [1, 2]}, {"v": [3, 4]}]}, "vectors/v").shape == (2, 2)
+    with pytest.raises(ValueError):
+        gather_path(DATA, "items/**")
+
+
+def test_transform_path_scatters_in_order():
+    result = transform_path(DATA, "items/price", lambda prices: prices * 2)
+    assert query_path(result, "items/price") == [20.0, 25.0, 2.0]
+    # Only the selected values change.
+    assert query_path(result, "items/qty") == query_path(DATA, "items/qty")
+    assert result["other"] == DATA["other"]
+    # Each value gets the result at its own position.
+    result = transform_path(DATA, "*/price", lambda prices: numpy.arange(len(prices)))
+    assert query_path(result, "*/price") == list(range(len(query_path(DATA, "*/price"))))
+    assert query_path(result, "items/price") == [0, 1, 2]
+    assert result["other"]["price"] == 3
+    # The values are Python numbers again.
+    assert type(result["items"][0]["price"]) is int
+    # A scalar is broadcast to every value.
+    assert query_path(transform_path(DATA, "items/qty", lambda qty: 0), "items/qty") == [0, 0, 0]
+
+
+def test_transform_path_copies_unless_inplace():
+    data = {"items": [{"price": 10.0}, {"price": 12.5}]}
+    result = transform_path(data, "items/price", lambda prices: prices + 1)
+    assert result is not data
+    assert data == {"items": [{"price": 10.0}, {"price": 12.5}]}
+    assert result == {"items": [{"price": 11.0}, {"price": 13.5}]}
+
+    result = transform_path(data, "items/price", lambda prices: prices + 1, inplace=True)
+    assert result is data
+    assert data == {"items": [{"price": 11.0}, {"price": 13.5}]}
+
+
+def test_as_array():
+    data = {"items": [{"price": 10.0}, {"price": 12.5}]}
+    result = transform_path(data, "items/price", lambda prices: prices * 2, as_array=True)
+    assert isinstance(result, numpy.ndarray)
+    assert result.tolist() == [20.0, 25.0]
+    # The document is left unchanged, even with inplace.
+    transform_path(data, "items/price", lambda prices: prices * 2, inplace=True, as_array=True)
+    assert data == {"items": [{"price": 10.0}, {"price": 12.5}]}
+    # Any shape is returned, as the function gives it.
+    assert transform_path(data, "items/price", numpy.sum, as_array=True) == 22.5
+
+
+def test_without_numpy(monkeypatch):
+    # An import of a module set to None in `sys.modules` raises ImportError.
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    data = {"items": [{"price": 10.0}, {"price": 12.5}]}
+    for call in [
+        lambda: gather_path(data, "items/price"),
+        lambda: transform_path(data, "items/price", lambda prices: prices),
+        lambda: transform_path(data, "items/price", lambda prices: prices, as_array=True),
+    ]:
+        with pytest.raises(ImportError, match="NumPy is required"):
+            call()
+    assert data == {"items": [{"price": 10.0}, {"price": 12.5}]}
+
+
+def test_shape_mismatch():
+    data = {"items": [{"price": 10.0}, {"price": 12.5}, {"price": 1.0}]}
+    with pytest.raises(ValueError, match="2 value"):
+        transform_path(data, "items/price", lambda prices: prices[:2])
+    with pytest.raises(ValueError):
+        transform_path(data, "items/price", lambda prices: numpy.zeros((3, 2)))
+    with pytest.raises(ValueError):
+        transform_path(data, "items/price", lambda prices: prices[:2], inplace=True)
+    # Nothing was written before the error.
+    assert data == {"items": [{"price": 10.0}, {"price": 12.5}, {"price": 1.0}]}
+
+
+def test_record_table_columns():
+    records = [{"price": 10.0, "qty": 1}, {"qty": 2}, {"price": 3.0, "qty": 3}]
+    table = RecordTable(records)
+    assert gather_path(table, "price").tolist() == [10.0, 3.0]
+    assert gather_path({"rows": table}, "rows/qty").tolist() == [1, 2, 3]
+    assert gather_path(table, "re:price|qty").tolist() == query_path(records, "re:price|qty")
+
+    result = transform_path({"rows": table}, "rows/price", lambda prices: prices * 10)
+    assert isinstance(result["rows"], RecordTable)
+    assert result["rows"] == [{"price": 100.0, "qty": 1}, {"qty": 2}, {"price": 30.0, "qty": 3}]
+    assert table == records
+
+    transform_path(table, "qty", lambda qty: -qty, inplace=True)
+    assert table.column("qty") == [-1, -2, -3]
+    assert table.column("price") == [10.0, 3.0]